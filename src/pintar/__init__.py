@@ -1,12 +1,74 @@
-from .core import dye, Brush, Stencil, pstr, print
-from .colors import RGB, HSL, HEX
-from .ansi import FORE, BACK, STYLE
-
 __version__ = "0.7.3"
 __author__ = "michiTrader"
 __description__ = "librería Python para colorear texto en terminal con códigos ANSI"
 
-__all__ =["dye", "Brush", "Stencil", "RGB", "HSL", "HEX", "pstr", "print", "FORE", "BACK", "STYLE"]
+__all__ =["dye", "Brush", "Stencil", "RGB", "HSL", "HEX", "parse_color", "best_foreground", "contrast_ratio", "pstr", "print", "FORE", "BACK", "STYLE", "Table", "display_width", "ByteWriter",
+          "AnsiParser", "Style", "parse_ansi", "aprint", "AsyncPintarHandler",
+          "stats", "reset_stats", "enable_stats", "disable_stats"]
+
+# Carga perezosa: `import pintar` no importa ningún submódulo. Cada nombre
+# público se resuelve en el primer acceso y queda cacheado en el módulo.
+_LAZY = {
+    "dye":           ("core", "dye"),
+    "Brush":         ("core", "Brush"),
+    "Stencil":       ("core", "Stencil"),
+    "pstr":          ("core", "pstr"),
+    "print":         ("core", "print"),
+    "RGB":           ("colors", "RGB"),
+    "HSL":           ("colors", "HSL"),
+    "HEX":           ("colors", "HEX"),
+    "parse_color":   ("colors", "parse_color"),
+    "best_foreground": ("colors", "best_foreground"),
+    "contrast_ratio":  ("colors", "contrast_ratio"),
+    "FORE":          ("ansi", "FORE"),
+    "BACK":          ("ansi", "BACK"),
+    "STYLE":         ("ansi", "STYLE"),
+    "Table":         ("table", "Table"),
+    "display_width": ("width", "display_width"),
+    "ByteWriter":    ("binary", "ByteWriter"),
+    "AnsiParser":    ("ansiparse", "AnsiParser"),
+    "Style":         ("ansiparse", "Style"),
+    "parse_ansi":    ("ansiparse", "parse_ansi"),
+    "aprint":        ("aio", "aprint"),
+    "AsyncPintarHandler": ("aio", "AsyncPintarHandler"),
+    "stats":         ("_instrument", "stats"),
+    "reset_stats":   ("_instrument", "reset"),
+    "enable_stats":  ("_instrument", "enable"),
+    "disable_stats": ("_instrument", "disable"),
+}
+
+_SUBMODULES = {"core", "colors", "ansi", "table", "width", "binary", "ansiparse", "console", "aio", "colorize", "logging", "logreader", "logmetrics", "flight", "text", "bench"}
+
+
+def __getattr__(name):
+    # __import__ relativo en vez de importlib: no añade imports y aparece en -X importtime
+    if name in _LAZY:
+        module, attr = _LAZY[name]
+        value = getattr(__import__(module, globals(), None, (attr,), 1), attr)
+    elif name in _SUBMODULES:
+        value = __import__(name, globals(), None, ("__name__",), 1)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | _SUBMODULES)
+
+
+# Solo para analizadores estáticos (evita importar `typing` en tiempo de ejecución)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .core import dye, Brush, Stencil, pstr, print
+    from .colors import RGB, HSL, HEX, parse_color, best_foreground, contrast_ratio
+    from .ansi import FORE, BACK, STYLE
+    from .table import Table
+    from .width import display_width
+    from .binary import ByteWriter
+    from .ansiparse import AnsiParser, Style, parse_ansi
+    from .aio import aprint, AsyncPintarHandler
+    from ._instrument import enable as enable_stats, disable as disable_stats, stats, reset as reset_stats
 
 # TODO: Se llama demasiado al caracter ansi \033 o \x1b: el sistema puede funcionar sin tanto caracter
-# TODO: ..
\ No newline at end of file
+# TODO: ..
@@ -0,0 +1,7 @@
+# modulo __main__.py
+"""`python -m pintar`: colorea la entrada estándar (ver pintar.colorize)."""
+import sys
+
+from .colorize import main
+
+sys.exit(main())
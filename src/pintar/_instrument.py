@@ -0,0 +1,184 @@
+# modulo _instrument.py
+"""
+Instrumentación opcional del renderizado.
+
+Los módulos registran *sondas* sobre sus métodos calientes con `probe()`, pero
+mientras la instrumentación está desactivada nadie las envuelve: los métodos
+originales se quedan tal cual y el coste es cero. `enable()` sustituye cada
+método sondeado por un envoltorio que cuenta llamadas, mide tiempo y/o cuenta
+los escapes y bytes de la cadena devuelta; `disable()` restaura los originales.
+
+Los escapes y bytes se cuentan solo en la sonda de salida más externa de cada
+hilo: la salida del formatter ya contiene la de los dye con que se construyó y
+no se suma dos veces. Miden texto renderizado, no escrito: una cadena que se
+renderiza una vez y se imprime varias cuenta una vez.
+
+    import pintar
+    pintar.enable_stats()
+    ...
+    pintar.stats()        # {"counters": {...}, "timers": {...}, "caches": {...}}
+    pintar.reset_stats()
+
+También se activa al importar con la variable de entorno PINTAR_STATS=1.
+"""
+import os
+import threading
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Tuple
+
+_enabled = False
+
+_counters: Dict[str, int] = {}
+_timers: Dict[str, List[int]] = {}          # nombre -> [llamadas, nanosegundos]
+_probes: List[Tuple[Any, str, str, bool, bool]] = []
+_originals: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+_caches: Dict[str, Callable[[], Tuple[int, int]]] = {}
+_cache_offsets: Dict[str, Tuple[int, int]] = {}
+# Sondas de salida en curso en cada hilo (depth): solo cuenta la más externa
+_nesting = threading.local()
+
+
+def _count_output(result: Any) -> None:
+    if isinstance(result, str):
+        _counters["escapes"] = _counters.get("escapes", 0) + result.count("\x1b")
+        size = len(result) if result.isascii() else len(result.encode())
+    elif isinstance(result, (bytes, bytearray)):
+        _counters["escapes"] = _counters.get("escapes", 0) + result.count(b"\x1b")
+        size = len(result)
+    else:
+        return
+    _counters["bytes"] = _counters.get("bytes", 0) + size
+
+
+def _outermost_output(func: Callable) -> Callable:
+    """Envuelve `func` para contar su salida solo si no la llama otra sonda de salida."""
+    def counted(*args, **kwargs):
+        depth = getattr(_nesting, "depth", 0)
+        _nesting.depth = depth + 1
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _nesting.depth = depth
+        if not depth:
+            _count_output(result)
+        return result
+    return counted
+
+
+def _wrap(func: Callable, name: str, timed: bool, output: bool) -> Callable:
+    counters = _counters
+    call = _outermost_output(func) if output else func
+
+    if timed:
+        timer = _timers.setdefault(name, [0, 0])
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            result = call(*args, **kwargs)
+            timer[0] += 1
+            timer[1] += perf_counter_ns() - start
+            return result
+    else:
+        def wrapper(*args, **kwargs):
+            counters[name] = counters.get(name, 0) + 1
+            return call(*args, **kwargs)
+
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = getattr(func, "__name__", name)
+    wrapper.__doc__ = getattr(func, "__doc__", None)
+    return wrapper
+
+
+def _patch(owner: Any, attr: str, name: str, timed: bool, output: bool) -> None:
+    key = (id(owner), attr)
+    if key in _originals:
+        return
+    raw = owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)
+    if isinstance(raw, (classmethod, staticmethod)):
+        patched = type(raw)(_wrap(raw.__func__, name, timed, output))
+    else:
+        patched = _wrap(raw, name, timed, output)
+    _originals[key] = (owner, raw)
+    setattr(owner, attr, patched)
+
+
+def probe(owner: Any, attr: str, name: str, timed: bool = False, output: bool = False) -> None:
+    """
+    Registra una sonda sobre `owner.attr` (clase o módulo).
+
+    name   : clave del contador o temporizador en `stats()`.
+    timed  : medir llamadas y tiempo acumulado en lugar de solo contar.
+    output : contar escapes ANSI y bytes de la cadena devuelta.
+    """
+    _probes.append((owner, attr, name, timed, output))
+    if _enabled:
+        _patch(owner, attr, name, timed, output)
+
+
+def count(name: str, n: int = 1) -> None:
+    """
+    Suma `n` al contador `name`. Para funciones que se importan por nombre en
+    otros módulos (no se pueden sondear): el llamador comprueba `_enabled` antes.
+    """
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def register_cache(name: str, source: Any) -> None:
+    """Registra una caché; `source` es un lru_cache o un callable que devuelve (hits, misses)."""
+    if hasattr(source, "cache_info"):
+        info = source.cache_info
+        _caches[name] = lambda: (info().hits, info().misses)
+    else:
+        _caches[name] = source
+
+
+def enable() -> None:
+    """Activa la instrumentación envolviendo todas las sondas registradas."""
+    global _enabled
+    _enabled = True
+    for owner, attr, name, timed, output in _probes:
+        _patch(owner, attr, name, timed, output)
+
+
+def disable() -> None:
+    """Desactiva la instrumentación y restaura los métodos originales."""
+    global _enabled
+    _enabled = False
+    for (_, attr), (owner, raw) in _originals.items():
+        setattr(owner, attr, raw)
+    _originals.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Pone a cero contadores, temporizadores y estadísticas de caché."""
+    _counters.clear()
+    for timer in _timers.values():
+        timer[0] = timer[1] = 0
+    for name, source in _caches.items():
+        _cache_offsets[name] = source()
+
+
+def stats() -> Dict[str, Any]:
+    """Instantánea de la instrumentación: contadores, temporizadores y cachés."""
+    caches = {}
+    for name, source in _caches.items():
+        hits, misses = source()
+        base_hits, base_misses = _cache_offsets.get(name, (0, 0))
+        caches[name] = {"hits": hits - base_hits, "misses": misses - base_misses}
+    return {
+        "enabled": _enabled,
+        "counters": dict(_counters),
+        "timers": {
+            name: {"calls": calls, "seconds": ns / 1e9}
+            for name, (calls, ns) in _timers.items() if calls
+        },
+        "caches": caches,
+    }
+
+
+if os.environ.get("PINTAR_STATS", "") not in ("", "0"):
+    _enabled = True
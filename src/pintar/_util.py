@@ -1,5 +1,86 @@
 # modulo _util.py
+import re
 
+from .width import display_width, char_width
+
+# Secuencia CSI completa (SGR incluido): ESC [ parámetros intermedios final
+ANSI_RE = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]")
+
+# Especificación de formato válida para cadenas: [[fill]align][width][.precision][s]
+_STR_FORMAT_SPEC_RE = re.compile(r"(?:(?P<fill>.)?(?P<align>[<>^]))?(?P<width>\d+)?(?:\.(?P<precision>\d+))?s?\Z", re.S)
+
+
+def strip_ansi(text: str) -> str:
+    """Devuelve `text` sin secuencias de escape ANSI."""
+    if "\x1b" not in text:
+        return text
+    return ANSI_RE.sub("", text)
+
+
+def visible_len(text: str) -> int:
+    """Columnas visibles de `text`, ignorando los escapes ANSI (ver `display_width`)."""
+    return display_width(strip_ansi(text))
+
+
+def _clip_columns(text: str, columns: int) -> tuple[str, int]:
+    """Prefijo de `text` que cabe en `columns` columnas y las columnas que ocupa."""
+    # Como en display_width: los caracteres de control ocupan 0 columnas
+    if text.isascii() and text.isprintable():
+        piece = text[:columns]
+        return piece, len(piece)
+    used = 0
+    for i, char in enumerate(text):
+        w = char_width(char)
+        if used + w > columns:
+            return text[:i], used
+        used += w
+    return text, used
+
+
+def parse_str_format_spec(format_spec: str):
+    """
+    Descompone una especificación de formato de cadena en (fill, align, width, precision).
+    Devuelve None si la especificación no es válida para str.
+    """
+    m = _STR_FORMAT_SPEC_RE.match(format_spec)
+    if m is None:
+        return None
+    width = int(m["width"]) if m["width"] else 0
+    precision = int(m["precision"]) if m["precision"] else None
+    return m["fill"] or " ", m["align"] or "<", width, precision
+
+
+def pad_visible(text: str, visible: int, width: int, align: str = "<", fill: str = " ") -> str:
+    """Rellena `text` (de ancho visible `visible`) hasta `width` con la alineación de str.format."""
+    gap = width - visible
+    if gap <= 0:
+        return text
+    if align == ">":
+        return fill * gap + text
+    if align == "^":
+        left = gap // 2
+        return fill * left + text + fill * (gap - left)
+    return text + fill * gap
+
+
+def clip_visible(text: str, width: int) -> str:
+    """Recorta `text` a `width` columnas visibles conservando todas sus secuencias ANSI."""
+    if "\x1b" not in text:
+        return _clip_columns(text, width)[0]
+
+    result = []
+    remaining = width
+    pos = 0
+    for m in ANSI_RE.finditer(text):
+        if remaining > 0:
+            chunk, used = _clip_columns(text[pos:m.start()], remaining)
+            result.append(chunk)
+            remaining -= used
+        result.append(m.group())
+        pos = m.end()
+    if remaining > 0:
+        result.append(_clip_columns(text[pos:], remaining)[0])
+    return "".join(result)
 
 
 def dict_deep_update(d, u):
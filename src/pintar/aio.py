@@ -0,0 +1,304 @@
+# modulo aio.py
+"""
+Salida para programas asyncio sin escrituras bloqueantes en el hilo del loop.
+
+    import pintar
+
+    async def main():
+        await pintar.aprint("[bold green]LONG[/] BTCUSDT")
+
+    log = logging.getLogger("bot")
+    log.addHandler(AsyncPintarHandler())          # dentro del loop
+    ...
+    await handler.drain()                          # backpressure opcional
+
+El escritor (`AsyncWriter`) acepta bytes sin bloquear: los añade a un buffer y
+un hilo propio los escribe en el descriptor con `os.write` bloqueante. El loop
+nunca espera al destino y el descriptor no cambia de modo: O_NONBLOCK es una
+propiedad de la descripción de archivo abierta, que comparten los dup y los
+procesos hijos, así que ponerla rompería los `print` normales sobre el mismo
+stdout (BlockingIOError con la tubería llena). `drain()` espera mientras el
+buffer supere la marca alta, como `asyncio.StreamWriter.drain`.
+
+Hay un escritor por descriptor (`writer_for`): `aprint` y los
+AsyncPintarHandler sobre stdout comparten buffer, así que sus líneas salen en
+el orden en que se escribieron.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import sys
+import threading
+import warnings
+
+from .core import pstr
+from .logging import PintarFormatter, Theme
+
+_HIGH_WATER = 256 * 1024
+_LOW_WATER = 64 * 1024
+
+
+class AsyncWriter:
+    """
+    Escritor no bloqueante sobre un descriptor, con un hilo que hace las escrituras.
+
+    Parámetros
+    ──────────
+    fd         : descriptor destino (default el de sys.stdout)
+    high_water : bytes en buffer a partir de los cuales `drain()` espera
+    low_water  : bytes en buffer por debajo de los cuales `drain()` continúa
+    max_buffer : límite duro del buffer; lo que exceda se descarta y se cuenta
+                 en `dropped` (0 = sin límite). `write` devuelve False y quien
+                 escribe lo avisa (AsyncPintarHandler por handleError, aprint
+                 con un RuntimeWarning). Evita crecer sin fin si nadie llama a
+                 `drain()` y el destino no lee.
+
+    `write` es seguro desde cualquier hilo; `drain()` y `flush()` se esperan
+    desde cualquier loop. Mejor obtenerlo con `writer_for(fd)`, que lo comparte.
+    """
+    def __init__(
+        self,
+        fd: int | None = None,
+        high_water: int = _HIGH_WATER,
+        low_water: int = _LOW_WATER,
+        max_buffer: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.fd = sys.stdout.fileno() if fd is None else fd
+        self.high_water = high_water
+        self.low_water = low_water
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self._buffer = bytearray()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        # (loop, future, umbral): se resuelve cuando lo pendiente baja de umbral
+        self._waiters: list = []
+        self._error: OSError | None = None
+        self._closed = False
+        self._users = 0
+        self._thread = threading.Thread(target=self._run, name=f"pintar-writer-{self.fd}", daemon=True)
+        self._thread.start()
+
+    @property
+    def buffered(self) -> int:
+        """Bytes aceptados y aún no escritos en el descriptor."""
+        return len(self._buffer) + self._in_flight
+
+    def write(self, data) -> bool:
+        """Añade `data` (bytes o str) al buffer sin bloquear. False si se descartó por `max_buffer`."""
+        if isinstance(data, str):
+            data = data.encode("utf-8", "replace")
+        with self._lock:
+            if self._closed:
+                raise ValueError("AsyncWriter cerrado")
+            if self._error is not None:
+                raise self._error
+            if self.max_buffer and len(self._buffer) + self._in_flight + len(data) > self.max_buffer:
+                self.dropped += 1
+                return False
+            idle = not self._buffer
+            self._buffer += data
+            if idle:
+                self._wake.notify()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._wake.wait()
+                if not self._buffer:
+                    return
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                self._in_flight = len(data)
+            error = None
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(self.fd, view):]
+            except OSError as exc:
+                error = exc
+            with self._lock:
+                self._in_flight = 0
+                if error is not None:
+                    self._error = error
+                    self._buffer.clear()
+                self._wake_waiters(error)
+
+    def _wake_waiters(self, error: Exception | None = None) -> None:
+        # Con el cerrojo tomado
+        pending = len(self._buffer) + self._in_flight
+        keep = []
+        for waiter in self._waiters:
+            loop, future, threshold = waiter
+            if error is None and pending > threshold:
+                keep.append(waiter)
+                continue
+            try:
+                loop.call_soon_threadsafe(_resolve, future, error)
+            except RuntimeError:   # loop cerrado: nadie espera ya
+                pass
+        self._waiters = keep
+
+    async def drain(self) -> None:
+        """Espera a que el buffer baje de `low_water` si supera `high_water`."""
+        if self.buffered > self.high_water:
+            await self._wait(self.low_water)
+
+    async def flush(self) -> None:
+        """Espera a que todo lo escrito llegue al descriptor."""
+        if self.buffered:
+            await self._wait(0)
+
+    def _wait(self, threshold: int) -> "asyncio.Future":
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if self._error is not None:
+                future.set_exception(self._error)
+            elif len(self._buffer) + self._in_flight <= threshold:
+                future.set_result(None)
+            else:
+                self._waiters.append((future.get_loop(), future, threshold))
+        return future
+
+    def close(self) -> None:
+        """Escribe lo pendiente (bloqueando) y termina el hilo escritor."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+        with self._lock:
+            self._wake_waiters()
+
+    async def aclose(self) -> None:
+        await self.flush()
+        self.close()
+
+
+def _resolve(future: "asyncio.Future", error: Exception | None) -> None:
+    if not future.done():
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+
+# Un escritor por descriptor, con cuenta de usuarios
+_writers: "dict[int, AsyncWriter]" = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(fd: int | None = None) -> AsyncWriter:
+    """
+    El AsyncWriter compartido de `fd` (default stdout); se crea la primera vez.
+    Cada llamada cuenta como un usuario: devolverlo con `release_writer`.
+    """
+    if fd is None:
+        # Lo que print() haya dejado en el buffer de texto debe salir antes
+        sys.stdout.flush()
+        fd = sys.stdout.fileno()
+    with _writers_lock:
+        writer = _writers.get(fd)
+        if writer is None:
+            writer = _writers[fd] = AsyncWriter(fd)
+        writer._users += 1
+        return writer
+
+
+def release_writer(writer: AsyncWriter) -> None:
+    """Deja de usar `writer`; el último usuario lo cierra (tras escribir lo pendiente)."""
+    with _writers_lock:
+        writer._users -= 1
+        if writer._users > 0:
+            return
+        if _writers.get(writer.fd) is writer:
+            del _writers[writer.fd]
+    writer.close()
+
+
+_stdout_writer: AsyncWriter | None = None
+
+
+def stdout_writer() -> AsyncWriter:
+    """El AsyncWriter compartido de sys.stdout que usa `aprint`."""
+    global _stdout_writer
+    writer = _stdout_writer
+    if writer is None or writer._closed:
+        writer = _stdout_writer = writer_for()
+    return writer
+
+
+@atexit.register
+def _close_writers() -> None:
+    # Lo aceptado y no escrito sale antes de terminar el proceso
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+async def aprint(*args, sep: str = " ", end: str = "\n") -> None:
+    """Versión asyncio de `pintar.print`: formatea con pstr, escribe sin bloquear y respeta drain()."""
+    text = sep.join(str(arg) for arg in args)
+    writer = stdout_writer()
+    if not writer.write((pstr(text).string_format if args else "") + end):
+        warnings.warn(f"aprint: buffer de stdout lleno, {writer.dropped} escrituras descartadas",
+                      RuntimeWarning, stacklevel=2)
+    await writer.drain()
+
+
+class AsyncPintarHandler(logging.Handler):
+    """
+    Handler de logging para asyncio: formatea en `emit` y entrega los bytes al
+    AsyncWriter compartido del descriptor, sin escrituras bloqueantes.
+
+    Parámetros
+    ──────────
+    fd     : descriptor destino (default stdout)
+    theme  : Theme o dict de overrides, como PintarStreamHandler
+
+    `emit` puede llamarse desde cualquier hilo. Como es síncrono no puede
+    esperar: `await handler.drain()` aplica la backpressure y `max_buffer` del
+    escritor acota la memoria si nadie lo hace; un registro descartado pasa
+    por `handleError`.
+    """
+    terminator = "\n"
+
+    def __init__(self, fd: int | None = None, theme=None, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        if isinstance(theme, dict):
+            theme = Theme(overrides=theme)
+        elif theme is None:
+            theme = Theme()
+        self.setFormatter(PintarFormatter(theme))
+        self.writer = writer_for(fd)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = (self.format(record) + self.terminator).encode("utf-8", "replace")
+            if not self.writer.write(data):
+                raise BufferError(f"AsyncWriter lleno (max_buffer={self.writer.max_buffer}): "
+                                  f"registro descartado, {self.writer.dropped} en total")
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    async def drain(self) -> None:
+        await self.writer.drain()
+
+    async def aclose(self) -> None:
+        await self.writer.flush()
+        self.close()
+
+    def close(self) -> None:
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            release_writer(writer)
+        super().close()
@@ -19,13 +19,10 @@ def clear_line(mode=2):
     return CSI + str(mode) + 'K'
 
 class AnsiCodes(object):
-    def __init__(self):
-        """ Lo convierte al caracter Ansi usando el token del color o estilo"""
-        for name in dir(self):
-            if not name.startswith('_'):
-                value = getattr(self, name)
-                setattr(self, name, code_to_chars(value))
-
+    """
+    Tabla de secuencias ANSI. Los valores ya son literales (equivalen a
+    `code_to_chars(código)`), así que importar el módulo no ejecuta reflexión.
+    """
     def __iter__(self):
         """ Iterar sobre los nombres de los colores y estilos """
         for name in dir(self):
@@ -40,76 +37,76 @@ class AnsiCodes(object):
     #     )
 
 class AnsiFore(AnsiCodes):
-    BLACK           = 30
-    RED             = 31
-    GREEN           = 32
-    YELLOW          = 33
-    BLUE            = 34
-    MAGENTA         = 35
-    CYAN            = 36
-    WHITE           = 37
-    RESET           = 39
+    BLACK           = '\033[30m'
+    RED             = '\033[31m'
+    GREEN           = '\033[32m'
+    YELLOW          = '\033[33m'
+    BLUE            = '\033[34m'
+    MAGENTA         = '\033[35m'
+    CYAN            = '\033[36m'
+    WHITE           = '\033[37m'
+    RESET           = '\033[39m'
 
     # These are fairly well supported, but not part of the standard.
-    LIGHTBLACK_EX   = 90
-    LIGHTRED_EX     = 91
-    LIGHTGREEN_EX   = 92
-    LIGHTYELLOW_EX  = 93
-    LIGHTBLUE_EX    = 94
-    LIGHTMAGENTA_EX = 95
-    LIGHTCYAN_EX    = 96
-    LIGHTWHITE_EX   = 97
+    LIGHTBLACK_EX   = '\033[90m'
+    LIGHTRED_EX     = '\033[91m'
+    LIGHTGREEN_EX   = '\033[92m'
+    LIGHTYELLOW_EX  = '\033[93m'
+    LIGHTBLUE_EX    = '\033[94m'
+    LIGHTMAGENTA_EX = '\033[95m'
+    LIGHTCYAN_EX    = '\033[96m'
+    LIGHTWHITE_EX   = '\033[97m'
 
 class AnsiBack(AnsiCodes):
-    BLACK           = 40
-    RED             = 41
-    GREEN           = 42
-    YELLOW          = 43
-    BLUE            = 44
-    MAGENTA         = 45
-    CYAN            = 46
-    WHITE           = 47
-    RESET           = 49
+    BLACK           = '\033[40m'
+    RED             = '\033[41m'
+    GREEN           = '\033[42m'
+    YELLOW          = '\033[43m'
+    BLUE            = '\033[44m'
+    MAGENTA         = '\033[45m'
+    CYAN            = '\033[46m'
+    WHITE           = '\033[47m'
+    RESET           = '\033[49m'
 
     # These are fairly well supported, but not part of the standard.
-    LIGHTBLACK_EX   = 100
-    LIGHTRED_EX     = 101
-    LIGHTGREEN_EX   = 102
-    LIGHTYELLOW_EX  = 103
-    LIGHTBLUE_EX    = 104
-    LIGHTMAGENTA_EX = 105
-    LIGHTCYAN_EX    = 106
-    LIGHTWHITE_EX   = 107
+    LIGHTBLACK_EX   = '\033[100m'
+    LIGHTRED_EX     = '\033[101m'
+    LIGHTGREEN_EX   = '\033[102m'
+    LIGHTYELLOW_EX  = '\033[103m'
+    LIGHTBLUE_EX    = '\033[104m'
+    LIGHTMAGENTA_EX = '\033[105m'
+    LIGHTCYAN_EX    = '\033[106m'
+    LIGHTWHITE_EX   = '\033[107m'
 
 class AnsiStyle(AnsiCodes):
-    RESET_ALL = 0
-    BOLD      = 1
-    DIM       = 2
-    ITALIC    = 3
-    UNDERLINE = 4
-    BLINK     = 5
-    BLINK2    = 6
-    REVERSE   = 7
-    CONCEAL   = 8
-    STRIKE    = 9
+    RESET_ALL = '\033[0m'
+    BOLD      = '\033[1m'
+    DIM       = '\033[2m'
+    ITALIC    = '\033[3m'
+    UNDERLINE = '\033[4m'
+    BLINK     = '\033[5m'
+    BLINK2    = '\033[6m'
+    REVERSE   = '\033[7m'
+    CONCEAL   = '\033[8m'
+    STRIKE    = '\033[9m'
     
-    UNDERLINE2 = 21
-    NORMAL    = 22
-    NOT_BOLD = 22
-    NOT_DIM = 22
-    NOT_ITALIC = 23
-    NOT_UNDERLINE = 24
-    NOT_BLINK = 25
-    NOT_BLINK2 = 26
-    NOT_REVERSE = 27
-    NOT_CONCEAL = 28
-    NOT_STRIKE = 29
-
-    FRAME = 51
-    ENCIRCLE = 52
-    OVERLINE = 53
-    NOT_FRAME_NOT_ENCIRCLE = 54
-    NOT_OVERLINE = 55
+    UNDERLINE2 = '\033[21m'
+    NORMAL    = '\033[22m'
+    NOT_BOLD = '\033[22m'
+    NOT_DIM = '\033[22m'
+    NOT_ITALIC = '\033[23m'
+    NOT_UNDERLINE = '\033[24m'
+    NOT_BLINK = '\033[25m'
+    NOT_BLINK2 = '\033[26m'
+    NOT_REVERSE = '\033[27m'
+    NOT_CONCEAL = '\033[28m'
+    NOT_STRIKE = '\033[29m'
+
+    FRAME = '\033[51m'
+    ENCIRCLE = '\033[52m'
+    OVERLINE = '\033[53m'
+    NOT_FRAME_NOT_ENCIRCLE = '\033[54m'
+    NOT_OVERLINE = '\033[55m'
 
 class AnsiCursor(object):
     def UP(self, n=1):
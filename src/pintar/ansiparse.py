@@ -0,0 +1,310 @@
+# modulo ansiparse.py
+"""
+Lectura de texto con escapes ANSI: convierte la salida de cualquier programa
+en segmentos (texto, Style).
+
+    from pintar.ansiparse import AnsiParser
+
+    parser = AnsiParser()
+    for chunk in iter(lambda: sys.stdin.buffer.read(65536), b""):
+        for text, style in parser.feed(chunk):
+            ...
+    for text, style in parser.close():
+        ...
+
+El parser es incremental: acepta trozos str o bytes de cualquier tamaño y una
+secuencia cortada entre dos trozos (o un carácter UTF-8 partido) se completa
+con el siguiente. Solo retiene la secuencia incompleta, así que la memoria es
+constante. Interpreta SGR (colores básicos, 90-97, 38;5;N, 38;2;R;G;B, también
+con ':'), y consume sin emitir el resto de CSI, OSC (título, hipervínculos…)
+y los escapes de dos caracteres.
+"""
+import codecs
+import re
+from functools import lru_cache
+from typing import Iterator, NamedTuple, Tuple
+
+# Bits de Style.attrs
+BOLD, DIM, ITALIC, UNDERLINE, BLINK, REVERSE, HIDDEN, STRIKE = (1 << i for i in range(8))
+
+# Código SGR que activa cada atributo y el que lo desactiva
+_ATTR_ON = {1: BOLD, 2: DIM, 3: ITALIC, 4: UNDERLINE, 5: BLINK, 6: BLINK, 7: REVERSE, 8: HIDDEN, 9: STRIKE}
+_ATTR_OFF = {22: BOLD | DIM, 23: ITALIC, 24: UNDERLINE, 25: BLINK, 27: REVERSE, 28: HIDDEN, 29: STRIKE}
+_ATTR_CODES = ((BOLD, 1), (DIM, 2), (ITALIC, 3), (UNDERLINE, 4), (BLINK, 5), (REVERSE, 7), (HIDDEN, 8), (STRIKE, 9))
+_ATTR_RESET = {ITALIC: 23, UNDERLINE: 24, BLINK: 25, REVERSE: 27, HIDDEN: 28, STRIKE: 29}
+
+# Secuencia completa. Una racha de SGR seguidos (lo que emite dye: reset, fore,
+# bg, estilo) se captura entera en `sgr` para resolverla con una sola consulta
+# de caché. El resto: CSI genérico, OSC terminado en BEL o ST, o escape corto
+# (ESC + intermedios + final, sin '[' ni ']', que abren CSI y OSC).
+_SEQUENCE_RE = re.compile(
+    r"\x1b(?:(?P<sgr>\[[0-9;:]*m(?:\x1b\[[0-9;:]*m)*)"
+    r"|\[[0-?]*[ -/]*[@-~]"
+    r"|\][^\x07\x1b]*(?:\x07|\x1b\\)"
+    r"|[ -/]*[0-Z\\^-~])"
+)
+_SGR_PARAMS_RE = re.compile(r"\[([0-9;:]*)m")
+# Principio válido de una secuencia que aún no ha terminado
+_PARTIAL_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[ -/]*)")
+
+# Una secuencia incompleta más larga que esto se descarta (OSC sin terminar, basura)
+MAX_PENDING = 4096
+
+
+class Style(NamedTuple):
+    """
+    Estado de estilo de un segmento.
+
+    fore / bg : None, índice 0-255 (básicos 0-15 incluidos) o tupla (r, g, b)
+    attrs     : máscara de bits BOLD | DIM | ITALIC | UNDERLINE | BLINK | REVERSE | HIDDEN | STRIKE
+
+    Es una tupla: inmutable, hashable y barata de comparar.
+    """
+    fore: "int | Tuple[int, int, int] | None" = None
+    bg: "int | Tuple[int, int, int] | None" = None
+    attrs: int = 0
+
+    @property
+    def bold(self) -> bool:
+        return bool(self.attrs & BOLD)
+
+    @property
+    def dim(self) -> bool:
+        return bool(self.attrs & DIM)
+
+    @property
+    def italic(self) -> bool:
+        return bool(self.attrs & ITALIC)
+
+    @property
+    def underline(self) -> bool:
+        return bool(self.attrs & UNDERLINE)
+
+    @property
+    def reverse(self) -> bool:
+        return bool(self.attrs & REVERSE)
+
+    @property
+    def strike(self) -> bool:
+        return bool(self.attrs & STRIKE)
+
+    @property
+    def is_plain(self) -> bool:
+        return self == PLAIN
+
+    def sgr(self) -> str:
+        """Secuencia que abre este estilo partiendo de un terminal sin estilo."""
+        return PLAIN.transition(self)
+
+    def transition(self, target: "Style") -> str:
+        """SGR mínimo para pasar de este estilo a `target` ('' si son iguales)."""
+        return _transition(self, target)
+
+
+PLAIN = Style()
+
+
+def _color_codes(color, base: int) -> str:
+    """Parámetros SGR de un color; base 30 para fore, 40 para bg."""
+    if color is None:
+        return str(base + 9)
+    if isinstance(color, tuple):
+        return f"{base + 8};2;{color[0]};{color[1]};{color[2]}"
+    if color < 8:
+        return str(base + color)
+    if color < 16:
+        return str(base + 60 + color - 8)
+    return f"{base + 8};5;{color}"
+
+
+@lru_cache(maxsize=4096)
+def _transition(current: Style, target: Style) -> str:
+    if current == target:
+        return ""
+    if target == PLAIN:
+        return "\x1b[0m"
+    codes = []
+    removed = current.attrs & ~target.attrs
+    attrs = current.attrs
+    if removed & (BOLD | DIM):
+        # 22 apaga negrita y tenue a la vez; el que siga activo se reabre abajo
+        codes.append("22")
+        attrs &= ~(BOLD | DIM)
+    for bit, code in _ATTR_CODES[2:]:
+        if removed & bit:
+            codes.append(str(_ATTR_RESET[bit]))
+            attrs &= ~bit
+    for bit, code in _ATTR_CODES:
+        if target.attrs & bit and not attrs & bit:
+            codes.append(str(code))
+    if target.fore != current.fore:
+        codes.append(_color_codes(target.fore, 30))
+    if target.bg != current.bg:
+        codes.append(_color_codes(target.bg, 40))
+    # Quitar todo y reabrir puede salir más corto que desactivar uno a uno
+    full = [str(code) for bit, code in _ATTR_CODES if target.attrs & bit]
+    if target.fore is not None:
+        full.append(_color_codes(target.fore, 30))
+    if target.bg is not None:
+        full.append(_color_codes(target.bg, 40))
+    if len(";".join(full)) + 2 < len(";".join(codes)):
+        codes = ["0"] + full
+    return f"\x1b[{';'.join(codes)}m"
+
+
+def _extended_color(values: list, i: int):
+    """Lee un color 38/48 a partir de values[i] ('5;N' o '2;R;G;B'). Devuelve (color, siguiente índice)."""
+    mode = values[i] if i < len(values) else None
+    if mode == 5 and i + 1 < len(values):
+        return values[i + 1] & 0xFF, i + 2
+    if mode == 2 and i + 3 < len(values):
+        r, g, b = values[i + 1:i + 4]
+        return (r & 0xFF, g & 0xFF, b & 0xFF), i + 4
+    return None, len(values)
+
+
+def _int(text: str) -> int:
+    return int(text) if text.isdigit() else 0
+
+
+@lru_cache(maxsize=4096)
+def apply_sgr(style: Style, params: str) -> Style:
+    """Aplica los parámetros de un SGR ('1;38;2;14;203;129', '' = reset) a `style`."""
+    fore, bg, attrs = style
+    for group in params.split(";") if params else ("0",):
+        if ":" in group:
+            # Forma con subparámetros: 38:2::R:G:B, 38:5:N, 4:3 (subrayado ondulado)…
+            sub = group.split(":")
+            code = _int(sub[0])
+            if code in (38, 48, 58):
+                values = [_int(v) for v in sub[1:]]
+                if values and values[0] == 2 and len(values) == 5:
+                    del values[1]   # id de espacio de color vacío
+                color, _ = _extended_color(values, 0)
+                if code == 38:
+                    fore = color
+                elif code == 48:
+                    bg = color
+                continue
+            if code == 4:
+                attrs = attrs & ~UNDERLINE if sub[1:2] == ["0"] else attrs | UNDERLINE
+                continue
+            group = sub[0]
+        code = _int(group)
+        if code == 0:
+            fore, bg, attrs = None, None, 0
+        elif code in _ATTR_ON:
+            attrs |= _ATTR_ON[code]
+        elif code in _ATTR_OFF:
+            attrs &= ~_ATTR_OFF[code]
+        elif 30 <= code <= 37:
+            fore = code - 30
+        elif 90 <= code <= 97:
+            fore = code - 90 + 8
+        elif code == 39:
+            fore = None
+        elif 40 <= code <= 47:
+            bg = code - 40
+        elif 100 <= code <= 107:
+            bg = code - 100 + 8
+        elif code == 49:
+            bg = None
+    return Style(fore, bg, attrs)
+
+
+def _apply_sgr_params(style: Style, params: str) -> Style:
+    # 38;2;R;G;B llega partido por ';': se agrupa antes de aplicar
+    if "38" not in params and "48" not in params and "58" not in params:
+        return apply_sgr(style, params)
+    values = params.split(";")
+    groups = []
+    i = 0
+    while i < len(values):
+        code = values[i]
+        if code in ("38", "48", "58") and i + 1 < len(values):
+            width = 3 if values[i + 1] == "5" else 5 if values[i + 1] == "2" else 1
+            groups.append(":".join(values[i:i + width]))
+            i += width
+        else:
+            groups.append(code)
+            i += 1
+    return apply_sgr(style, ";".join(groups))
+
+
+@lru_cache(maxsize=4096)
+def _apply_sgr_run(style: Style, run: str) -> Style:
+    """Aplica una racha '[1m\\x1b[38;5;2m…' (sin el primer ESC) a `style`."""
+    for params in _SGR_PARAMS_RE.findall(run):
+        style = _apply_sgr_params(style, params)
+    return style
+
+
+class AnsiParser:
+    """
+    Parser incremental de texto con escapes ANSI.
+
+    Parámetros
+    ──────────
+    style    : estilo inicial (default sin estilo)
+    encoding : codificación de los trozos bytes (default utf-8; errores → U+FFFD)
+
+    `feed` y `close` devuelven generadores perezosos que avanzan el estado del
+    parser: hay que consumir cada uno antes de alimentar el siguiente trozo.
+    """
+    def __init__(self, style: Style = PLAIN, encoding: str = "utf-8") -> None:
+        self.style = style
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder(encoding)("replace")
+
+    def feed(self, chunk: "str | bytes") -> Iterator[Tuple[str, Style]]:
+        """Procesa un trozo y genera los segmentos (texto, Style) que ya están completos."""
+        if not isinstance(chunk, str):
+            chunk = self._decoder.decode(chunk)
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
+        return self._segments(chunk)
+
+    def close(self) -> Iterator[Tuple[str, Style]]:
+        """Termina el flujo: vacía el decodificador y descarta una secuencia incompleta."""
+        tail = self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return self._segments(tail) if tail else iter(())
+
+    def _segments(self, buf: str) -> Iterator[Tuple[str, Style]]:
+        style = self.style
+        pos = 0
+        for m in _SEQUENCE_RE.finditer(buf):
+            start = m.start()
+            if start > pos:
+                yield _clean(buf[pos:start]), style
+            pos = m.end()
+            sgr = m["sgr"]
+            if sgr is not None:
+                style = self.style = _apply_sgr_run(style, sgr)
+        if pos == len(buf):
+            return
+        # Un ESC sin secuencia completa tras el último match: incompleta (se guarda) o inválida (se omite)
+        end = len(buf)
+        esc = buf.find("\x1b", pos)
+        while esc != -1:
+            if _PARTIAL_RE.fullmatch(buf, esc):
+                if end - esc <= MAX_PENDING:
+                    self._pending = buf[esc:]
+                end = esc
+                break
+            esc = buf.find("\x1b", esc + 1)
+        if end > pos:
+            yield _clean(buf[pos:end]), style
+
+
+def _clean(text: str) -> str:
+    return text.replace("\x1b", "") if "\x1b" in text else text
+
+
+def parse_ansi(text: "str | bytes") -> list[Tuple[str, Style]]:
+    """Parsea un texto completo y devuelve la lista de segmentos (texto, Style)."""
+    parser = AnsiParser()
+    segments = list(parser.feed(text))
+    segments.extend(parser.close())
+    return segments
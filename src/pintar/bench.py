@@ -0,0 +1,472 @@
+# modulo bench.py
+"""
+Micro-benchmarks reproducibles de los caminos calientes de pintar.
+
+    python -m pintar.bench                   # mide y compara con la línea base
+    python -m pintar.bench --save            # guarda la medición como línea base
+    python -m pintar.bench -k dye -t 0.15    # solo casos 'dye*', umbral del 15 %
+    python -m pintar.bench --vs-cat 64       # `python -m pintar` contra `cat`, 64 MB
+
+Cada caso mide operaciones por segundo y bytes emitidos por operación. Los
+resultados se comparan con un JSON de línea base y el proceso termina con
+código 1 si algún caso cae por debajo de `(1 - umbral) × ops/s` de la base.
+Solo usa la biblioteca estándar.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List
+
+DEFAULT_BASELINE = "pintar-bench.json"
+DEFAULT_THRESHOLD = 0.20
+
+# nombre -> función de preparación que devuelve la operación a medir.
+# La operación devuelve lo que emitiría (str o bytes), o el número de bytes
+# escritos si escribe ella misma, para contar bytes por operación.
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Registra una función de preparación como caso de benchmark."""
+    # La operación puede llevar un atributo `close`: run() lo llama al terminar el caso
+    def register(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    bytes_per_op: int
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.ops_per_sec * self.bytes_per_op
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# CASOS
+# ──────────────────────────────────────────────────────────────────────────────
+
+_TEXT = "BTCUSDT LONG 0.01 @ 45230.5"
+_MARKUP = "[bold green]LONG[/] BTCUSDT [#F6465D]-2.5%[/] [on rgb(26, 32, 44)]size=0.01[/on]"
+
+
+@benchmark("dye.construct")
+def _dye_construct():
+    from pintar.core import dye
+    return lambda: dye(_TEXT, fore="#0ECB81").string_format
+
+
+@benchmark("dye.slice")
+def _dye_slice():
+    from pintar.core import dye
+    d = dye(_TEXT, fore="#0ECB81", bg="#1A202C")
+    return lambda: d[8:12].string_format
+
+
+@benchmark("dye.clean")
+def _dye_clean():
+    from pintar.core import dye
+    d = dye(_TEXT, fore="#0ECB81", bg="#1A202C")
+
+    def op():
+        d._clean = None
+        return d.clean
+    return op
+
+
+@benchmark("pstr.parse")
+def _pstr_parse():
+    from pintar.core import pstr
+    return lambda: pstr(_MARKUP).string_format
+
+
+@benchmark("brush.apply")
+def _brush_apply():
+    from pintar.core import Brush
+    paint = Brush.load("#0ECB81", None, "bold")
+    return lambda: paint("BUY")
+
+
+@benchmark("brush.many")
+def _brush_many():
+    from pintar.core import Brush
+    paint = Brush("#0ECB81", None, "bold")
+    labels = _TEXT.split() * 16
+    return lambda: paint.apply_many(labels, join=" ")
+
+
+@benchmark("brush.bytes")
+def _brush_bytes():
+    from pintar.core import Brush
+    paint = Brush("#0ECB81", None, "bold")
+    labels = _TEXT.split() * 16
+    return lambda: paint.apply_many(labels, join=b" ")
+
+
+@benchmark("stencil.spray")
+def _stencil_spray():
+    from pintar.core import Stencil
+    return lambda: Stencil(_TEXT, 8, 12).spray(fore="#F6465D")
+
+
+@benchmark("stencil.spans")
+def _stencil_spans():
+    from pintar.core import Stencil, dye
+    # Texto ya coloreado con tramos solapados: obliga al render por capas
+    text = (_TEXT + " " + dye(_TEXT, fore="#4A5568").string_format + " ") * 8
+
+    def op():
+        st = Stencil(text).add(0, 40, fore="#F6465D").add(20, 120, bg="#1A202C", priority=1)
+        return st.add_pattern(r"\d+(?:\.\d+)?", style="bold").spray()
+    return op
+
+
+@benchmark("ansi.parse")
+def _ansi_parse():
+    from pintar.core import dye
+    from pintar.ansiparse import AnsiParser
+    line = f"12:00:00 {dye('INFO', fore='#0ECB81', style='bold')} │ {_TEXT} {dye('+2.5%', fore='#F0B90B')}\n"
+    chunk = (line * 64).encode()
+
+    def op():
+        parser = AnsiParser()
+        for _ in parser.feed(chunk):
+            pass
+        return chunk
+    return op
+
+
+@benchmark("color.parse_hex")
+def _color_parse_hex():
+    from pintar.colors import RGB
+    return lambda: RGB.from_hex_string("#0ECB81").to_hex()
+
+
+@benchmark("color.parse")
+def _color_parse():
+    from pintar.colors import parse_color
+    return lambda: parse_color("#0ECB81").to_hex()
+
+
+@benchmark("color.convert")
+def _color_convert():
+    from pintar.colors import RGB
+    rgb = RGB(14, 203, 129)
+    return lambda: rgb.to_hsl().to_rgb().to_hex()
+
+
+def _fresh_record() -> logging.LogRecord:
+    return logging.LogRecord("bench", logging.INFO, __file__, 1, "señal %s precio=%.2f", ("LONG", 45230.5), None)
+
+
+@benchmark("formatter.format")
+def _formatter_format():
+    from pintar.logging import PintarFormatter, _RECORD_PIECES
+    formatter = PintarFormatter()
+    record = _fresh_record()
+
+    def op():
+        _RECORD_PIECES.pop(record, None)
+        return formatter.format(record)
+    return op
+
+
+@benchmark("formatter.highlight")
+def _formatter_highlight():
+    from pintar.logging import PintarFormatter, Theme, Highlighter, _RECORD_PIECES
+    formatter = PintarFormatter(Theme(highlighter=Highlighter()))
+    record = _fresh_record()
+
+    def op():
+        _RECORD_PIECES.pop(record, None)
+        return formatter.format(record)
+    return op
+
+
+@benchmark("formatter.shared")
+def _formatter_shared():
+    # Consola con color + archivo sin color: el mismo registro pasa por dos formatters
+    from pintar.logging import PintarFormatter, Theme, _RECORD_PIECES
+    theme = Theme()
+    dyed, plain = PintarFormatter(theme), PintarFormatter(theme.undyed())
+    record = _fresh_record()
+
+    def op():
+        _RECORD_PIECES.pop(record, None)
+        return dyed.format(record) + plain.format(record)
+    return op
+
+
+def _stream_handler(binary: bool):
+    import os
+    from pintar.logging import PintarStreamHandler
+    stream = open(os.devnull, "w", encoding="utf-8")
+    handler = PintarStreamHandler(stream, binary=binary, flush_at=64 * 1024 if binary else 0)
+    record = logging.LogRecord("bench", logging.INFO, __file__, 1, "señal %s precio=%.2f", ("LONG", 45230.5), None)
+    # Ambos modos escriben la misma línea; la operación devuelve sus bytes
+    size = len((handler.format(record) + handler.terminator).encode())
+
+    def op():
+        handler.emit(record)
+        return size
+
+    def close():
+        handler.close()
+        stream.close()
+    op.close = close
+    return op
+
+
+@benchmark("handler.text")
+def _handler_text():
+    return _stream_handler(binary=False)
+
+
+@benchmark("handler.bytes")
+def _handler_bytes():
+    return _stream_handler(binary=True)
+
+
+@benchmark("console.contention")
+def _console_contention():
+    # 32 hilos publicando a la vez; cada operación escribe 32 × 50 líneas
+    import os
+    import threading
+    from pintar.console import Console
+    stream = open(os.devnull, "w", encoding="utf-8")
+    console = Console(stream)
+    line = _TEXT + "\n"
+    size = 32 * 50 * len(line)
+
+    def writer():
+        for _ in range(50):
+            console.write(line)
+
+    def op():
+        threads = [threading.Thread(target=writer) for _ in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return size
+    op.close = stream.close
+    return op
+
+
+def _synthetic_log(lines: int) -> bytes:
+    """Log plano con el layout por defecto de PintarFileHandler."""
+    levels = ("INFO    ", "DEBUG   ", "WARNING ", "ERROR   ")
+    return "".join(
+        f"2026-10-19 14:{i // 60 % 60:02d}:{i % 60:02d} │ {levels[i % 4]} │ BtcStrategy - "
+        f"señal LONG precio={45000 + i % 1000}.5 size=0.01 id={i}\n"
+        for i in range(lines)
+    ).encode()
+
+
+@benchmark("colorize.lines")
+def _colorize_lines():
+    # Reglas por defecto de `python -m pintar` sobre ~100 KiB de log; cuenta bytes de entrada
+    from pintar.colorize import Colorizer
+    colorizer = Colorizer()
+    block = _synthetic_log(1000)
+
+    def op():
+        colorizer.feed(block)
+        return len(block)
+    return op
+
+
+def colorize_vs_cat(size_mb: int = 64, rules: str | None = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    MB/s de `python -m pintar` frente a `cat` (la línea base: copiar sin
+    colorear) sobre el mismo log sintético, ambos escribiendo a /dev/null.
+    """
+    import os
+    import shutil
+    import subprocess
+    import tempfile
+
+    block = _synthetic_log(10_000)
+    with tempfile.NamedTemporaryFile(suffix=".log", delete=False) as f:
+        for _ in range(max(1, size_mb * 1_000_000 // len(block))):
+            f.write(block)
+        path = f.name
+    size = os.path.getsize(path)
+    commands = {"pintar": [sys.executable, "-m", "pintar"] + (["-r", rules] if rules else [])}
+    cat = shutil.which("cat")
+    if cat:
+        commands = {"cat": [cat], **commands}
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    rates = {}
+    try:
+        for name, command in commands.items():
+            best = float("inf")
+            for _ in range(repeat):
+                with open(path, "rb") as stdin, open(os.devnull, "wb") as stdout:
+                    start = time.perf_counter()
+                    subprocess.run(command, stdin=stdin, stdout=stdout, env=env, check=True)
+                    best = min(best, time.perf_counter() - start)
+            rates[name] = size / best / 1e6
+    finally:
+        os.unlink(path)
+    return rates
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# EJECUCIÓN
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _measure(op: Callable[[], object], min_time: float, repeat: int) -> float:
+    """Mejor tasa de operaciones/segundo entre `repeat` rondas de al menos `min_time / repeat` s."""
+    target = min_time / repeat
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target / 4:
+            break
+        loops *= 4
+    loops = max(1, int(loops * target / max(elapsed, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        best = min(best, time.perf_counter() - start)
+    return loops / best
+
+
+def run(names: List[str] | None = None, min_time: float = 0.5, repeat: int = 5) -> Dict[str, Result]:
+    """Ejecuta los casos indicados (todos por defecto) y devuelve sus resultados."""
+    results: Dict[str, Result] = {}
+    for name, setup in BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        op = setup()
+        try:
+            out = op()
+            if isinstance(out, str):
+                size = len(out.encode())
+            elif isinstance(out, (bytes, bytearray)):
+                size = len(out)
+            else:
+                size = out if isinstance(out, int) else 0
+
+            gc_was_enabled = gc.isenabled()
+            gc.collect()
+            gc.disable()
+            try:
+                ops = _measure(op, min_time, repeat)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        finally:
+            close = getattr(op, "close", None)
+            if close is not None:
+                close()
+        results[name] = Result(name, ops, size)
+    return results
+
+
+def compare(results: Dict[str, Result], baseline: dict, threshold: float) -> List[str]:
+    """Devuelve los nombres de los casos cuyo rendimiento cayó más de `threshold`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base and result.ops_per_sec < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def load_baseline(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: Dict[str, Result], threshold: float) -> None:
+    data = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "threshold": threshold,
+        "results": {name: asdict(r) for name, r in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _report(results: Dict[str, Result], baseline: dict | None, regressions: List[str]) -> str:
+    from pintar.table import Table
+
+    base = (baseline or {}).get("results", {})
+    table = Table(["caso", "ops/s", "bytes/op", "MB/s", "vs base"], align=["<", ">", ">", ">", ">"])
+    for name, r in results.items():
+        delta = ""
+        if name in base:
+            delta = f"{(r.ops_per_sec / base[name]['ops_per_sec'] - 1) * 100:+.1f}%"
+            if name in regressions:
+                delta += " ✗"
+        table.add_row(name, f"{r.ops_per_sec:,.0f}", r.bytes_per_op, f"{r.bytes_per_sec / 1e6:.2f}", delta)
+    return table.render()
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pintar.bench", description=__doc__.splitlines()[1])
+    parser.add_argument("-b", "--baseline", default=DEFAULT_BASELINE, help="fichero JSON de línea base")
+    parser.add_argument("-t", "--threshold", type=float, default=None,
+                        help=f"caída máxima tolerada (fracción, por defecto la de la base o {DEFAULT_THRESHOLD})")
+    parser.add_argument("-k", "--filter", default=None, help="solo casos cuyo nombre contiene este texto")
+    parser.add_argument("--min-time", type=float, default=0.5, help="segundos por caso")
+    parser.add_argument("--save", action="store_true", help="guardar la medición como nueva línea base")
+    parser.add_argument("--vs-cat", type=int, metavar="MB", default=None,
+                        help="medir `python -m pintar` contra `cat` sobre un log de MB megabytes")
+    args = parser.parse_args(argv)
+
+    if args.vs_cat is not None:
+        rates = colorize_vs_cat(args.vs_cat)
+        for name, rate in rates.items():
+            ratio = f"  ({rate / rates['cat']:.1%} de cat)" if "cat" in rates and name != "cat" else ""
+            sys.stdout.write(f"{name:<8} {rate:10,.1f} MB/s{ratio}\n")
+        return 0
+
+    names = [n for n in BENCHMARKS if args.filter is None or args.filter in n]
+    results = run(names, min_time=args.min_time)
+
+    baseline = load_baseline(args.baseline)
+    threshold = args.threshold
+    if threshold is None:
+        threshold = (baseline or {}).get("threshold", DEFAULT_THRESHOLD)
+
+    regressions = compare(results, baseline, threshold) if baseline and not args.save else []
+    sys.stdout.write(_report(results, None if args.save else baseline, regressions) + "\n")
+
+    if args.save:
+        save_baseline(args.baseline, results, threshold)
+        sys.stdout.write(f"línea base guardada en {args.baseline}\n")
+        return 0
+    if regressions:
+        sys.stdout.write(f"regresión > {threshold:.0%} en: {', '.join(regressions)}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
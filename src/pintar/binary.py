@@ -0,0 +1,132 @@
+# modulo binary.py
+"""
+Salida binaria directa: escribe bytes en el buffer binario del stream (o en su
+descriptor) sin pasar por la codificación de `TextIOWrapper` en cada línea.
+
+    from pintar import ByteWriter, Brush
+
+    out = ByteWriter()                         # sys.stdout.buffer
+    buy = Brush("#0ECB81", style="bold")
+    for label in labels:
+        buy.write_to(out, label)               # prefijo, texto y sufijo sin concatenar
+        out.write(b"\\n")
+    out.flush()                                # una sola llamada os.writev
+
+Las escrituras pequeñas se acumulan en un `bytearray` reutilizable; los trozos
+grandes se encolan tal cual. `flush()` vuelca todo con `os.writev` (un único
+syscall por lote) o, si el stream no tiene descriptor, con un solo `write`.
+"""
+import io
+import os
+import sys
+
+# Trozos a partir de este tamaño no se copian al bytearray: van como iovec propio
+_DIRECT_BYTES = 16 * 1024
+
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, OSError, ValueError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+_HAS_WRITEV = hasattr(os, "writev")
+
+
+def _writev_all(fd: int, chunks: list) -> None:
+    """Escribe todos los `chunks` en `fd` con os.writev, reintentando escrituras parciales."""
+    i = 0
+    while i < len(chunks):
+        written = os.writev(fd, chunks[i:i + _IOV_MAX])
+        while i < len(chunks) and written >= len(chunks[i]):
+            written -= len(chunks[i])
+            i += 1
+        if written:
+            chunks[i] = memoryview(chunks[i])[written:]
+
+
+class ByteWriter:
+    """
+    Escritor por lotes sobre el buffer binario de un stream.
+
+    Parámetros
+    ──────────
+    stream     : stream de texto con `.buffer` o stream binario (default sys.stdout)
+    encoding   : codificación para los `str` recibidos (default la del stream o utf-8)
+    flush_at   : bytes pendientes a partir de los cuales `write` vuelca solo (0 = nunca)
+    """
+    def __init__(self, stream=None, encoding: str | None = None, flush_at: int = 64 * 1024) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.raw = getattr(self.stream, "buffer", self.stream)
+        if isinstance(self.raw, io.TextIOBase):
+            raise TypeError(f"{self.stream!r} no tiene buffer binario")
+        self.encoding = encoding or getattr(self.stream, "encoding", None) or "utf-8"
+        self.flush_at = flush_at
+        self._fd = self._fileno()
+        self._buffer = bytearray()
+        self._chunks: list = []
+        self._pending = 0
+
+    def _fileno(self) -> int | None:
+        if not _HAS_WRITEV:
+            return None
+        try:
+            return self.raw.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    @property
+    def pending(self) -> int:
+        """Bytes aceptados y aún no volcados."""
+        return self._pending
+
+    def write(self, data) -> int:
+        """Encola `data` (bytes, bytearray, memoryview o str) y devuelve su tamaño en bytes."""
+        if isinstance(data, str):
+            data = data.encode(self.encoding, "replace")
+        size = len(data)
+        if size >= _DIRECT_BYTES:
+            if self._buffer:
+                self._chunks.append(self._buffer)
+                self._buffer = bytearray()
+            self._chunks.append(data)
+        else:
+            self._buffer += data
+        self._pending += size
+        if self.flush_at and self._pending >= self.flush_at:
+            self.flush()
+        return size
+
+    def writelines(self, lines) -> None:
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        """Vuelca todo lo pendiente en un solo lote."""
+        if not self._pending:
+            return
+        chunks = self._chunks
+        if self._buffer:
+            chunks.append(self._buffer)
+        # Lo escrito antes por la capa de texto debe salir primero
+        if self.stream is not self.raw:
+            self.stream.flush()
+        if self._fd is not None:
+            self.raw.flush()
+            _writev_all(self._fd, chunks)
+        else:
+            self.raw.write(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+            self.raw.flush()
+        # Soltar los memoryview de escrituras parciales y reutilizar el bytearray
+        chunks.clear()
+        self._buffer.clear()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ByteWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
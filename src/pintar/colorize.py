@@ -0,0 +1,291 @@
+# modulo colorize.py
+"""
+Coloreado de flujos de texto arbitrarios: `python -m pintar`.
+
+    tail -f bot.log | python -m pintar
+    pytest 2>&1 | python -m pintar -r reglas.json
+
+Las reglas son patrón regex → estilo, con el mismo esquema de estilo que el
+JSON de temas de pintar (`config/pintar_custom_log_theme.json`):
+
+    {
+        "\\\\bERROR\\\\b":   {"fore_color": "#F6465D", "bg_color": null, "style": 1},
+        "\\\\d+\\\\.\\\\d+": {"fore_color": "#63B3ED", "bg_color": null, "style": null}
+    }
+
+`style` acepta un código SGR (1), una lista de códigos, un nombre ("bold",
+"bold+italic") o null. Ante dos reglas que empiezan en la misma posición gana
+la primera del archivo.
+
+Todas las reglas se compilan en una sola expresión regular de bytes: la
+entrada no se decodifica (\\w y \\d tienen semántica ASCII; los literales no
+ASCII del patrón se comparan en UTF-8) y se aplican línea a línea (^ y $
+son el principio y el fin de la línea). Se lee en trozos grandes, se procesa
+hasta el último salto de línea de cada trozo y entre coincidencias solo se
+emite la transición SGR mínima (`Style.transition`): dos coincidencias
+seguidas con el mismo estilo comparten apertura y nunca queda un estilo
+abierto al final de una línea. Una línea incompleta espera a su salto de
+línea (o al final del flujo).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from operator import itemgetter
+
+from .ansiparse import PLAIN, Style, _ATTR_ON
+from .colors import parse_color
+
+# Tamaño de lectura; las tuberías devuelven lo que tengan disponible (hasta 64 KiB)
+CHUNK_SIZE = 1 << 20
+# Una "línea" sin salto más larga que esto se procesa igualmente
+MAX_LINE = 1 << 20
+
+# Forma de una línea para la caché de planes: dígitos normalizados a 0
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_DIGITS = range(ord("0"), ord("9") + 1)
+_MISSING = object()
+
+_STYLE_NAMES = {
+    "bold": 1, "dim": 2, "italic": 3, "underline": 4, "blink": 5,
+    "reverse": 7, "hidden": 8, "strike": 9, "strikethrough": 9,
+}
+
+# Reglas por defecto: niveles de log, fechas/horas y números
+DEFAULT_RULES: dict[str, dict] = {
+    r"\b(?:ERROR|CRITICAL|FATAL|FAIL(?:ED|URE)?|Traceback)\b": {"fore_color": "#F6465D", "bg_color": None, "style": 1},
+    r"\bWARN(?:ING)?\b":                                      {"fore_color": "#F59E0B", "bg_color": None, "style": 1},
+    r"\b(?:INFO|OK|PASS(?:ED)?|SUCCESS)\b":                   {"fore_color": "#0ECB81", "bg_color": None, "style": 1},
+    r"\b(?:DEBUG|TRACE)\b":                                   {"fore_color": "#718096", "bg_color": None, "style": None},
+    r"\b\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:[.,]\d+)?\b":     {"fore_color": "#4A5568", "bg_color": None, "style": None},
+    r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?![\w.])":                 {"fore_color": "#63B3ED", "bg_color": None, "style": None},
+}
+
+
+def _color(value):
+    """Color del JSON (hex, nombre, "rgb(…)", [r, g, b] o índice 0-255) → color de Style."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, list):
+        value = tuple(value)
+    rgb = parse_color(value)
+    return rgb.r, rgb.g, rgb.b
+
+
+def style_from_spec(spec: dict) -> Style:
+    """Convierte {"fore_color", "bg_color", "style"} del JSON de temas en un Style."""
+    codes = spec.get("style")
+    if codes is None:
+        codes = []
+    elif isinstance(codes, str):
+        codes = [_STYLE_NAMES[name.strip().lower()] for name in codes.split("+")]
+    elif isinstance(codes, int):
+        codes = [codes]
+    attrs = 0
+    for code in codes:
+        attrs |= _ATTR_ON[int(code)]
+    return Style(_color(spec.get("fore_color")), _color(spec.get("bg_color")), attrs)
+
+
+def load_rules(path: str) -> dict[str, Style]:
+    """Lee un archivo JSON de reglas patrón → estilo."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: se esperaba un objeto patrón → estilo")
+    return {pattern: style_from_spec(spec) for pattern, spec in data.items()}
+
+
+class Colorizer:
+    """
+    Colorea trozos de bytes con un conjunto de reglas.
+
+    Parámetros
+    ──────────
+    rules      : patrón → Style (o dict de estilo del JSON de temas).
+                 None usa DEFAULT_RULES.
+    cache_size : planes de línea recordados (se vacía al llenarse).
+
+    Cada línea se colorea con un *plan*, como los del Highlighter del
+    logging: un itemgetter de slices y una plantilla % con las transiciones
+    SGR ya insertadas, cacheado por la forma de la línea. Si ninguna regla
+    distingue dígitos (sin dígitos literales ni rangos parciales de 0-9) la
+    forma es la línea con los dígitos a 0, y las líneas de un mismo log (que
+    solo cambian en fechas, precios e ids) comparten plan; si no, la forma es
+    la línea tal cual.
+
+    `feed(chunk)` devuelve los bytes coloreados de las líneas completas y
+    guarda el resto; `close()` devuelve lo que quede pendiente.
+    """
+    def __init__(self, rules: dict | None = None, cache_size: int = 4096) -> None:
+        if rules is None:
+            rules = DEFAULT_RULES
+        self.rules = {
+            pattern: style if isinstance(style, Style) else style_from_spec(style)
+            for pattern, style in rules.items()
+        }
+        # Un grupo con nombre por regla: lastgroup identifica la regla que coincidió
+        self._styles = {f"r{i}": style for i, style in enumerate(self.rules.values())}
+        self._regex = re.compile(b"|".join(
+            b"(?P<r%d>%s)" % (i, pattern.encode("utf-8")) for i, pattern in enumerate(self.rules)
+        )) if self.rules else None
+        self._digit_invariant = all(_digit_invariant(pattern) for pattern in self.rules)
+        self.cache_size = cache_size
+        self._plans: dict = {}
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Colorea las líneas completas de `chunk` (más lo pendiente del trozo anterior)."""
+        data = self._pending + chunk if self._pending else chunk
+        end = data.rfind(b"\n") + 1
+        if not end:
+            if len(data) < MAX_LINE:
+                self._pending = data
+                return b""
+            end = len(data)
+        self._pending = data[end:]
+        return self._render(data[:end] if end < len(data) else data)
+
+    def close(self) -> bytes:
+        """Colorea la última línea, aunque no termine en salto de línea."""
+        data, self._pending = self._pending, b""
+        return self._render(data) if data else b""
+
+    def _render(self, block: bytes) -> bytes:
+        if self._regex is None:
+            return block
+        lines = block.split(b"\n")
+        shapes = block.translate(_DIGITS_TO_ZERO).split(b"\n") if self._digit_invariant else lines
+        plans = self._plans
+        get = plans.get
+        out = []
+        append = out.append
+        for line, shape in zip(lines, shapes):
+            plan = get(shape, _MISSING)
+            if plan is _MISSING:
+                if len(plans) >= self.cache_size:
+                    plans.clear()
+                plan = plans[shape] = self._plan(shape)
+            append(line if plan is None else plan[1] % plan[0](line))
+        return b"\n".join(out)
+
+    def _plan(self, shape: bytes) -> "tuple[itemgetter, bytes] | None":
+        """Escanea una línea y devuelve (slices a extraer, plantilla %); None si no hay coincidencias."""
+        styles = self._styles
+        cuts, fmt = [], []
+        current = PLAIN
+        pos = 0
+        for m in self._regex.finditer(shape):
+            start, stop = m.span()
+            if start == stop:
+                continue
+            if start > pos:
+                if current is not PLAIN:
+                    fmt.append(_sgr(current, PLAIN))
+                    current = PLAIN
+                cuts.append(slice(pos, start))
+                fmt.append(b"%s")
+            style = styles[m.lastgroup]
+            if style != current:
+                fmt.append(_sgr(current, style))
+                current = style
+            cuts.append(slice(start, stop))
+            fmt.append(b"%s")
+            pos = stop
+        if not cuts:
+            return None
+        # Ningún estilo queda abierto al final de la línea
+        if current is not PLAIN:
+            fmt.append(_sgr(current, PLAIN))
+        if pos < len(shape):
+            cuts.append(slice(pos, None))
+            fmt.append(b"%s")
+        if len(cuts) == 1:
+            cut = cuts[0]
+            return (lambda line: (line[cut],)), b"".join(fmt)
+        return itemgetter(*cuts), b"".join(fmt)
+
+
+@lru_cache(maxsize=4096)
+def _sgr(current: Style, target: Style) -> bytes:
+    return current.transition(target).encode("ascii")
+
+
+def _digit_invariant(pattern: str) -> bool:
+    """True si cambiar cualquier dígito por otro no altera dónde coincide `pattern`."""
+    try:
+        from re import _parser
+    except ImportError:   # implementación sin el parser de sre
+        return False
+    return _no_digit_literals(_parser.parse(pattern), _parser)
+
+
+def _no_digit_literals(items, parser) -> bool:
+    for op, av in items:
+        if op in (parser.LITERAL, parser.NOT_LITERAL):
+            if av in _DIGITS:
+                return False
+        elif op is parser.IN:
+            for item_op, item_av in av:
+                if item_op is parser.LITERAL and item_av in _DIGITS:
+                    return False
+                if item_op is parser.RANGE:
+                    lo, hi = item_av
+                    # Un rango debe cubrir todos los dígitos o ninguno
+                    if lo <= ord("9") and hi >= ord("0") and not (lo <= ord("0") and hi >= ord("9")):
+                        return False
+        elif op is parser.GROUPREF_EXISTS:
+            if not all(_no_digit_literals(branch, parser) for branch in av[1:] if branch is not None):
+                return False
+        else:
+            for sub in av if isinstance(av, (tuple, list)) else ():
+                if isinstance(sub, parser.SubPattern) and not _no_digit_literals(sub, parser):
+                    return False
+                if isinstance(sub, list) and not all(
+                        _no_digit_literals(branch, parser) for branch in sub if isinstance(branch, parser.SubPattern)):
+                    return False
+    return True
+
+
+def colorize_fd(colorizer: Colorizer, infd: int, outfd: int, chunk_size: int = CHUNK_SIZE) -> int:
+    """Colorea de `infd` a `outfd` hasta fin de fichero. Devuelve los bytes leídos."""
+    total = 0
+    while True:
+        chunk = os.read(infd, chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        _write_all(outfd, colorizer.feed(chunk))
+    _write_all(outfd, colorizer.close())
+    return total
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pintar", description=__doc__.splitlines()[1])
+    parser.add_argument("-r", "--rules", default=None,
+                        help="archivo JSON de reglas patrón → estilo (default: niveles, fechas y números)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="bytes por lectura")
+    args = parser.parse_args(argv)
+
+    colorizer = Colorizer(load_rules(args.rules) if args.rules else None)
+    sys.stdout.flush()
+    try:
+        colorize_fd(colorizer, sys.stdin.fileno(), sys.stdout.fileno(), args.chunk_size)
+    except BrokenPipeError:
+        # `python -m pintar < log | head`: el lector se fue, no es un error
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
@@ -1,9 +1,24 @@
 # modulo colors.py
 import colorsys
-from re import match
 from abc import ABCMeta, abstractmethod, abstractclassmethod
+from functools import lru_cache
 from math import sqrt
 
+from . import _instrument
+
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+# Linealización sRGB (IEC 61966-2-1, la que usa WCAG) de cada valor de canal 0-255
+_SRGB_LINEAR = tuple(
+    c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    for c in (v / 255 for v in range(256))
+)
+
+
+def _is_hex_digits(text: str) -> bool:
+    """True si `text` no está vacío y solo contiene dígitos hexadecimales."""
+    return bool(text) and not text.strip(_HEX_DIGITS)
+
 class Color(metaclass=ABCMeta):
     """Clase base abstracta para representar colores genéricos."""
 
@@ -171,15 +186,15 @@ class RGB(Color):
     @classmethod
     def from_hex_string(cls, hex_string: str) -> 'RGB':
         """Crea un RGB desde una cadena hexadecimal (#RRGGBB o #RRGGBBAA)."""
-        if isinstance(hex_string, str):
-            if match(r"#([\da-fA-F]{2}){3,4}\Z", hex_string):
+        if isinstance(hex_string, str) and hex_string[:1] == "#" and _is_hex_digits(hex_string[1:]):
+            if len(hex_string) in (7, 9):
                 r = int(hex_string[1:3], 16)
                 g = int(hex_string[3:5], 16)
                 b = int(hex_string[5:7], 16)
                 a = int(hex_string[7:9], 16) / 255.0 if len(hex_string) > 7 else 1.0
                 return RGB(r, g, b, a)
 
-            if match(r"#[\da-fA-F]{3,4}\Z", hex_string):
+            if len(hex_string) in (4, 5):
                 r = int(hex_string[1] * 2, 16)
                 g = int(hex_string[2] * 2, 16)
                 b = int(hex_string[3] * 2, 16)
@@ -267,8 +282,8 @@ class RGB(Color):
 
     @property
     def luminance(self) -> float:
-        """Calcula la luminancia percibida."""
-        return (0.2126*self.r**2.2 + 0.7152*self.g**2.2 + 0.0722*self.b**2.2) / 255**2.2
+        """Luminancia relativa WCAG (sRGB linealizado): 0 = negro, 1 = blanco."""
+        return relative_luminance(self.r, self.g, self.b)
 
     @property
     def rgb_tuple(self) -> tuple:
@@ -374,7 +389,7 @@ class HEX(Color):
         # Validar y normalizar el formato
         hex_part = value[1:]  # Remover el '#'
         
-        if not match(r'^[\da-fA-F]+$', hex_part):
+        if not _is_hex_digits(hex_part):
             raise ValueError(f"'{value}' contiene caracteres no hexadecimales")
         
         length = len(hex_part)
@@ -547,4 +562,193 @@ class HEX(Color):
         return self._value.lower()
 
 
+# ==============================
+# Parseo unificado de colores
+# ==============================
+
+def _css_params(params: str) -> list[float]:
+    """Convierte '120, 100%, 50%' en [120.0, 1.0, 0.5]."""
+    values = []
+    for p in params.split(','):
+        p = p.strip()
+        values.append(float(p[:-1]) / 100.0 if p.endswith('%') else float(p))
+    return values
+
+
+def _unit(value: float) -> float:
+    return min(max(value, 0.0), 1.0)
+
+
+def _parse_css_function(text: str) -> 'RGB':
+    """
+    Parsea 'rgb(…)', 'rgba(…)', 'hsl(…)' o 'hsla(…)'. Como en CSS, los valores
+    fuera de rango se recortan: canales a 0-255, alfa, saturación y luminosidad
+    a 0-1, y el tono da la vuelta a 360.
+    """
+    name, _, rest = text.partition('(')
+    name = name.strip().lower()
+    if not rest.endswith(')'):
+        raise ValueError(f"'{text}' no es un color CSS válido.")
+    inner = rest[:-1]
+    values = _css_params(inner)
+
+    if name in ('rgb', 'rgba') and len(values) in (3, 4):
+        # Los canales en porcentaje llegan como fracción 0-1
+        channels = [
+            min(max(round(v * 255) if p.strip().endswith('%') else int(v), 0), 255)
+            for v, p in zip(values[:3], inner.split(','))
+        ]
+        return RGB(*channels, _unit(values[3]) if len(values) == 4 else 1.0)
+    if name in ('hsl', 'hsla') and len(values) in (3, 4):
+        h, s, l = values[:3]
+        return HSL(h % 360, _unit(s), _unit(l), _unit(values[3]) if len(values) == 4 else 1.0).to_rgb()
+    raise ValueError(f"'{text}' no es un color CSS válido.")
+
+
+def _parse_named(text: str) -> 'RGB':
+    from ._util import COLORS
+
+    hex_string = getattr(COLORS, text.strip().upper().replace(' ', '_').replace('-', '_'), None)
+    if not isinstance(hex_string, str):
+        raise ValueError(f"'{text}' no es un color reconocido.")
+    return RGB.from_hex_string(hex_string)
+
+
+def _parse_color_value(value) -> 'RGB':
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('#'):
+            return RGB.from_hex_string(text)
+        if '(' in text:
+            return _parse_css_function(text)
+        return _parse_named(text)
+    if isinstance(value, bool):
+        raise TypeError(f"Color no soportado: {value!r}")
+    if isinstance(value, int):
+        return RGB.from_ansi_index(value)
+    if isinstance(value, (tuple, list)):
+        return RGB.from_tuple(tuple(value))
+    raise TypeError(f"Color no soportado: {value!r}")
+
+
+@lru_cache(maxsize=1024)
+def _parse_color_cached(value) -> tuple:
+    # Se cachean tuplas inmutables: cada llamada recibe su propio RGB
+    rgb = _parse_color_value(value)
+    return rgb.r, rgb.g, rgb.b, rgb.a
+
+
+# Resultados ya parseados: los colores de temas y markup se repiten muchísimo
+_instrument.register_cache("color.parse", _parse_color_cached)
+
+
+def parse_color(value) -> 'RGB | None':
+    """
+    Normaliza cualquier color aceptado por pintar a RGB.
+
+        None                      → None
+        RGB                       → el mismo objeto
+        HEX / HSL / otro Color    → .to_rgb()
+        "#F00", "#FF0000", "#FF000080"
+        "rgb(255, 0, 0)", "rgba(255, 0, 0, 0.5)", "hsl(120, 100%, 50%)"
+        "red", "light_red", "dark gray"   (nombres de _util.COLORS)
+        (255, 0, 0) / (255, 0, 0, 0.5)
+        int 0-255                 → índice ANSI de 256 colores
+
+    Los resultados de str, tuple e int se guardan en una caché LRU acotada de
+    tuplas; cada llamada devuelve un RGB nuevo que puede modificarse.
+    Lanza ValueError o TypeError si el valor no es un color válido.
+    """
+    if value is None:
+        return None
+    if _instrument._enabled:
+        _instrument.count("color.parse")
+    if isinstance(value, RGB):
+        return value
+    if isinstance(value, Color):
+        return value.to_rgb()
+    if isinstance(value, list):
+        return _parse_color_value(value)
+    return RGB(*_parse_color_cached(value))
+
+
+# ==============================
+# Contraste (WCAG 2.x)
+# ==============================
+
+# Candidatos por defecto de best_foreground: texto blanco o negro
+DEFAULT_FOREGROUNDS = ("#FFFFFF", "#000000")
+
+
+@lru_cache(maxsize=4096)
+def relative_luminance(r: float, g: float, b: float) -> float:
+    """Luminancia relativa WCAG de un color sRGB (canales 0-255)."""
+    if r.__class__ is int and g.__class__ is int and b.__class__ is int and 0 <= min(r, g, b) and max(r, g, b) <= 255:
+        return 0.2126 * _SRGB_LINEAR[r] + 0.7152 * _SRGB_LINEAR[g] + 0.0722 * _SRGB_LINEAR[b]
+    r, g, b = (min(max(c / 255, 0.0), 1.0) for c in (r, g, b))
+    r, g, b = (c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in (r, g, b))
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+_instrument.register_cache("color.luminance", relative_luminance)
+
+
+def _luminance_of(color) -> float:
+    # Camino rápido para str/tuple/int: la caché de parse_color sin crear un RGB
+    if isinstance(color, (str, tuple, int)) and not isinstance(color, bool):
+        r, g, b, _ = _parse_color_cached(color)
+    else:
+        rgb = parse_color(color)
+        r, g, b = rgb.r, rgb.g, rgb.b
+    return relative_luminance(r, g, b)
+
+
+def contrast_ratio(a, b) -> float:
+    """Relación de contraste WCAG entre dos colores (1 a 21). 4.5 es el mínimo AA para texto."""
+    la, lb = _luminance_of(a), _luminance_of(b)
+    if la < lb:
+        la, lb = lb, la
+    return (la + 0.05) / (lb + 0.05)
+
+
+@lru_cache(maxsize=256)
+def _extremes(candidates: tuple) -> tuple:
+    """
+    (oscuro, claro, umbral) de un conjunto de candidatos.
+
+    El contraste crece con la distancia en luminancia, así que el mejor
+    candidato para cualquier fondo es el más oscuro o el más claro: el oscuro
+    gana cuando (L + 0.05)² >= (Lo + 0.05)(Lc + 0.05). Elegir es comparar la
+    luminancia del fondo con un umbral.
+    """
+    if not candidates:
+        raise ValueError("best_foreground necesita al menos un candidato")
+    lums = [_luminance_of(c) for c in candidates]
+    dark = min(range(len(lums)), key=lums.__getitem__)
+    light = max(range(len(lums)), key=lums.__getitem__)
+    threshold = sqrt((lums[dark] + 0.05) * (lums[light] + 0.05)) - 0.05
+    return candidates[dark], candidates[light], threshold
+
+
+def best_foreground(bg, candidates: tuple = DEFAULT_FOREGROUNDS):
+    """
+    Candidato con mayor contraste WCAG sobre el fondo `bg` (devuelto tal cual
+    se pasó). `candidates` debe ser hashable (tupla de colores).
+
+        best_foreground("#9B2335")                       → "#FFFFFF"
+        best_foreground("#F59E0B", ("#E2E8F0", "#1A202C")) → "#1A202C"
+    """
+    dark, light, threshold = _extremes(tuple(candidates))
+    return dark if _luminance_of(bg) >= threshold else light
+
+
+def best_foregrounds(backgrounds, candidates: tuple = DEFAULT_FOREGROUNDS) -> list:
+    """
+    best_foreground para muchos fondos a la vez (celdas de una tabla, un
+    heatmap): los candidatos se resuelven una vez y cada fondo cuesta una
+    consulta de caché y una comparación.
+    """
+    dark, light, threshold = _extremes(tuple(candidates))
+    lum = _luminance_of
+    return [dark if lum(bg) >= threshold else light for bg in backgrounds]
 
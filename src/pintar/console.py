@@ -0,0 +1,204 @@
+# modulo console.py
+"""
+Consola compartida entre hilos: líneas completas y atómicas, sin estilos que
+se filtren de un hilo a otro.
+
+    from pintar.console import console
+
+    console.write("[bold]precio[/] ")        # se acumula en el buffer del hilo
+    console.write("45230.5\\n")               # la línea completa sale de una vez
+
+Cada hilo acumula lo que escribe en su propio buffer, sin bloquear a nadie; el
+formateo (pstr, dye) también ocurre fuera del cerrojo. Solo cuando el buffer
+contiene líneas completas se toma el cerrojo para escribirlas y vaciar el
+stream: la sección crítica es una escritura y un flush. `pintar.print` con un
+`end` sin salto de línea (progreso, prompts) publica en el acto, como print.
+
+Cuando un hilo termina, su buffer y su estilo abierto pasan a la consola: lo
+que dejó a medias se publica en la siguiente escritura (o al salir del
+programa) y su estilo se cierra.
+
+`dye.start()` / `dye.end()` pasan por aquí: la consola recuerda qué hilo dejó
+un estilo abierto en el terminal, y las líneas de los demás hilos se escriben
+con un reset delante y el estilo ajeno restaurado detrás.
+
+`pintar.print` usa la consola por defecto `console`.
+"""
+import atexit
+import sys
+import threading
+import weakref
+
+_RESET = "\033[0m"
+
+
+class _ThreadBuffer:
+    __slots__ = ("parts", "__weakref__")
+
+    def __init__(self) -> None:
+        self.parts: list = []
+
+
+class Console:
+    """
+    Publicador de líneas atómico.
+
+    Parámetros
+    ──────────
+    stream : stream de texto destino. None = `sys.stdout` resuelto en cada
+             publicación (respeta redirecciones posteriores).
+    flush  : vaciar el stream tras cada publicación (default True, como print).
+    """
+    def __init__(self, stream=None, flush: bool = True) -> None:
+        self._stream = stream
+        self.flush_each = flush
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Buffers de los hilos vivos; los de hilos terminados llegan a _orphans
+        # (su lista de partes) desde un finalizador, sin tomar el cerrojo
+        self._buffers = weakref.WeakSet()
+        self._orphans: list = []
+        # Estilos abiertos con dye.start por hilo (clave: id de la lista de partes
+        # del hilo, que no se reutiliza mientras siga aquí); el último rige en el terminal
+        self._styles: dict = {}
+
+    @property
+    def stream(self):
+        return self._stream if self._stream is not None else sys.stdout
+
+    def _buffer(self) -> _ThreadBuffer:
+        try:
+            return self._local.buffer
+        except AttributeError:
+            buffer = self._local.buffer = _ThreadBuffer()
+            weakref.finalize(buffer, self._orphans.append, buffer.parts)
+            with self._lock:
+                self._buffers.add(buffer)
+            return buffer
+
+    # ==============================
+    # Escritura
+    # ==============================
+
+    def write(self, text: str) -> int:
+        """Añade `text` al buffer del hilo y publica las líneas que queden completas."""
+        cut = text.rfind("\n")
+        parts = self._buffer().parts
+        if cut == -1:
+            parts.append(text)
+            return len(text)
+        if parts:
+            parts.append(text[:cut + 1])
+            block = "".join(parts)
+            parts.clear()
+        else:
+            block = text[:cut + 1]
+        if cut + 1 < len(text):
+            parts.append(text[cut + 1:])
+        self._publish(block, id(parts))
+        return len(text)
+
+    def flush(self) -> None:
+        """Publica también la línea incompleta del hilo actual."""
+        if not self._flush_pending():
+            with self._lock:
+                self._adopt_orphans()
+                self.stream.flush()
+
+    def _flush_pending(self) -> bool:
+        parts = self._buffer().parts
+        if not parts:
+            return False
+        block = "".join(parts)
+        parts.clear()
+        self._publish(block, id(parts))
+        return True
+
+    def flush_all(self) -> None:
+        """Publica lo pendiente de todos los hilos, vivos y terminados (al salir del programa)."""
+        with self._lock:
+            self._adopt_orphans()
+            for buffer in list(self._buffers):
+                parts = buffer.parts
+                if parts:
+                    block = "".join(parts)
+                    parts.clear()
+                    self._write(block, id(parts))
+            self.stream.flush()
+
+    def print(self, *args, sep: str = " ", end: str = "\n", flush: bool = False) -> None:
+        """Como `pintar.print`, publicando a través de esta consola."""
+        from .core import pstr
+
+        text = sep.join(str(arg) for arg in args)
+        # El markup se resuelve fuera del cerrojo
+        self.write((pstr(text).string_format if args else "") + end)
+        if flush or "\n" not in end:
+            self.flush()
+
+    def _publish(self, block: str, key: int) -> None:
+        with self._lock:
+            if self._orphans:
+                self._adopt_orphans()
+            self._write(block, key)
+            if self.flush_each:
+                self.stream.flush()
+
+    def _write(self, block: str, key: int) -> None:
+        # Con el cerrojo tomado
+        styles = self._styles
+        if styles:
+            owner, sgr = next(reversed(styles.items()))
+            if owner != key:
+                # El terminal tiene abierto el estilo de otro hilo: aislar el bloque
+                # (con el estilo propio del hilo, si tiene uno) y restaurar el ajeno
+                block = f"{_RESET}{styles.get(key, '')}{block}{_RESET}{sgr}"
+        self.stream.write(block)
+
+    def _adopt_orphans(self) -> None:
+        """Publica lo que dejaron a medias los hilos terminados y cierra sus estilos (con el cerrojo tomado)."""
+        orphans = self._orphans
+        while orphans:
+            parts = orphans.pop(0)
+            key = id(parts)
+            if parts:
+                self._write("".join(parts), key)
+                parts.clear()
+            styles = self._styles
+            if key in styles:
+                current = next(reversed(styles))
+                del styles[key]
+                if current == key:
+                    self.stream.write(_RESET + (next(reversed(styles.values())) if styles else ""))
+
+    # ==============================
+    # Estado de estilo (dye.start / dye.end)
+    # ==============================
+
+    def start_style(self, sgr: str) -> None:
+        """Abre `sgr` en el terminal a nombre del hilo actual, tras publicar lo que tenga pendiente."""
+        self._flush_pending()
+        key = id(self._buffer().parts)
+        with self._lock:
+            self._adopt_orphans()
+            self._styles.pop(key, None)
+            self._styles[key] = sgr
+            stream = self.stream
+            stream.write(sgr)
+            stream.flush()
+
+    def end_style(self, reset: str = _RESET) -> None:
+        """Cierra el estilo del hilo actual y restaura el de otro hilo si sigue abierto."""
+        self._flush_pending()
+        key = id(self._buffer().parts)
+        with self._lock:
+            self._adopt_orphans()
+            self._styles.pop(key, None)
+            restore = next(reversed(self._styles.values()), "") if self._styles else ""
+            stream = self.stream
+            stream.write(reset + restore)
+            stream.flush()
+
+
+console = Console()
+atexit.register(console.flush_all)
@@ -4,26 +4,104 @@
 
 import re
 import sys
+from array import array
+from functools import lru_cache
 from typing import Tuple, List, Any, Union
-from .colors import RGB, Color, HEX, HSL
+from .colors import RGB, Color, HEX, HSL, parse_color, _css_params, _parse_color_cached
 from .ansi import FORE, BACK, STYLE
+from ._util import ANSI_RE, strip_ansi, parse_str_format_spec, pad_visible
+from .width import display_width
+from .console import console as _console
+from . import _instrument
+
+# Secuencias neutras: dentro de un dye anidado se sustituyen por los colores del exterior
+_RAW_IN_TEXT = "\033[39m"   # Reset foreground color    | si falla: probar con 50m (que no hace nada)
+_RAW_IN_BG = "\033[49m"     # Reset background (neutro) | si falla: probar con 51m (que no hace nada)
+_RAW_IN_STYLE = "\033[22m"  # Reset bold/dim (neutro)   | si falla: probar con 52m (que no hace nada)
+_RAW_SEQUENCE = _RAW_IN_TEXT + _RAW_IN_BG + _RAW_IN_STYLE
+_ALL_OUT = "\033[0m"
+_DYE_TAIL = _ALL_OUT + _RAW_SEQUENCE
+# Secuencia tal como la delimitaba el preprocesado original: de '\x1b[' a la siguiente 'm'
+_DYE_ESCAPE_RE = re.compile(r"\x1b\[[^m]*m?")
+
 
 class dye:
-    """Dar color a una cadena de texto con códigos ANSI."""
+    """
+    Dar color a una cadena de texto con códigos ANSI.
+
+    Representación compacta: el dye guarda solo el texto, el estilo recibido y
+    una referencia a su *pintura* (colores y secuencias), que comparten todos
+    los dye con los mismos colores. La cadena con escapes se construye en el
+    primer acceso a `string_format` y se reutiliza; `clean` reutiliza `string`
+    cuando no hay escapes propios y los desplazamientos de las secuencias para
+    cortar con [] se guardan como array('I') solo si se corta. Asignar
+    `string` o `style` descarta todo lo derivado.
+    """
+    __slots__ = ("_string", "_style", "_paint", "_format", "_clean", "_bytes", "_spans")
+
     def __init__(self, string: Union[str, 'dye'] , fore: str | Color = None, bg: Color = None, style: int | Color = None):
+        # Un dye anidado aporta su texto ya formateado (str() → string_format)
+        self._string = str(string)
+        self._style = style
+        self._paint = _dye_paint(
+            _color_rgba(fore),
+            _color_rgba(bg),
+            tuple(style) if isinstance(style, list) else style,
+        )
+        self._format = None
+        self._clean = None
+        self._bytes = None
+        self._spans = None
 
-        if isinstance(string, dye):
-            self.string = string.string_format
-        print("BBB", fore, type(fore))
-        self.string = str(string)
-        self.fore = dye._process_color_parameter(fore) # -> RGB 
-        self.bg = dye._process_color_parameter(bg) # -> RGB 
-        self.style = style 
+    @property
+    def string(self) -> str:
+        return self._string
 
-        self.string_format = self.get_string_format()
+    @string.setter
+    def string(self, value: str) -> None:
+        self._string = value
+        self._format = self._clean = self._bytes = self._spans = None
+
+    @property
+    def style(self):
+        return self._style
+
+    @style.setter
+    def style(self, value) -> None:
+        paint = self._paint
+        self._style = value
+        self._paint = _dye_paint(paint[0], paint[1], tuple(value) if isinstance(value, list) else value)
+        self._format = self._clean = self._bytes = self._spans = None
+
+    @property
+    def fore(self) -> 'RGB | None':
+        rgba = self._paint[0]
+        return None if rgba is None else RGB(*rgba)
+
+    @property
+    def bg(self) -> 'RGB | None':
+        rgba = self._paint[1]
+        return None if rgba is None else RGB(*rgba)
+
+    @property
+    def string_format(self) -> str:
+        text = self._format
+        if text is None:
+            text = self._format = self.get_string_format()
+        return text
 
     def __format__(self, format_spec):
-        return format(self.string_format, format_spec)
+        if not format_spec:
+            return self.string_format
+
+        # Alinear sobre el ancho visible: los escapes ANSI no ocupan columnas
+        spec = parse_str_format_spec(format_spec)
+        if spec is None:
+            return format(self.string_format, format_spec)
+
+        fill, align, width, precision = spec
+        target = self if precision is None else self[:precision]
+        return pad_visible(target.string_format, len(target), width, align, fill)
 
     def __repr__(self):
         return f"{self.string_format!r}"
@@ -31,37 +109,52 @@ class dye:
     def __str__(self):
         return self.string_format
 
+    def __bytes__(self):
+        # Se codifica una vez y se reutiliza en cada escritura binaria
+        if self._bytes is None:
+            self._bytes = self.string_format.encode()
+        return self._bytes
+
     def __len__(self):
-        return len(self.clean)
+        # Columnas de terminal, no code points: CJK y emoji ocupan dos
+        return display_width(self.clean)
 
     def __getitem__(self, index):
-        # Asegurarse de que el texto formateado esté preprocesado
-        if not hasattr(self, 'clean_indexes'):
-            self._preprocessing_text()
+        # Corta sobre los caracteres visibles conservando todas las secuencias ANSI
+        text = self.string_format
+        spans = self._spans
+        if spans is None:
+            # Pares (inicio, fin) de cada secuencia, 8 bytes por secuencia
+            spans = self._spans = array('I')
+            for match in _DYE_ESCAPE_RE.finditer(text):
+                spans.extend(match.span())
 
         # Convertir el índice en un slice si es necesario
         if not isinstance(index, slice):
             index = slice(index, index + 1, 1)
 
-        # Manejar valores por defecto del slice
+        # Valores por defecto del slice como siempre: inicio 0 y fin el largo visible, también con paso negativo
+        visible = len(text) - sum(spans[1::2]) + sum(spans[0::2])
         start = index.start if index.start is not None else 0
-        stop = index.stop if index.stop is not None else len(self.clean_indexes)
+        stop = index.stop if index.stop is not None else visible
         step = index.step if index.step is not None else 1
+        selected = range(*slice(start, stop, step).indices(visible))
+        # Los caracteres elegidos salen siempre en el orden del texto
+        if selected.step < 0:
+            selected = selected[::-1]
 
-        # Generar los índices limpios seleccionados por el slice
-        clean_selected_indexes = list(range(len(self.clean_indexes)))[start:stop:step]
-        clean_selected_set = set(clean_selected_indexes)
-
-        # Reconstruir el texto incluyendo ANSI y caracteres limpios seleccionados
         result = []
-        for i, (is_ansi, clean_idx) in enumerate(self.char_info):
-            if is_ansi:
-                result.append(self.original_string_format[i])
-            else:
-                if clean_idx in clean_selected_set:
-                    result.append(self.original_string_format[i])
-        final_result = ''.join(result)
-        return dye(final_result, self.fore_ansi_sec, self.bg_ansi_sec, self.style_ansi_sec)
+        pos = clean = 0
+        for k in range(0, len(spans), 2):
+            start, end = spans[k], spans[k + 1]
+            if start > pos:
+                result.append(_pick_visible(text, pos, start, clean, selected))
+                clean += start - pos
+            result.append(text[start:end])
+            pos = end
+        if pos < len(text):
+            result.append(_pick_visible(text, pos, len(text), clean, selected))
+        return dye(''.join(result), self.fore, self.bg, self.style)
 
     def __iter__(self):
         return iter(self.clean)
@@ -103,7 +196,7 @@ class dye:
         if ret: 
             return ansi
         else: 
-            print(ansi, end="")
+            _console.start_style(ansi)
 
     @classmethod
     def end(cls, repr=False):
@@ -111,7 +204,7 @@ class dye:
         if repr: 
             return ansi
         else: 
-            print(ansi, end="") #  = "\033[39m" "\033[49m" "\033[22m"
+            _console.end_style(ansi) #  = "\033[39m" "\033[49m" "\033[22m"
 
     @classmethod
     def palette(cls):
@@ -169,136 +262,449 @@ class dye:
         # self.string_format = self.get_string_format()
 
     def get_string_format(self):
-        
-        self.fore_ansi_sec = self._color_to_ansi_rgb_seccion(self.fore)
-        self.bg_ansi_sec = self._color_to_ansi_rgb_seccion(self.bg)
-        self.style_ansi_sec = self._style_to_ansi_seccion(self.style)
-
-        # Preparar la seuencia ANSI par cada formato de estilo 
-        ansi_text_format = ""
-        ansi_bg_format = ""
-        ansi_style_format = ""
-
-        # Construir la secuencia de escape ANSI
-        if self.fore_ansi_sec is not None:
-            ansi_text_format += f"\033[38;{"5" if self.fore_ansi_sec.isalnum() else "2"};{self.fore_ansi_sec}m" 
-        if self.bg_ansi_sec is not None:
-            ansi_bg_format += f"\033[48;{"5" if self.bg_ansi_sec.isalnum() else "2"};{self.bg_ansi_sec}m"
-        if self.style_ansi_sec is not None:
-            ansi_style_format += f"\033[{self.style_ansi_sec}m" 
-
-        # CREAR UN NUEVO SISTEMA CON CAPACIDAD DE DETECTAR SI ES rawin de fondo de texto o estilo y usar replace para cambiarlos con "[6m, [7m, [8m"
-        # Código para resetear los estilos y colores
-        # Usar códigos únicos como placeholders
-        raw_in_text     =  "\033[39m"  # Reset foreground color    | si falla: probar con 50m (que no hace nada)
-        raw_in_bg       =  "\033[49m"  # Reset background (neutro) | si falla: probar con 51m (que no hace nada)
-        raw_in_style    =  "\033[22m"  # Reset bold/dim (neutro)   | si falla: probar con 52m (que no hace nada)
-        raw_sequence  = raw_in_text + raw_in_bg + raw_in_style
-
-        all_out    = "\033[0m"
-
-        # Agregar los delimitadores de 'raw_in' y 'all_out'
-        string_format = raw_sequence + self.string + all_out
-
-        # Reeplazar los delimitadores de 'raw_in'  por los códigos ANSI
-        if ansi_text_format != "":
-            string_format = string_format.replace(raw_in_text, ansi_text_format)
-        if ansi_bg_format != "":
-            string_format = string_format.replace(raw_in_bg, ansi_bg_format) 
-        if ansi_style_format != "":
-            string_format = string_format.replace(raw_in_style, ansi_style_format) 
-        
-        # Proteger el texto formateado con los delimitadores de 'base_out' y 'base_in' 
-        self.string_format = all_out + string_format + raw_sequence
-
-        return self.string_format
-
-    def _preprocessing_text(self):
-        self.original_string_format = self.string_format
-        # Lista de tuplas: (es_ansi, índice_limpio)
-        self.char_info = []
-        # Lista de índices originales para caracteres limpios
-        self.clean_indexes = []
-
-        i = 0
-        while i < len(self.original_string_format):
-
-            if self.original_string_format.startswith('\x1b[', i):
-                # Encontrar el final de la secuencia ANSI (termina en 'm')
-                j = self.original_string_format.find('m', i) + 1
-                if j == 0:
-                    j = len(self.original_string_format)
-                # Marcar todos los caracteres en este rango como ANSI
-                for k in range(i, j):
-                    self.char_info.append((True, None))
-                i = j
-            else:
-                # Marcar como carácter limpio y guardar su índice
-                self.char_info.append((False, len(self.clean_indexes)))
-                self.clean_indexes.append(i)
-                i += 1
+        """
+        Texto con los escapes del dye: reset, colores propios, texto (con los
+        resets de dye anidados recoloreados) y la secuencia neutra de cierre.
+        """
+        paint = self._paint
+        body = self.string
+        if "\033[" in body:
+            for raw, ansi in paint[4]:
+                body = body.replace(raw, ansi)
+        return paint[3] + body + _DYE_TAIL
 
+    @staticmethod
     def _process_color_parameter(color: Any) -> Color:
-        if isinstance(color, RGB):
-            return color
-        if isinstance(color, HEX):
-            return color.to_rgb()
-        if isinstance(color, HSL):
-            return color.to_rgb()
-        if isinstance(color, tuple):
-            return RGB(color)
-        if isinstance(color, str):
-            if color[0] == '#':
-                return RGB.from_hex_string(color)
-        if isinstance(color, int):
-            return RGB.from_ansi_index(color) 
-        if color is None:
-            return None
+        return parse_color(color)
 
     @property
     def clean(self):
         """Devuelve la cadena de texto sin códigos de formato ANSI"""
-        # Asegurarse de que el texto formateado esté preprocesado
-        if not hasattr(self, 'clean_indexes'):
-            self._preprocessing_text()
-
-        # Reconstruir el texto limpio usando los índices de self.clean_indexes
-        return ''.join([self.string_format[i] for i in self.clean_indexes])
+        # Se calcula una sola vez por formato: len() y la alineación lo consultan a menudo
+        if self._clean is None:
+            string = self.string
+            # Sin escapes propios el texto visible es el mismo objeto `string`
+            self._clean = strip_ansi(self.string_format) if "\x1b" in string else string
+        return self._clean
     
+def _color_rgba(color: Any) -> tuple | None:
+    """Color de un dye como tupla (r, g, b, a); los str salen de la caché sin crear un RGB."""
+    if color is None:
+        return None
+    if color.__class__ is str:
+        if _instrument._enabled:
+            _instrument.count("color.parse")
+        return _parse_color_cached(color)
+    rgb = dye._process_color_parameter(color)
+    return rgb.r, rgb.g, rgb.b, rgb.a
+
+
+@lru_cache(maxsize=1024)
+def _dye_paint(fore: tuple | None, bg: tuple | None, style) -> tuple:
+    """
+    Pintura compartida por los dye con los mismos colores:
+    (fore rgba, bg rgba, style, cabecera, sustituciones de secuencias neutras).
+    """
+    subs = []
+    if fore is not None:
+        subs.append((_RAW_IN_TEXT, f"\033[38;2;{fore[0]};{fore[1]};{fore[2]}m"))
+    if bg is not None:
+        subs.append((_RAW_IN_BG, f"\033[48;2;{bg[0]};{bg[1]};{bg[2]}m"))
+    style_ansi_sec = dye._style_to_ansi_seccion(list(style) if isinstance(style, tuple) else style)
+    if style_ansi_sec is not None:
+        subs.append((_RAW_IN_STYLE, f"\033[{style_ansi_sec}m"))
+    head = _RAW_SEQUENCE
+    for raw, ansi in subs:
+        head = head.replace(raw, ansi)
+    return fore, bg, style, _ALL_OUT + head, tuple(subs)
+
+
+_instrument.register_cache("dye.paint", _dye_paint)
+
+
+def _pick_visible(text: str, pos: int, end: int, clean: int, selected: range) -> str:
+    """Caracteres de text[pos:end] (índices visibles clean…) que están en `selected` (ascendente)."""
+    if not selected:
+        return ""
+    step = selected.step
+    first = selected.start
+    if first < clean:
+        first += -((first - clean) // step) * step
+    stop = min(clean + end - pos, selected.stop)
+    if first >= stop:
+        return ""
+    return text[pos + first - clean:pos + stop - clean:step]
+
+
 class Brush:
-    @classmethod
-    def load(cls, fore=None, bg=None, style=None):
-        fore = RGB.from_hex_string(fore) if fore else None
-        bg = RGB.from_hex_string(bg) if bg else None
+    """
+    Pincel precompilado: calcula una sola vez las secuencias ANSI de apertura
+    y cierre y las aplica a cualquier texto.
+
+        buy = Brush("#0ECB81", style="bold")
+        buy("BUY")                                  # str coloreado
+        buy.apply_many(["BUY", "LONG"])             # generador
+        buy.apply_many(rows, join="\\n")            # una sola cadena
+
+    Acepta cualquier color de `parse_color` (hex, RGB, HSL, int, tupla…).
+    Las etiquetas cortas que se repiten ("BUY", "SELL") se guardan en una caché
+    acotada: una etiqueta entra la segunda vez que se pinta, así que un flujo de
+    IDs únicos no la desplaza. Es picklable, así que puede enviarse a procesos
+    de trabajo.
+    """
+    __slots__ = ("fore", "bg", "style", "prefix", "suffix", "prefix_bytes", "suffix_bytes",
+                 "intern_size", "_interned", "_seen")
+
+    # Longitud máxima de una etiqueta para entrar en la caché
+    INTERN_MAX_LEN = 32
+
+    def __init__(self, fore=None, bg=None, style=None, intern_size: int = 256) -> None:
+        self.fore = parse_color(fore)
+        self.bg = parse_color(bg)
+        self.style = style
+        self.prefix: str = dye.start(self.fore, self.bg, style, ret=True)
+        self.suffix: str = dye.end(repr=True)
+        self.prefix_bytes: bytes = self.prefix.encode()
+        self.suffix_bytes: bytes = self.suffix.encode()
+        self.intern_size = intern_size
+        self._interned: dict = {}
+        # Etiquetas vistas una vez, candidatas a entrar en _interned
+        self._seen: dict = {}
 
-        ansi_color: str = dye.start(fore, bg, style, ret=True)
-        ansi_end: str = dye.end(repr=True)
-        return lambda string: ansi_color + string + ansi_end
+    @classmethod
+    def load(cls, fore=None, bg=None, style=None) -> 'Brush':
+        """Compatibilidad: equivale a Brush(fore, bg, style)."""
+        return cls(fore, bg, style)
+
+    def __call__(self, string) -> str:
+        interned = self._interned.get(string)
+        if interned is not None:
+            return interned
+        painted = f"{self.prefix}{string}{self.suffix}"
+        if isinstance(string, str) and len(string) <= self.INTERN_MAX_LEN and self.intern_size:
+            self._admit(string, painted)
+        return painted
+
+    def _admit(self, string: str, painted: str) -> None:
+        # Ambos dicts se acotan en orden de inserción (FIFO): lo más antiguo sale primero
+        seen, interned = self._seen, self._interned
+        if seen.pop(string, None) is None:
+            if len(seen) >= self.intern_size:
+                del seen[next(iter(seen))]
+            seen[string] = True
+            return
+        if len(interned) >= self.intern_size:
+            del interned[next(iter(interned))]
+        interned[string] = painted
+
+    def __repr__(self) -> str:
+        return f"Brush(fore={self.fore!r}, bg={self.bg!r}, style={self.style!r})"
+
+    def __reduce__(self):
+        return (type(self), (self.fore, self.bg, self.style, self.intern_size))
+
+    def apply_many(self, iterable, join: str | bytes | None = None):
+        """
+        Pinta cada elemento de `iterable`.
+
+        Sin `join` devuelve un generador perezoso (apto para streams).
+        Con `join` devuelve una única cadena: prefijo + elementos unidos por
+        `sufijo + join + prefijo` + sufijo, en un solo str.join. Si `join` es
+        bytes el resultado también lo es y cada elemento se codifica una vez.
+        """
+        if join is None:
+            prefix, suffix = self.prefix, self.suffix
+            return (f"{prefix}{item}{suffix}" for item in iterable)
+        if isinstance(join, (bytes, bytearray)):
+            # Se arma el str completo y se codifica una sola vez
+            return self.apply_many(iterable, join.decode()).encode()
+        items = [item if isinstance(item, str) else item.decode() if isinstance(item, bytes) else str(item)
+                 for item in iterable]
+        if not items:
+            return ""
+        prefix, suffix = self.prefix, self.suffix
+        return prefix + (suffix + join + prefix).join(items) + suffix
+
+    def encode(self, string, encoding: str = "utf-8") -> bytes:
+        """Versión bytes de `brush(string)` con el prefijo y sufijo ya codificados."""
+        data = string if isinstance(string, bytes) else str(string).encode(encoding)
+        return b"".join((self.prefix_bytes, data, self.suffix_bytes))
+
+    def write_to(self, writer, string) -> None:
+        """Escribe `string` pintado en un ByteWriter: tres trozos encolados, sin concatenar."""
+        writer.write(self.prefix_bytes)
+        writer.write(string)
+        writer.write(self.suffix_bytes)
+
+def _sgr_open(fore=None, bg=None, style=None) -> str:
+    """Secuencia ANSI que activa el estilo indicado (sin resets previos)."""
+    fore_ansi = dye._color_to_ansi_rgb_seccion(parse_color(fore))
+    bg_ansi = dye._color_to_ansi_rgb_seccion(parse_color(bg))
+    style_ansi = dye._style_to_ansi_seccion(style)
+
+    sequence = ""
+    if style_ansi is not None:
+        sequence += f"\033[{style_ansi}m"
+    if fore_ansi is not None:
+        sequence += f"\033[38;2;{fore_ansi}m"
+    if bg_ansi is not None:
+        sequence += f"\033[48;2;{bg_ansi}m"
+    return sequence
+
+
+_RESET_SEQUENCES = ("\033[0m", "\033[m")
 
 class Stencil:
+    """
+    Pinta uno o varios tramos de un texto, plano o ya coloreado, en una sola pasada.
+
+    Los índices son posiciones de caracteres visibles (los escapes ANSI del
+    texto de entrada no cuentan). Los tramos pueden solaparse: en cada zona
+    gana el de mayor `priority` y, a igual prioridad, el último añadido.
+
+        Stencil(text, 0, 5).spray(fore="#F00")              # un solo tramo
+
+        st = Stencil(text)
+        st.add(0, 5, fore="#F00")
+        st.add(3, 9, bg="#333", priority=1)
+        st.add_pattern(r"\\d+(?:\\.\\d+)?", fore="#0ECB81")
+        st.spray()
+    """
     def __init__(self, string, start=None, end=None) -> None:
-        self.string = string
+        self.string = str(string)
         self.start = start 
         self.end = end
+        # (inicio, fin, prioridad, orden, secuencia ANSI)
+        self.spans: List[Tuple[int, int, int, int, str]] = []
+        self._clean = None
+
+    @property
+    def clean(self) -> str:
+        """Texto visible (sin escapes ANSI) sobre el que se expresan los índices."""
+        if self._clean is None:
+            self._clean = strip_ansi(self.string)
+        return self._clean
+
+    def add(self, start=None, end=None, fore=None, bg=None, style=None, priority: int = 0) -> 'Stencil':
+        """Añade un tramo [start:end] con su estilo. Devuelve el propio Stencil para encadenar."""
+        if start is None or end is None or start < 0 or end < 0:
+            start, end, _ = slice(start, end).indices(len(self.clean))
+        if start < end:
+            self.spans.append((start, end, priority, len(self.spans), _sgr_open(fore, bg, style)))
+        return self
+
+    def add_pattern(self, pattern, fore=None, bg=None, style=None, priority: int = 0, flags: int = 0) -> 'Stencil':
+        """Añade un tramo por cada coincidencia de `pattern` en el texto visible."""
+        sequence = _sgr_open(fore, bg, style)
+        regex = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        spans = self.spans
+        for m in regex.finditer(self.clean):
+            if m.start() < m.end():
+                spans.append((m.start(), m.end(), priority, len(spans), sequence))
+        return self
 
     def spray(self, fore=None, bg=None, style=None):
-        zone = self.string[self.start:self.end]
+        """
+        Renderiza el texto con todos los tramos.
+
+        Si se pasan colores o estilo (o no hay tramos añadidos) se pinta además
+        el tramo [start:end] indicado en el constructor.
+        """
+        spans = self.spans
+        if fore is not None or bg is not None or style is not None or not spans:
+            start, end, _ = slice(self.start, self.end).indices(len(self.clean))
+            if start >= end:
+                return self.string
+            spans = spans + [(start, end, 0, len(spans), _sgr_open(fore, bg, style))]
+        return self._render(spans)
+
+    def _render(self, spans) -> str:
+        text = self.string
+
+        # Camino rápido: texto plano y tramos sin solapes (p. ej. los de add_pattern)
+        if "\x1b" not in text:
+            ordered = sorted(spans)
+            if all(ordered[i][0] >= ordered[i - 1][1] for i in range(1, len(ordered))):
+                out = []
+                pos = 0
+                for start, end, _, _, sequence in ordered:
+                    out.append(text[pos:start])
+                    if sequence:
+                        out.append(sequence)
+                        out.append(text[start:end])
+                        out.append("\033[0m")
+                    else:
+                        out.append(text[start:end])
+                    pos = end
+                out.append(text[pos:])
+                return "".join(out)
+
+        return self._render_layered(spans)
+
+    def _render_layered(self, spans) -> str:
+        import heapq
+
+        # Eventos por posición visible: aperturas y cierres
+        events = {}
+        for span_id, (start, end, _, _, _) in enumerate(spans):
+            events.setdefault(start, []).append(span_id)
+            events.setdefault(end, []).append(~span_id)
+        boundaries = sorted(events)
+
+        text = self.string
+        out = []
+        heap = []            # (-prioridad, -orden, id): el tope es el tramo visible
+        closed = set()
+        underlying = []      # escapes del texto original desde su último reset
+        top = None           # secuencia del tramo activo o None
+        b = 0                # siguiente frontera pendiente
+        vis = 0              # posición visible actual
+
+        def apply(position):
+            nonlocal top
+            for event in events[position]:
+                if event >= 0:
+                    _, _, priority, order, _ = spans[event]
+                    heapq.heappush(heap, (-priority, -order, event))
+                else:
+                    closed.add(~event)
+            while heap and heap[0][2] in closed:
+                heapq.heappop(heap)
+            new_top = spans[heap[0][2]][4] if heap else None
+            if new_top != top:
+                if top is not None:
+                    out.append("\033[0m")
+                    out.extend(underlying)
+                if new_top is not None:
+                    out.append(new_top)
+                top = new_top
+
+        def emit_plain(chunk):
+            nonlocal vis, b
+            pos = 0
+            size = len(chunk)
+            while b < len(boundaries) and boundaries[b] < vis + size:
+                cut = boundaries[b] - vis
+                if cut > pos:
+                    out.append(chunk[pos:cut])
+                    pos = cut
+                apply(boundaries[b])
+                b += 1
+            out.append(chunk[pos:])
+            vis += size
+
+        raw = 0
+        if "\x1b" in text:
+            for m in ANSI_RE.finditer(text):
+                if m.start() > raw:
+                    emit_plain(text[raw:m.start()])
+                escape = m.group()
+                out.append(escape)
+                if escape in _RESET_SEQUENCES:
+                    underlying.clear()
+                else:
+                    underlying.append(escape)
+                # El tramo activo manda sobre los estilos del texto original
+                if top is not None:
+                    out.append(top)
+                raw = m.end()
+        emit_plain(text[raw:])
+
+        # Fronteras en el final del texto o más allá
+        while b < len(boundaries):
+            apply(boundaries[b])
+            b += 1
+        if top is not None:
+            out.append("\033[0m")
+            out.extend(underlying)
+        return "".join(out)
+
+_PSTR_TAG_RE = re.compile(r'(\\\[|\\\])|\[(.*?)\]')
+_PSTR_TOKEN_RE = re.compile(r'((?:rgba?|hsla?)\([^)]+\)|#[a-fA-F0-9]+|[a-zA-Z0-9/_]+)', re.IGNORECASE)
+
+def _truecolor_sequence(color_obj, is_bg=False) -> str:
+    """Genera la secuencia ANSI TrueColor (24-bit) manual."""
+    rgb = parse_color(color_obj)
+    code_type = '48' if is_bg else '38'
+    return f"\033[{code_type};2;{rgb.r};{rgb.g};{rgb.b}m"
+
+
+def _replace_tag(match) -> str:
+    # Manejo de escapes \[ o \]
+    if match.group(1):
+        return match.group(1)[1]
+    content = match.group(2)
+    if not content:
+        return ""
+    return _tag_sequence(content)
+
 
-        self.dyed_zone = dye(zone, fore, bg, style)
+@lru_cache(maxsize=4096)
+def _tag_sequence(content: str) -> str:
+    """
+    Secuencia ANSI de un tag (el texto entre corchetes). Cada tag se traduce
+    sin mirar los anteriores, así que el resultado depende solo de `content`.
+    """
+    content = content.strip()
+    if content == '/': return STYLE.RESET_ALL
 
-        # Si no hay zona a pintar retornar el string ingresado
-        if zone == '':
-            return self.string
+    ansi_sequence = ""
+    is_background = False
+    # Tokenizador inteligente
+    tokens = _PSTR_TOKEN_RE.findall(content)
 
-        start_str = self.string[:self.start] if self.start else ''
-        end_str = self.string[self.end:] if self.end else ''
+    for token in tokens:
+        token_upper = token.upper()
+
+        if token_upper == 'ON':
+            is_background = True
+            continue
+
+        # --- LÓGICA DE CIERRE ---
+        if token.startswith('/'):
+            tag = token_upper[1:] # Ej: BOLD
+            
+            # 1. Intentar buscar NOT_TAG en STYLE (NOT_BOLD, NOT_ITALIC...)
+            not_tag = f"NOT_{tag}"
+            if hasattr(STYLE, not_tag):
+                ansi_sequence += getattr(STYLE, not_tag)
+            # 2. Si es [/ON] reseteamos fondo
+            elif tag == 'ON':
+                ansi_sequence += BACK.RESET
+            # 3. Si no es estilo, asumimos que es un color y reseteamos segun el plano
+            else:
+                ansi_sequence += BACK.RESET if is_background else FORE.RESET
+            continue
+
+        # --- LÓGICA DE APERTURA ---
+        # Hex, rgb() y hsl() pasan por el parser de colores unificado (con caché)
+        if token.startswith('#') or token_upper.startswith(('RGB(', 'HSL(')):
+            try: ansi_sequence += _truecolor_sequence(token, is_background)
+            except (ValueError, TypeError): pass
+            continue
+
+        # Prioridad: Estilo > Color ANSI básico > Color con nombre de _util.COLORS
+        if hasattr(STYLE, token_upper):
+            ansi_sequence += getattr(STYLE, token_upper)
+        elif is_background and hasattr(BACK, token_upper):
+            ansi_sequence += getattr(BACK, token_upper)
+        elif not is_background and hasattr(FORE, token_upper):
+            ansi_sequence += getattr(FORE, token_upper)
+        else:
+            try: ansi_sequence += _truecolor_sequence(token, is_background)
+            except (ValueError, TypeError): pass
+
+    return ansi_sequence
+
+
+_instrument.register_cache("pstr.tag", _tag_sequence)
 
-        return f'{start_str}{self.dyed_zone}{end_str}'
 
 class pstr:
     def __init__(self, string: str = '') -> None:
         self.string = string
         self.string_format = self.get_string_format()
+        self._bytes = None
 
     def __repr__(self):
         return f"{self.string_format!r}"
@@ -306,119 +712,128 @@ class pstr:
     def __str__(self):
         return self.string_format
 
+    def __bytes__(self):
+        if self._bytes is None:
+            self._bytes = self.string_format.encode()
+        return self._bytes
+
     def __add__(self, other):
         return pstr(self.string_format + other)
 
     def get_truecolor_sequence(self, color_obj, is_bg=False):
         """Genera la secuencia ANSI TrueColor (24-bit) manual."""
-        rgb = color_obj.to_rgb()
-        code_type = '48' if is_bg else '38'
-        return f"\033[{code_type};2;{rgb.r};{rgb.g};{rgb.b}m"
+        return _truecolor_sequence(color_obj, is_bg)
 
     def parse_params(self, params_str):
         """Convierte '120, 100%, 50%' en [120.0, 1.0, 0.5]"""
-        clean_params = []
-        for p in params_str.split(','):
-            p = p.strip()
-            if p.endswith('%'):
-                val = float(p.rstrip('%')) / 100.0
-            else:
-                val = float(p)
-            clean_params.append(val)
-        return clean_params
+        return _css_params(params_str)
 
     def replace_callback(self, match):
-        # Manejo de escapes \[ o \]
-        if match.group(1): 
-            return match.group(1)[1]
-            
-        content = match.group(2)
-        if not content: return ""
-        
-        content = content.strip()
-        if content == '/': return STYLE.RESET_ALL
-
-        ansi_sequence = ""
-        is_background = False
-        # Tokenizador inteligente
-        tokens = re.findall(r'(rgb\([^)]+\)|hsl\([^)]+\)|#[a-fA-F0-9]+|[a-zA-Z0-9/_]+)', content)
-
-        for token in tokens:
-            token_upper = token.upper()
-
-            if token_upper == 'ON':
-                is_background = True
-                continue
-
-            # --- LÓGICA DE CIERRE ---
-            if token.startswith('/'):
-                tag = token_upper[1:] # Ej: BOLD
-                
-                # 1. Intentar buscar NOT_TAG en STYLE (NOT_BOLD, NOT_ITALIC...)
-                not_tag = f"NOT_{tag}"
-                if hasattr(STYLE, not_tag):
-                    ansi_sequence += getattr(STYLE, not_tag)
-                # 2. Si es [/ON] reseteamos fondo
-                elif tag == 'ON':
-                    ansi_sequence += BACK.RESET
-                # 3. Si no es estilo, asumimos que es un color y reseteamos segun el plano
-                else:
-                    ansi_sequence += BACK.RESET if is_background else FORE.RESET
-                continue
-
-            # --- LÓGICA DE APERTURA ---
-            if token.startswith('#'):
-                try: ansi_sequence += get_truecolor_sequence(HEX(token), is_background)
-                except ValueError: pass
-                continue
-
-            if token_upper.startswith('RGB('):
-                try:
-                    inner = re.search(r'\((.*?)\)', token).group(1)
-                    r, g, b, *rest = parse_params(inner)
-                    ansi_sequence += get_truecolor_sequence(RGB(int(r), int(g), int(b)), is_background)
-                except Exception: pass
-                continue
-
-            if token_upper.startswith('HSL('):
-                try:
-                    inner = re.search(r'\((.*?)\)', token).group(1)
-                    h, s, l, *rest = parse_params(inner)
-                    ansi_sequence += get_truecolor_sequence(HSL(h, s, l), is_background)
-                except Exception: pass
-                continue
-
-            # Prioridad: Estilo > Color
-            if hasattr(STYLE, token_upper):
-                ansi_sequence += getattr(STYLE, token_upper)
-            elif is_background:
-                if hasattr(BACK, token_upper):
-                    ansi_sequence += getattr(BACK, token_upper)
-            else:
-                if hasattr(FORE, token_upper):
-                    ansi_sequence += getattr(FORE, token_upper)
-
-        return ansi_sequence
+        return _replace_tag(match)
 
     # Expresión regular principal:
     # 1. (\\\[|\\\])  -> Busca escapes literal \[ o \]
     # 2. |            -> O
     # 3. \[(.*?)\]    -> Busca contenido entre corchetes
     def get_string_format(self):
-        pattern = r'(\\\[|\\\])|\[(.*?)\]'
-        
         if self.string == '':
-            sys.stdout.write(end)
-            return
-        formatted_text = re.sub(pattern, self.replace_callback, self.string)    
+            return ''
+        formatted_text = _PSTR_TAG_RE.sub(self.replace_callback, self.string)
         return formatted_text
 
-import sys
-
-def print(*args, sep: str = ' ', end: str = '\n'):
+    @staticmethod
+    def render_file(src, dst, workers: int | None = None, chunk_size: int = 8 << 20) -> int:
+        """
+        Renderiza el marcado pstr del archivo `src` en `dst` y devuelve los
+        bytes escritos. Para documentos grandes: no se carga el texto entero.
+
+        Parámetros
+        ──────────
+        src, dst   : rutas (str o PathLike); no pueden ser el mismo archivo.
+        workers    : procesos que renderizan (default os.cpu_count()); 1 lo
+                     hace en este proceso.
+        chunk_size : bytes aproximados por trozo; cada trozo acaba en un salto
+                     de línea.
+
+        Un tag no puede cruzar un salto de línea y cada tag se traduce sin
+        mirar los anteriores, así que los trozos se renderizan por separado y
+        su concatenación en orden es idéntica a `pstr(texto).string_format`:
+        un estilo abierto en un trozo sigue abierto en el siguiente igual que
+        en la terminal. Cada proceso mapea `src` en memoria y lee solo su
+        trozo; el padre escribe los resultados en orden con, como mucho,
+        2 × workers trozos en vuelo. Los bytes que no son UTF-8 se conservan.
+        """
+        import mmap
+        import os
+
+        src, dst = os.fspath(src), os.fspath(dst)
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            raise ValueError("render_file: src y dst son el mismo archivo")
+        workers = workers or os.cpu_count() or 1
+        written = 0
+        with open(src, "rb") as f, open(dst, "wb") as out:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                chunks = _line_chunks(source, size, max(chunk_size, 1))
+                if workers == 1 or len(chunks) == 1:
+                    for start, end in chunks:
+                        written += out.write(_render_markup(source[start:end]))
+                    return written
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+                pending: deque = deque()
+                for start, end in chunks:
+                    if len(pending) >= 2 * workers:
+                        written += out.write(pending.popleft().result())
+                    pending.append(pool.submit(_render_file_chunk, src, start, end))
+                while pending:
+                    written += out.write(pending.popleft().result())
+        return written
+
+def _line_chunks(source, size: int, chunk_size: int) -> list[tuple[int, int]]:
+    """Trozos [inicio, fin) de unos `chunk_size` bytes que terminan tras un salto de línea (o en el final)."""
+    chunks = []
+    start = 0
+    while start < size:
+        end = source.find(b"\n", min(start + chunk_size, size) - 1) + 1 or size
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def _render_markup(data: bytes) -> bytes:
+    # surrogateescape: los bytes inválidos en UTF-8 salen tal cual entraron
+    text = data.decode("utf-8", "surrogateescape")
+    # split en vez de sub: sin una llamada Python por tag. Cada tag deja tres
+    # piezas: el escape \[ o \], el contenido del tag y el texto que le sigue
+    parts = _PSTR_TAG_RE.split(text)
+    parts[1::3] = [escape[1] if escape else _tag_sequence(content) if content else ""
+                   for escape, content in zip(parts[1::3], parts[2::3])]
+    parts[2::3] = [""] * (len(parts) // 3)
+    return "".join(parts).encode("utf-8", "surrogateescape")
+
+
+def _render_file_chunk(path: str, start: int, end: int) -> bytes:
+    """Trabajo de un proceso de `pstr.render_file`: mapea `path` y renderiza [start, end)."""
+    import mmap
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+        return _render_markup(source[start:end])
+
+
+def print(*args, sep: str = ' ', end: str = '\n', flush: bool = False):
     """
     Versión mejorada de print que utiliza pstr para formatear.
     Soporta múltiples argumentos, separadores y conversión automática a string.
+
+    Escribe a través de `pintar.console.console`: el formateo ocurre fuera del
+    cerrojo y cada línea completa sale de una vez aunque impriman varios
+    hilos. Con un `end` sin salto de línea (barras de progreso, prompts) el
+    texto se publica en el acto, como hacía print.
     """
     # Convertir todos los argumentos a string y unirlos con el separador
     full_text = sep.join(str(arg) for arg in args)
@@ -426,9 +841,14 @@ def print(*args, sep: str = ' ', end: str = '\n'):
     # Aplicar el formato especial de pstr
     formatted_output = pstr(full_text).string_format if args else ""
     
-    # Escribir en el buffer de salida estándar
-    sys.stdout.write(formatted_output + end)
-    
-    # Forzar el vaciado del buffer (flush)
-    sys.stdout.flush()
+    # Publicar en la consola compartida (líneas completas, atómicas)
+    _console.write(formatted_output + end)
+    if flush or "\n" not in end:
+        _console.flush()
+
 
+# Sondas de instrumentación: sin efecto mientras pintar.enable_stats() no se llame
+_instrument.probe(dye, "__init__", "dye.created")
+_instrument.probe(pstr, "__init__", "pstr.created")
+_instrument.probe(dye, "get_string_format", "dye.get_string_format", timed=True, output=True)
+_instrument.probe(pstr, "get_string_format", "pstr.get_string_format", timed=True, output=True)
@@ -0,0 +1,404 @@
+# modulo flight.py
+"""
+Caja negra para logging: los últimos registros, en binario y sin formatear,
+en un archivo circular de tamaño fijo mapeado en memoria.
+
+    from pintar.flight import FlightRecorderHandler
+
+    log.addHandler(FlightRecorderHandler("bot.flight", size=64 << 20))   # DEBUG incluido
+
+    # tras una caída:
+    python -m pintar.flight bot.flight --last 200
+
+Cada registro se guarda como una entrada compacta: timestamp, nivel, id del
+logger, id de la plantilla del mensaje (el `msg` sin interpolar) y los
+argumentos empaquetados (int, float, str, bytes, bool, None). Nada se formatea
+al registrar: la interpolación y el color ocurren al leer, con un Theme.
+
+El archivo tiene tres regiones: cabecera, diccionario de cadenas (nombres de
+logger y plantillas, cada una se escribe una sola vez) y el anillo de
+entradas. Cuando el anillo se llena, las entradas más antiguas se descartan.
+Como el mapeo es compartido, lo escrito está en la caché de páginas del
+sistema en cuanto termina `emit`: sobrevive a que el proceso muera (kill -9,
+segfault), no a que se caiga la máquina (`sync=True` hace msync en flush()).
+
+La cabecera guarda `tail` (primera entrada viva) y `head` (fin de la última).
+Una entrada se escribe así: se avanza `tail` más allá de las que va a pisar,
+se copian sus bytes y solo entonces se avanza `head`; una escritura cortada
+por una caída queda fuera de [tail, head) y no se lee.
+
+Un archivo por proceso: el anillo no se comparte entre procesos, y un hijo
+creado con fork no escribe en el del padre (sus registros se cuentan en
+`dropped`). Al abrir un archivo existente con el mismo formato se continúa
+donde quedó.
+"""
+from __future__ import annotations
+
+import argparse
+import errno
+import logging
+import mmap
+import os
+import struct
+import sys
+from typing import Iterator
+
+from .logging import PintarFormatter, Theme
+
+_MAGIC = b"PNTRFLT1"
+# magic, capacidad del anillo, tamaño del diccionario, tail, head, bytes usados del diccionario, cadenas
+_HEADER = struct.Struct("<8sQQQQII")
+_TAIL_OFFSET = 24
+_HEAD_OFFSET = 32
+_DICT_OFFSET = 40
+_HEADER_SIZE = 4096
+
+# largo, created, levelno, nº de args, flags, id de logger, id de plantilla
+_ENTRY = struct.Struct("<IdHBBII")
+_WRAP = 0xFFFFFFFF          # largo especial: el resto de la vuelta está vacío
+_INLINE = 0xFFFFFFFF        # id especial: la cadena va como primer argumento
+_EXC = 1                    # flag: los dos últimos argumentos son tipo y texto de la excepción
+
+# Etiquetas de argumentos
+_NONE, _INT, _FLOAT, _STR, _BYTES, _TRUE, _FALSE, _OTHER = range(8)
+_I64 = struct.Struct("<q")
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_TAG_I64 = struct.Struct("<Bq").pack
+_TAG_F64 = struct.Struct("<Bd").pack
+_TAG_LEN = struct.Struct("<BH").pack
+_PAD = tuple(bytes(n) for n in range(8))
+
+
+class FlightRecorderHandler(logging.Handler):
+    """
+    Handler que escribe registros sin formatear en un anillo mapeado en memoria.
+
+    Parámetros
+    ──────────
+    path      : archivo del anillo (se crea o se reutiliza).
+    size      : bytes del anillo de entradas (default 16 MiB).
+    dict_size : bytes del diccionario de cadenas (default 1 MiB). Lleno, las
+                cadenas nuevas viajan dentro de cada entrada.
+    max_arg   : bytes máximos de un argumento str/bytes (se recorta).
+    sync      : flush() hace msync (durabilidad ante caída del sistema).
+    level     : nivel mínimo (default NOTSET: todo, DEBUG incluido).
+
+    Los argumentos que no son int/float/str/bytes/bool/None se guardan como
+    str(arg): es la única conversión que ocurre al registrar. Con
+    `exc_info` se guarda el tipo y el texto de la excepción, no el traceback.
+    """
+    def __init__(self, path: str, size: int = 16 << 20, dict_size: int = 1 << 20, max_arg: int = 512,
+                 sync: bool = False, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.path = path
+        self.max_arg = max_arg
+        self.sync = sync
+        self.dropped = 0
+        self._pid = os.getpid()
+        capacity = max(size // 8 * 8, 4096)
+        dict_size = max(dict_size // 8 * 8, 4096)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            header = os.pread(fd, _HEADER.size, 0)
+            reuse = False
+            if len(header) == _HEADER.size:
+                magic, old_capacity, old_dict, *_ = _HEADER.unpack(header)
+                reuse = magic == _MAGIC and old_capacity == capacity and old_dict == dict_size
+            total = _HEADER_SIZE + dict_size + capacity
+            if not reuse:
+                os.ftruncate(fd, 0)
+            os.ftruncate(fd, total)
+            if hasattr(os, "posix_fallocate"):
+                # Reservar los bloques ya: un archivo disperso sin espacio en disco
+                # mataría el proceso con SIGBUS al escribir en el mapeo
+                try:
+                    os.posix_fallocate(fd, 0, total)
+                except OSError as exc:
+                    if exc.errno == errno.ENOSPC:
+                        raise
+            self._map = mmap.mmap(fd, total)
+        finally:
+            os.close(fd)
+        mm = self._map
+        self._capacity = capacity
+        self._dict_size = dict_size
+        self._data = _HEADER_SIZE + dict_size
+        if reuse:
+            _, _, _, self._tail, self._head, self._dict_used, _ = _HEADER.unpack_from(mm)
+            self._ids = {text: i for i, text in enumerate(_read_strings(mm, self._dict_used))}
+        else:
+            self._tail = self._head = self._dict_used = 0
+            self._ids = {}
+            _HEADER.pack_into(mm, 0, _MAGIC, capacity, dict_size, 0, 0, 0, 0)
+
+    # ==============================
+    # Escritura
+    # ==============================
+
+    def _intern(self, text: str) -> int:
+        """Id de `text` en el diccionario; _INLINE si no cabe."""
+        data = text.encode("utf-8", "replace")[:0xFFFF]
+        used = self._dict_used
+        if used + 2 + len(data) > self._dict_size:
+            return _INLINE
+        mm = self._map
+        start = _HEADER_SIZE + used
+        _U16.pack_into(mm, start, len(data))
+        mm[start + 2:start + 2 + len(data)] = data
+        ident = self._ids[text] = len(self._ids)
+        self._dict_used = used + 2 + len(data)
+        # Primero la cadena, luego el contador que la hace visible
+        struct.pack_into("<II", mm, _DICT_OFFSET, self._dict_used, len(self._ids))
+        return ident
+
+    def _pack_args(self, args) -> bytes:
+        max_arg = self.max_arg
+        parts = []
+        append = parts.append
+        for arg in args:
+            cls = arg.__class__
+            if cls is float:
+                append(_TAG_F64(_FLOAT, arg))
+            elif cls is int and -(1 << 63) <= arg < (1 << 63):
+                append(_TAG_I64(_INT, arg))
+            elif cls is str:
+                data = arg.encode("utf-8", "replace")[:max_arg]
+                append(_TAG_LEN(_STR, len(data)))
+                append(data)
+            elif arg is None:
+                append(b"\x00")
+            elif arg is True:
+                append(b"\x05")
+            elif arg is False:
+                append(b"\x06")
+            elif cls is bytes:
+                data = arg[:max_arg]
+                append(_TAG_LEN(_BYTES, len(data)))
+                append(data)
+            else:
+                data = str(arg).encode("utf-8", "replace")[:max_arg]
+                append(_TAG_LEN(_OTHER, len(data)))
+                append(data)
+        return b"".join(parts)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid() or self._map is None:
+            # Hijo de un fork o handler cerrado
+            self.dropped += 1
+            return
+        try:
+            ids = self._ids
+            name = record.name
+            logger_id = ids.get(name)
+            if logger_id is None:
+                logger_id = self._intern(name)
+            msg = record.msg if record.msg.__class__ is str else str(record.msg)
+            args = record.args
+            if args and args.__class__ is not tuple:
+                # args como dict (%(clave)s): se interpola aquí, caso raro
+                msg, args = record.getMessage(), ()
+            template_id = ids.get(msg)
+            if template_id is None:
+                template_id = self._intern(msg)
+            flags = 0
+            if logger_id == _INLINE or template_id == _INLINE or record.exc_info:
+                args = list(args or ())
+                if template_id == _INLINE:
+                    args.insert(0, msg)
+                if logger_id == _INLINE:
+                    args.insert(0, name)
+                if record.exc_info and record.exc_info[1] is not None:
+                    exc = record.exc_info[1]
+                    args += (type(exc).__qualname__, str(exc))
+                    flags = _EXC
+            body = self._pack_args(args[:255]) if args else b""
+            size = _ENTRY.size + len(body)
+            pad = -size % 8
+            size += pad
+            self._write(_ENTRY.pack(size, record.created, min(record.levelno, 0xFFFF), min(len(args), 255),
+                                    flags, logger_id, template_id) + body + _PAD[pad])
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _write(self, data: bytes) -> None:
+        size = len(data)
+        capacity = self._capacity
+        if size > capacity // 4:
+            self.dropped += 1
+            return
+        mm = self._map
+        head = self._head
+        phys = head % capacity
+        if phys + size > capacity:
+            # No cabe al final: marca de vuelta y la entrada empieza la siguiente
+            lap_end = head - phys + capacity
+            self._evict(lap_end + size)
+            _U32.pack_into(mm, self._data + phys, _WRAP)
+            head, phys = lap_end, 0
+        elif head + size - self._tail > capacity:
+            self._evict(head + size)
+        start = self._data + phys
+        mm[start:start + size] = data
+        self._head = head = head + size
+        _U64.pack_into(mm, _HEAD_OFFSET, head)
+
+    def _evict(self, end: int) -> None:
+        """Avanza `tail` hasta que [tail, end) quepa en el anillo."""
+        tail = self._tail
+        if end - tail <= self._capacity:
+            return
+        mm, capacity, data = self._map, self._capacity, self._data
+        while end - tail > capacity:
+            phys = tail % capacity
+            length = _U32.unpack_from(mm, data + phys)[0]
+            if length == _WRAP:
+                tail = tail - phys + capacity
+            elif _ENTRY.size <= length <= capacity - phys:
+                tail += length
+            else:
+                # Anillo dañado (archivo reutilizado tras una caída a medias): se descarta
+                tail = self._head
+                break
+        self._tail = tail
+        _U64.pack_into(mm, _TAIL_OFFSET, tail)
+
+    def flush(self) -> None:
+        if self.sync and self._map is not None:
+            with self.lock:
+                self._map.flush()
+
+    def close(self) -> None:
+        with self.lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+        super().close()
+
+
+def _read_strings(buf, used: int) -> list[str]:
+    strings = []
+    pos = _HEADER_SIZE
+    end = _HEADER_SIZE + used
+    while pos < end:
+        length = _U16.unpack_from(buf, pos)[0]
+        strings.append(bytes(buf[pos + 2:pos + 2 + length]).decode("utf-8", "replace"))
+        pos += 2 + length
+    return strings
+
+
+def _unpack_args(buf, pos: int, count: int) -> tuple[list, int]:
+    values = []
+    for _ in range(count):
+        tag = buf[pos]
+        pos += 1
+        if tag == _INT:
+            values.append(_I64.unpack_from(buf, pos)[0])
+            pos += 8
+        elif tag == _FLOAT:
+            values.append(_F64.unpack_from(buf, pos)[0])
+            pos += 8
+        elif tag in (_STR, _OTHER, _BYTES):
+            length = _U16.unpack_from(buf, pos)[0]
+            data = bytes(buf[pos + 2:pos + 2 + length])
+            values.append(data if tag == _BYTES else data.decode("utf-8", "replace"))
+            pos += 2 + length
+        else:
+            values.append(None if tag == _NONE else tag == _TRUE)
+    return values, pos
+
+
+class FlightReader:
+    """
+    Lector de un anillo de FlightRecorderHandler: genera los registros vivos,
+    del más antiguo al más reciente, como LogRecord.
+
+    Se toma una copia del archivo al construirlo, así que puede leerse un
+    anillo que otro proceso sigue escribiendo.
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._buf = f.read()
+        if len(self._buf) < _HEADER.size:
+            raise ValueError(f"{path}: no es un anillo de pintar")
+        magic, self._capacity, dict_size, self._tail, self._head, used, _ = _HEADER.unpack_from(self._buf)
+        if magic != _MAGIC:
+            raise ValueError(f"{path}: no es un anillo de pintar")
+        self._data = _HEADER_SIZE + dict_size
+        self._strings = _read_strings(self._buf, used)
+
+    def __iter__(self) -> Iterator[logging.LogRecord]:
+        buf, capacity, data, strings = self._buf, self._capacity, self._data, self._strings
+        pos = self._tail
+        while pos < self._head:
+            phys = pos % capacity
+            size = _U32.unpack_from(buf, data + phys)[0]
+            if size == _WRAP:
+                pos = pos - phys + capacity
+                continue
+            _, created, levelno, count, flags, logger_id, template_id = _ENTRY.unpack_from(buf, data + phys)
+            values, _ = _unpack_args(buf, data + phys + _ENTRY.size, count)
+            name = values.pop(0) if logger_id == _INLINE else strings[logger_id]
+            msg = values.pop(0) if template_id == _INLINE else strings[template_id]
+            exc_text = None
+            if flags & _EXC:
+                exc_value = values.pop()
+                exc_text = f"{values.pop()}: {exc_value}"
+            record = logging.makeLogRecord({
+                "name": name, "msg": msg, "args": tuple(values), "levelno": levelno,
+                "levelname": logging.getLevelName(levelno), "created": created,
+                "msecs": (created % 1) * 1000, "exc_text": exc_text,
+            })
+            yield record
+            pos += size
+
+    def render(self, theme: Theme | None = None, last: int | None = None,
+               min_level: int = logging.NOTSET) -> Iterator[str]:
+        """Registros formateados con `theme` (default Theme()); `last` limita a los N más recientes."""
+        formatter = PintarFormatter(theme or Theme())
+        records = [record for record in self if record.levelno >= min_level]
+        for record in records[-last:] if last else records:
+            try:
+                yield formatter.format(record)
+            except (TypeError, ValueError):
+                # Plantilla y argumentos que no casan (o un str recortado): mostrar ambos
+                record.msg, record.args = f"{record.msg} {record.args!r}", ()
+                yield formatter.format(record)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pintar.flight", description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="anillo escrito por FlightRecorderHandler")
+    parser.add_argument("--last", type=int, default=None, help="solo los N registros más recientes")
+    parser.add_argument("--min-level", default="NOTSET", help="nivel mínimo")
+    parser.add_argument("--fmt", help="fmt del Theme para mostrar")
+    parser.add_argument("--datefmt", help="datefmt del Theme para mostrar")
+    parser.add_argument("--no-color", action="store_true", help="salida sin color")
+    args = parser.parse_args(argv)
+
+    theme = Theme(dye=not args.no_color)
+    if args.fmt:
+        theme.fmt = args.fmt
+    if args.datefmt:
+        theme.datefmt = args.datefmt
+    level = logging.getLevelName(args.min_level.upper())
+    if not isinstance(level, int):
+        parser.error(f"nivel desconocido: {args.min_level}")
+    try:
+        for line in FlightReader(args.path).render(theme, args.last, level):
+            sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
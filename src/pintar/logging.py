@@ -6,6 +6,8 @@ Usa `pintar` (colors.py + ansi.py) para toda la generación de color.
 COLORES SOPORTADOS en fore y bg
 ────────────────────────────────
     str hex    "#FF6B35", "#0ECB81", "#aaa"
+    str CSS    "rgb(14, 203, 129)", "hsl(152, 82%, 43%)"
+    str nombre "red", "light_green"    ← colores de pintar._util.COLORS
     RGB obj    RGB(14, 203, 129)
     HEX obj    HEX("#0ECB81")
     HSL obj    HSL(152, 0.82, 0.43)
@@ -64,6 +66,14 @@ ARQUITECTURA
         con su propia paleta por nivel. Se registra en Theme.fields y el sistema
         lo inyecta automáticamente en palette_for() y en PintarFormatter.format().
 
+    Highlighter
+        Reglas regex → color compiladas en una sola alternancia con grupos con
+        nombre. Opcional en Theme.highlighter; colorea patrones del mensaje.
+
+    Tracebacks
+        Tracebacks coloreados; los repetidos (mismo tipo y mismo camino de
+        código) se muestran como referencia + contador. Opcional en Theme.tracebacks.
+
     get_logger / add_file_handler — API pública.
 """
 
@@ -71,12 +81,23 @@ from __future__ import annotations
 
 import time
 import logging
+import os
+import re
+import string
 import sys
+import threading
+import traceback
+import weakref
+from contextvars import ContextVar
 from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
 
 # ── Importar pintar ───────────────────────────────────────────────────────────
-from pintar.colors import RGB, HEX, HSL, Color
+from pintar.colors import RGB, HEX, HSL, Color, parse_color, best_foreground, contrast_ratio, DEFAULT_FOREGROUNDS
 from pintar.ansi import FORE, BACK, STYLE
+from pintar.text import truncate
+from pintar import _instrument
 
 _RESET: str = STYLE.RESET_ALL   # "\033[0m"
 
@@ -93,24 +114,13 @@ def _to_rgb(color: _ColorInput) -> "RGB | None":
     Normaliza cualquier formato de color a RGB.
 
     Conversiones:
-        None              → None
-        RGB               → mismo objeto
-        HEX / HSL         → .to_rgb()
-        str "#..."        → RGB.from_hex_string()
-        tuple (r, g, b)   → RGB(*tuple)
         int               → None  (los índices ANSI-256 se tratan aparte)
+        resto             → parse_color(): hex, "rgb(…)", "hsl(…)", nombres,
+                            tuple, RGB / HEX / HSL (con caché compartida)
     """
-    if color is None:
-        return None
-    if isinstance(color, RGB):
-        return color
-    if isinstance(color, (HEX, HSL)):
-        return color.to_rgb()
-    if isinstance(color, str):
-        return RGB.from_hex_string(color)
-    if isinstance(color, tuple):
-        return RGB(*color)
-    return None   # int → se maneja en _resolve_color
+    if isinstance(color, int):
+        return None   # int → se maneja en _resolve_color
+    return parse_color(color)
 
 
 def _resolve_color(color: _ColorInput, is_bg: bool = False) -> str:
@@ -226,6 +236,23 @@ _DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
 # SECCIÓN 3 — FIELD DEF + THEME
 # ──────────────────────────────────────────────────────────────────────────────
 
+_UNSET = object()
+# Una ContextVar por nombre de campo de contexto, compartida por FieldDef y bind()
+_CONTEXT_VARS: dict[str, ContextVar] = {}
+_CONTEXT_LOCK = threading.Lock()
+
+
+def context_var(name: str) -> ContextVar:
+    """ContextVar del campo de contexto `name` (la misma en cada llamada)."""
+    var = _CONTEXT_VARS.get(name)
+    if var is None:
+        with _CONTEXT_LOCK:
+            var = _CONTEXT_VARS.get(name)
+            if var is None:
+                var = _CONTEXT_VARS[name] = ContextVar(f"pintar.{name}")
+    return var
+
+
 @dataclass
 class FieldDef:
     """
@@ -242,6 +269,11 @@ class FieldDef:
     source  : nombre de un atributo de LogRecord para usar su valor dinámico.
               Ej: "threadName", "process", "filename", "lineno".
               Si es None, siempre se usa `value`.
+    context : ContextVar (o nombre de una, ver `context_var`) cuyo valor se
+              muestra si está definida en el contexto actual: la fijan
+              `bind()` o el propio código. Tiene prioridad sobre `source`; sin
+              valor, el campo sigue con `source` / `value`. Cada tarea asyncio
+              y cada hilo ven su propio valor.
 
     Ejemplo
     ───────
@@ -262,13 +294,25 @@ class FieldDef:
             source="threadName",
             palette={"DEFAULT": ("#4A5568", None, "dim")},
         )
+
+        # Campo de contexto — el símbolo fijado con bind(log, symbol="BTCUSDT")
+        FieldDef(value="-", context="symbol")
     """
     value: str
     palette: dict[str, _ColorSpec] = field(default_factory=dict)
     source: str | None = None
+    context: "ContextVar | str | None" = None
+
+    def __post_init__(self) -> None:
+        if isinstance(self.context, str):
+            self.context = context_var(self.context)
 
     def resolve_value(self, record: "logging.LogRecord") -> str:
         """Devuelve el valor del campo para este registro."""
+        if self.context is not None:
+            value = self.context.get(_UNSET)
+            if value is not _UNSET:
+                return str(value)
         if self.source:
             return str(getattr(record, self.source, self.value))
         return self.value
@@ -282,6 +326,278 @@ class FieldDef:
         )
 
 
+# Reglas por defecto del resaltador: nombre → (patrón, (fore, bg, style)).
+# El orden importa: ante dos reglas que empiezan en la misma posición gana la primera.
+DEFAULT_HIGHLIGHT_RULES: dict[str, tuple[str, _ColorSpec]] = {
+    "long":     (r"\b(?:LONG|BUY)\b",                                   ("#0ECB81", None, "bold")),
+    "short":    (r"\b(?:SHORT|SELL)\b",                                 ("#F6465D", None, "bold")),
+    "symbol":   (r"\b[A-Z0-9]{2,12}(?:USDT|USDC|BUSD|USD|BTC|ETH|EUR)\b", ("#F0B90B", None, "bold")),
+    "order_id": (r"(?i:\b(?:order_?id|order|oid|id)[=:#]\s?|#)[A-Za-z0-9-]{4,}", ("#B794F4", None, None)),
+    "percent":  (r"[-+]?\d+(?:\.\d+)?%",                                 ("#F59E0B", None, None)),
+    "price":    (r"[-+]?\$?\d{1,3}(?:,\d{3})+(?:\.\d+)?|[-+]?\$?\d+\.\d+",  ("#63B3ED", None, None)),
+    "number":   (r"(?<![\w.])[-+]?\d+(?![\w.])",                        ("#90CDF4", None, None)),
+}
+# Caracteres con los que puede empezar una coincidencia de las reglas por defecto
+DEFAULT_HIGHLIGHT_PREFILTER = r"[-+$#\dA-Zio]"
+
+# Las reglas por defecto tratan todos los dígitos igual (\d, [A-Z0-9]): el
+# resaltado de "45230.50" y de "00000.00" coincide posición a posición
+# (bytes.translate es una tabla de 256 entradas en C; str.translate es mucho más lento)
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+
+
+@dataclass
+class Highlighter:
+    """
+    Resalta patrones dentro de `record.message`.
+
+    Todas las reglas se compilan en una sola expresión regular con un grupo
+    con nombre por regla, así que cada mensaje se recorre una única vez.
+
+    El resultado de cada escaneo se guarda como un *plan*: un itemgetter de
+    slices y una plantilla `%` con los códigos ya insertados, de modo que
+    aplicarlo a un mensaje son dos llamadas en C. Con las reglas por defecto
+    la clave del plan es la *forma* del mensaje (dígitos normalizados a 0):
+    "precio=45230.50" y "precio=45231.75" comparten plan, así que los
+    mensajes con argumentos numéricos también salen de caché. Con reglas
+    propias la clave es el mensaje tal cual.
+
+    Parámetros
+    ──────────
+    rules      : nombre → (patrón, (fore, bg, style)). El nombre debe ser un
+                 identificador válido. Por defecto DEFAULT_HIGHLIGHT_RULES.
+    prefilter  : clase de caracteres con la que empieza toda coincidencia.
+                 Se antepone como lookahead y evita probar cada alternativa en
+                 posiciones imposibles. None la desactiva (reglas propias).
+    cache_size : entradas máximas de la caché de planes.
+
+    Ejemplo
+    ───────
+        Theme(highlighter=Highlighter())
+        Theme(highlighter=Highlighter({"ticker": (r"\\b[A-Z]{3,5}\\b", ("#F0B90B", None, "bold"))}))
+    """
+    rules: dict[str, tuple[str, _ColorSpec]] | None = None
+    prefilter: str | None = None
+    cache_size: int = 4096
+
+    def __post_init__(self) -> None:
+        # Solo con las reglas por defecto se garantiza que los dígitos son intercambiables
+        self._digit_invariant = self.rules is None
+        if self.rules is None:
+            self.rules = dict(DEFAULT_HIGHLIGHT_RULES)
+            self.prefilter = self.prefilter or DEFAULT_HIGHLIGHT_PREFILTER
+        pattern = "|".join(f"(?P<{name}>{rule})" for name, (rule, _) in self.rules.items())
+        if self.prefilter:
+            pattern = f"(?={self.prefilter})(?:{pattern})"
+        self._regex = re.compile(pattern)
+        self._codes = {
+            name: _resolve_style(style) + _resolve_color(fore, False) + _resolve_color(bg, True)
+            for name, (_, (fore, bg, style)) in self.rules.items()
+        }
+        self._plans = lru_cache(maxsize=self.cache_size)(self._plan)
+
+    def highlight(self, message: str, base: str = "") -> str:
+        """Colorea las coincidencias y restaura `base` (el color del mensaje) tras cada una."""
+        out = []
+        pos = 0
+        codes = self._codes
+        for m in self._regex.finditer(message):
+            out.append(message[pos:m.start()])
+            out.append(codes[m.lastgroup])
+            out.append(m.group())
+            out.append(_RESET)
+            out.append(base)
+            pos = m.end()
+        if not out:
+            return message
+        out.append(message[pos:])
+        return "".join(out)
+
+    def _plan(self, shape: "str | bytes", base: str) -> "tuple[itemgetter, str] | None":
+        """Escanea `shape` y devuelve (slices a extraer, plantilla %); None si no hay coincidencias."""
+        if isinstance(shape, bytes):
+            # Los dígitos son ASCII: la forma decodificada conserva las posiciones del mensaje
+            shape = shape.decode("utf-8", "surrogatepass")
+        codes = self._codes
+        restore = (_RESET + base).replace("%", "%%")
+        cuts, fmt = [], []
+        pos = 0
+        for m in self._regex.finditer(shape):
+            cuts.append(slice(pos, m.start()))
+            cuts.append(slice(m.start(), m.end()))
+            fmt.append("%s" + codes[m.lastgroup].replace("%", "%%") + "%s" + restore)
+            pos = m.end()
+        if not cuts:
+            return None
+        cuts.append(slice(pos, None))
+        fmt.append("%s")
+        return itemgetter(*cuts), "".join(fmt)
+
+    def render(self, message: str, base: str = "") -> str:
+        """Como `highlight`, pero reutilizando el plan cacheado para la forma del mensaje."""
+        key = message.encode("utf-8", "surrogatepass").translate(_DIGITS_TO_ZERO) if self._digit_invariant else message
+        plan = self._plans(key, base)
+        if plan is None:
+            return message
+        getter, fmt = plan
+        return fmt % getter(message)
+
+    def apply(self, record: logging.LogRecord, message: str, base: str = "") -> str:
+        """Resalta `message`, el texto ya formateado de `record`."""
+        return self.render(message, base)
+
+
+# Partes de un traceback → (fore, bg, style)
+DEFAULT_TRACEBACK_PALETTE: dict[str, _ColorSpec] = {
+    "header":    ("#718096", None, "dim"),
+    "file":      ("#63B3ED", None, None),
+    "lineno":    ("#F59E0B", None, None),
+    "function":  ("#0ECB81", None, "bold"),
+    "source":    ("#E2E8F0", None, None),
+    "caret":     ("#F6465D", None, None),
+    "exception": ("#F6465D", None, "bold"),
+    "message":   ("#FC8181", None, None),
+    "repeat":    ("#B794F4", None, None),
+}
+
+_TB_FRAME_RE = re.compile(r'(  File ")(.*)(", line )(\d+)(, in )(.*)')
+_TB_HEADER = "Traceback (most recent call last):"
+
+
+@dataclass
+class Tracebacks:
+    """
+    Tracebacks coloreados y deduplicados para PintarFormatter.
+
+    La primera vez que aparece un traceback se formatea entero (archivo, línea,
+    función y código fuente con su color) y se numera: "Traceback #3 (most
+    recent call last):". Si vuelve a ocurrir la misma excepción por el mismo
+    camino de código, se muestra solo una referencia con la excepción actual y
+    un contador:
+
+        ↻ ConnectionError: broker caído  (traceback #3 ×1204)
+
+    La clave es (tipo de excepción, cadena de (code object, línea)) de todo el
+    traceback, incluidas las excepciones encadenadas: se calcula recorriendo
+    los frames, sin leer archivos ni formatear nada. Cada formatter lleva su
+    propia caché, así que cada destino muestra el traceback completo al menos
+    una vez.
+
+    Parámetros
+    ──────────
+    palette    : parte → (fore, bg, style), encima de DEFAULT_TRACEBACK_PALETTE.
+                 Partes: header, file, lineno, function, source, caret,
+                 exception, message, repeat.
+    dedup      : False formatea (y colorea) todos los tracebacks enteros.
+    cache_size : tracebacks distintos recordados; el más antiguo se olvida.
+
+    Ejemplo
+    ───────
+        Theme(tracebacks=Tracebacks())
+        Theme(tracebacks=Tracebacks({"function": ("#F0B90B", None, "bold")}, dedup=False))
+    """
+    palette: dict[str, _ColorSpec] = field(default_factory=dict)
+    dedup: bool = True
+    cache_size: int = 256
+
+    def renderer(self, dye: bool = True) -> "_TracebackRenderer":
+        """Crea el renderizador (con su caché) que usa un formatter."""
+        return _TracebackRenderer(self, dye)
+
+
+class _TracebackRenderer:
+    """Renderizado y caché de tracebacks de un formatter."""
+
+    def __init__(self, config: Tracebacks, dye: bool) -> None:
+        palette = {**DEFAULT_TRACEBACK_PALETTE, **config.palette}
+        self.dye = dye
+        self.dedup = config.dedup
+        self.cache_size = config.cache_size
+        self._codes = {
+            part: (_resolve_style(style) + _resolve_color(fore, False) + _resolve_color(bg, True)) if dye else ""
+            for part, (fore, bg, style) in palette.items()
+        }
+        # clave → [número, veces vista]; el orden de inserción es el de expulsión
+        self._seen: dict = {}
+        self._next_ref = 1
+        self._lock = threading.Lock()
+
+    def _paint(self, part: str, text: str) -> str:
+        code = self._codes[part]
+        return f"{code}{text}{_RESET}" if code else text
+
+    def render(self, exc_info) -> str:
+        """Traceback de `exc_info`, completo la primera vez y como referencia después."""
+        if not self.dedup:
+            return self._full(exc_info, None)
+        key = _traceback_key(exc_info[1])
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None:
+                if len(self._seen) >= self.cache_size:
+                    del self._seen[next(iter(self._seen))]
+                entry = self._seen[key] = [self._next_ref, 0]
+                self._next_ref += 1
+            entry[1] += 1
+            ref, count = entry
+        if count == 1:
+            return self._full(exc_info, ref)
+        exc_type, exc_value = exc_info[0], exc_info[1]
+        return (f"{self._paint('repeat', '↻')} {self._exception_line(exc_type, exc_value)}  "
+                f"{self._paint('repeat', f'(traceback #{ref} ×{count})')}")
+
+    def _exception_line(self, exc_type, exc_value) -> str:
+        line = traceback.format_exception_only(exc_type, exc_value)[-1].rstrip("\n")
+        name, sep, message = line.partition(": ")
+        return self._paint("exception", name) + (sep + self._paint("message", message) if sep else "")
+
+    def _full(self, exc_info, ref: int | None) -> str:
+        lines = traceback.format_exception(*exc_info)
+        if ref is not None:
+            # Numerar el primer encabezado para que las referencias lo encuentren
+            for i, chunk in enumerate(lines):
+                if chunk.startswith(_TB_HEADER):
+                    lines[i] = chunk.replace(_TB_HEADER, f"Traceback #{ref} (most recent call last):", 1)
+                    break
+        text = "".join(lines).rstrip("\n")
+        if not self.dye:
+            return text
+        return "\n".join(self._paint_line(line) for line in text.split("\n"))
+
+    def _paint_line(self, line: str) -> str:
+        if line.startswith("  File "):
+            m = _TB_FRAME_RE.match(line)
+            if m:
+                return (m[1] + self._paint("file", m[2]) + m[3] + self._paint("lineno", m[4]) + m[5]
+                        + self._paint("function", m[6]))
+        elif line.startswith("    "):
+            if line.strip(" ^~") == "":
+                return self._paint("caret", line)
+            return self._paint("source", line)
+        elif line.startswith("Traceback ") or line.startswith("During handling") or line.startswith("The above"):
+            return self._paint("header", line)
+        elif line and not line[0].isspace():
+            name, sep, message = line.partition(": ")
+            return self._paint("exception", name) + (sep + self._paint("message", message) if sep else "")
+        return line
+
+
+def _traceback_key(exc: BaseException) -> tuple:
+    """(tipo, ((code, línea), …)) de la excepción y de las que encadena, sin formatear nada."""
+    key = []
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        frames = []
+        tb = exc.__traceback__
+        while tb is not None:
+            frames.append((tb.tb_frame.f_code, tb.tb_lineno))
+            tb = tb.tb_next
+        key.append((type(exc), tuple(frames)))
+        exc = exc.__cause__ if exc.__cause__ is not None else (None if exc.__suppress_context__ else exc.__context__)
+    return tuple(key)
+
+
 @dataclass
 class Theme:
     """
@@ -305,6 +621,18 @@ class Theme:
                más cualquier campo definido en `fields`.
     datefmt  : formato de la fecha para asctime.
     dye      : False → salida sin color ANSI (para handlers de archivo).
+    highlighter : Highlighter opcional que colorea patrones dentro del mensaje
+               (números, precios, símbolos, LONG/SHORT…). Se ignora si dye=False.
+    tracebacks : Tracebacks opcional: tracebacks coloreados y deduplicados.
+               Con dye=False se deduplican igual, sin color.
+    auto_contrast : contraste WCAG mínimo del texto sobre su fondo (4.5 = AA;
+               True equivale a 4.5). En cada spec con bg, un fore que no llegue
+               (o None) se sustituye por el más legible entre él, blanco y negro.
+    message_width : columnas visibles máximas del mensaje (None = sin límite).
+               Uno más largo se corta con "…" sin romper sus colores ni los del
+               resaltador (ver `pintar.text.truncate`). Para ajustarlo a la
+               terminal: shutil.get_terminal_size().columns menos el ancho del
+               resto del fmt.
     fields   : dict de campos personalizados nombre → FieldDef.
                Cada campo se inyecta automáticamente en el fmt y en la paleta.
 
@@ -330,6 +658,10 @@ class Theme:
     datefmt: str = _DEFAULT_DATEFMT
     dye: bool = True
     fields: dict[str, "FieldDef"] = field(default_factory=dict)
+    highlighter: "Highlighter | None" = None
+    tracebacks: "Tracebacks | None" = None
+    auto_contrast: "float | bool" = False
+    message_width: int | None = None
 
     def palette_for(self, level_name: str) -> dict[str, _ColorSpec]:
         """
@@ -342,17 +674,54 @@ class Theme:
         # Inyectar campos personalizados con su spec para este nivel
         for field_name, fdef in self.fields.items():
             base[field_name] = fdef.spec_for(level_name)
+        if self.auto_contrast:
+            minimum = 4.5 if self.auto_contrast is True else self.auto_contrast
+            for part, (fore, bg, style) in base.items():
+                if bg is not None and (fore is None or contrast_ratio(fore, bg) < minimum):
+                    candidates = DEFAULT_FOREGROUNDS if fore is None else (fore, *DEFAULT_FOREGROUNDS)
+                    base[part] = (best_foreground(bg, candidates), bg, style)
         return base
 
     def undyed(self) -> "Theme":
         """Copia sin color — para handlers de archivo."""
-        return Theme(self.overrides, self.fmt, self.datefmt, dye=False, fields=self.fields)
+        return Theme(self.overrides, self.fmt, self.datefmt, dye=False, fields=self.fields,
+                     highlighter=self.highlighter, tracebacks=self.tracebacks, auto_contrast=self.auto_contrast,
+                     message_width=self.message_width)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # SECCIÓN 4 — FORMATTER
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Piezas compartidas de cada registro vivo: registro → (msg, args, piezas). No
+# van en record.__dict__: un registro con ContextVar en sus claves no se podría
+# enviar por SocketHandler ni por una QueueHandler a otro proceso.
+_RECORD_PIECES: "weakref.WeakKeyDictionary[logging.LogRecord, tuple]" = weakref.WeakKeyDictionary()
+
+def _compile_template(fmt: str) -> "tuple[itemgetter, str] | None":
+    """
+    Convierte un fmt '{' con campos simples ("{asctime} {bar} {message}") en
+    (getter de valores, plantilla %): ensamblar es una llamada en C en vez de
+    volver a interpretar el fmt con format_map. None si algún campo lleva
+    conversión, especificación o acceso a atributo/índice.
+    """
+    literal, names = [], []
+    for text, name, spec, conversion in string.Formatter().parse(fmt):
+        literal.append(text.replace("%", "%%"))
+        if name is None:
+            continue
+        if spec or conversion or not name.isidentifier():
+            return None
+        literal.append("%s")
+        names.append(name)
+    if not names:
+        return (lambda values: ()), "".join(literal)
+    if len(names) == 1:
+        name = names[0]
+        return (lambda values: (values[name],)), "".join(literal)
+    return itemgetter(*names), "".join(literal)
+
+
 class PintarFormatter(logging.Formatter):
     """
     Formatter con color que:
@@ -371,6 +740,12 @@ class PintarFormatter(logging.Formatter):
         )
         # self.converter = time.datefmt
         self._level_fmts: dict[int, str] = self._build_level_fmts()
+        self._level_templates = {num: _compile_template(fmt) for num, fmt in self._level_fmts.items()}
+        self._highlighter = self._theme.highlighter if self._theme.dye else None
+        self._message_codes: dict[int, str] = self._build_message_codes()
+        self._last_time: tuple[int, str] = (-1, "")
+        tracebacks = self._theme.tracebacks
+        self._tracebacks = tracebacks.renderer(self._theme.dye) if tracebacks is not None else None
 
     def _build_level_fmts(self) -> dict[int, str]:
         """
@@ -383,6 +758,16 @@ class PintarFormatter(logging.Formatter):
             fmts[num] = self._apply_palette(self._theme.fmt, palette)
         return fmts
 
+    def _build_message_codes(self) -> dict[int, str]:
+        """Secuencia ANSI del campo message por nivel: el resaltador la restaura tras cada coincidencia."""
+        codes: dict[int, str] = {}
+        if self._highlighter is None:
+            return codes
+        for name, num in logging._nameToLevel.items():
+            fore, bg, style = self._theme.palette_for(name).get("message", (None, None, None))
+            codes[num] = _resolve_style(style) + _resolve_color(fore, False) + _resolve_color(bg, True)
+        return codes
+
     def _apply_palette(self, fmt: str, palette: dict[str, _ColorSpec]) -> str:
         """
         Sustituye cada {campo} del formato por su versión coloreada.
@@ -399,32 +784,84 @@ class PintarFormatter(logging.Formatter):
                 result = result.replace(placeholder, colored)
         return result
 
+    def _shared_pieces(self, record: logging.LogRecord) -> dict:
+        """
+        Piezas sin color del registro, compartidas por todos los formatters que
+        lo formatean: mensaje, fecha por (datefmt, converter) y valores de campos.
+
+        Se guardan en `_RECORD_PIECES`, fuera del registro, así que con varios
+        handlers cada pieza se calcula una vez y el registro sigue siendo
+        serializable. Si un filtro cambia msg o args entre handlers, la caché
+        se descarta.
+        """
+        shared = _RECORD_PIECES.get(record)
+        if shared is None or shared[0] is not record.msg or shared[1] is not record.args:
+            shared = _RECORD_PIECES[record] = (record.msg, record.args, {"message": record.getMessage()})
+        return shared[2]
+
+    def _format_time(self, record: logging.LogRecord) -> str:
+        """formatTime con memoria del último segundo: datefmt sin milisegundos solo cambia una vez por segundo."""
+        if not self.datefmt:
+            return self.formatTime(record, self.datefmt)
+        second = int(record.created)
+        last = self._last_time
+        if last[0] != second:
+            last = self._last_time = (second, self.formatTime(record, self.datefmt))
+        return last[1]
+
     def format(self, record: logging.LogRecord) -> str:
+        pieces = self._shared_pieces(record)
+
         # Campos built-in extra
         if not hasattr(record, "bar"):
             record.bar = "│"   # U+2502 — más elegante que |
 
         # Poblar campos personalizados automáticamente desde FieldDef
         for field_name, fdef in self._theme.fields.items():
-            setattr(record, field_name, fdef.resolve_value(record))
+            key = (field_name, fdef.source, fdef.value, fdef.context)
+            value = pieces.get(key)
+            if value is None:
+                value = pieces[key] = fdef.resolve_value(record)
+            setattr(record, field_name, value)
 
         record.levelname = record.levelname.ljust(_MAX_LEVEL_LEN)
-        record.asctime   = self.formatTime(record, self.datefmt)
-        record.message   = record.getMessage()
-
-        fmt = self._level_fmts.get(record.levelno, self._level_fmts[logging.INFO])
-        result = fmt.format_map(record.__dict__)
+        key = (self.datefmt, self.converter)
+        asctime = pieces.get(key)
+        if asctime is None:
+            asctime = pieces[key] = self._format_time(record)
+        record.asctime   = asctime
+        record.message   = pieces["message"]
+        if self._highlighter is not None:
+            record.message = self._highlighter.render(record.message, self._message_codes.get(record.levelno, ""))
+        if self._theme.message_width is not None:
+            record.message = truncate(record.message, self._theme.message_width)
+
+        levelno = record.levelno if record.levelno in self._level_fmts else logging.INFO
+        template = self._level_templates[levelno]
+        if template is not None:
+            getter, pattern = template
+            result = pattern % getter(record.__dict__)
+        else:
+            result = self._level_fmts[levelno].format_map(record.__dict__)
 
-        if record.exc_info and not record.exc_text:
-            record.exc_text = self.formatException(record.exc_info)
-        if record.exc_text:
-            result = f"{result}\n{record.exc_text}"
+        if record.exc_info and self._tracebacks is not None:
+            # Texto propio de este formatter: no se guarda en record.exc_text,
+            # que comparten los demás handlers (el de archivo no quiere color)
+            result = f"{result}\n{self._tracebacks.render(record.exc_info)}"
+        else:
+            if record.exc_info and not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            if record.exc_text:
+                result = f"{result}\n{record.exc_text}"
         if record.stack_info:
             result = f"{result}\n{self.formatStack(record.stack_info)}"
 
         return result
 
 
+_instrument.probe(PintarFormatter, "format", "formatter.format", timed=True, output=True)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # SECCIÓN 5 — HANDLERS
 # ──────────────────────────────────────────────────────────────────────────────
@@ -435,22 +872,82 @@ class PintarStreamHandler(logging.StreamHandler):
 
     Parámetros
     ──────────
-    stream : stream de salida (default stdout)
-    theme  : Theme o dict de overrides. Si es dict se wrappea en Theme(overrides=...).
+    stream   : stream de salida (default stdout)
+    theme    : Theme o dict de overrides. Si es dict se wrappea en Theme(overrides=...).
+    binary   : escribir bytes directamente en el buffer binario del stream
+               (pintar.binary.ByteWriter) en vez de pasar por TextIOWrapper.
+    flush_at : solo en modo binario; bytes acumulados antes de volcar con un
+               único os.writev. 0 vuelca en cada registro, como StreamHandler.
     """
-    def __init__(self, stream=None, theme: "Theme | dict | None" = None):
+    def __init__(self, stream=None, theme: "Theme | dict | None" = None, binary: bool = False, flush_at: int = 0):
         super().__init__(stream or sys.stdout)
         if isinstance(theme, dict):
             theme = Theme(overrides=theme)
         elif theme is None:
             theme = Theme()
         self.setFormatter(PintarFormatter(theme))
+        self.flush_at = flush_at
+        self._writer = None
+        if binary:
+            from pintar.binary import ByteWriter
+            self._writer = ByteWriter(self.stream, flush_at=flush_at)
+            self._terminator_bytes = self.terminator.encode(self._writer.encoding)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        writer = self._writer
+        if writer is None:
+            return super().emit(record)
+        try:
+            msg = self.format(record)
+            writer.write(msg)
+            writer.write(self._terminator_bytes)
+            if not self.flush_at:
+                writer.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if self._writer is None:
+            return super().flush()
+        with self.lock:
+            self._writer.flush()
+
+    def close(self) -> None:
+        # Con flush_at > 0 puede quedar un lote pendiente: volcarlo antes de cerrar
+        if self._writer is not None:
+            with self.lock:
+                self._writer.flush()
+        super().close()
+
+    def setStream(self, stream):
+        result = super().setStream(stream)
+        if self._writer is not None and result is not None:
+            from pintar.binary import ByteWriter
+            self._writer = ByteWriter(stream, flush_at=self.flush_at)
+        return result
 
 
 class PintarFileHandler(logging.FileHandler):
     """
     Handler de archivo sin color ANSI.
     Fuerza dye=False independientemente del Theme recibido.
+
+    Parámetros
+    ──────────
+    batched        : modo multiproceso. El archivo se abre con O_APPEND y las
+                     líneas se acumulan en memoria; cada lote sale con un único
+                     os.write, así que varios procesos pueden escribir en el
+                     mismo archivo sin cerrojos y sin cortar líneas.
+    flush_interval : solo en modo batched; segundos entre volcados (un hilo
+                     daemon los hace). 0 escribe cada registro al emitirlo.
+    max_batch      : solo en modo batched; bytes de lote a partir de los cuales
+                     se vuelca sin esperar al intervalo. Un lote se corta
+                     siempre entre líneas.
+
+    En modo batched el archivo se codifica en utf-8 salvo que se pase
+    `encoding`, y `mode` se ignora (siempre se añade al final).
     """
     def __init__(
         self,
@@ -460,8 +957,11 @@ class PintarFileHandler(logging.FileHandler):
         delay: bool = False,
         errors: str | None = None,
         theme: "Theme | dict | None" = None,
+        batched: bool = False,
+        flush_interval: float = 0.2,
+        max_batch: int = 64 * 1024,
     ):
-        super().__init__(filename, mode=mode, encoding=encoding, delay=delay, errors=errors)
+        super().__init__(filename, mode=mode, encoding=encoding, delay=delay or batched, errors=errors)
         if isinstance(theme, dict):
             theme = Theme(overrides=theme, dye=False)
         elif isinstance(theme, Theme):
@@ -469,6 +969,99 @@ class PintarFileHandler(logging.FileHandler):
         else:
             theme = Theme(dye=False)
         self.setFormatter(PintarFormatter(theme))
+        self.batched = batched
+        self._fd = None
+        if batched:
+            self.flush_interval = flush_interval
+            self.max_batch = max_batch
+            self._codec = encoding or "utf-8"
+            self._terminator_bytes = self.terminator.encode(self._codec)
+            self._batch = bytearray()
+            self._fd = os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._flusher = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self.batched:
+            return super().emit(record)
+        try:
+            data = self.format(record).encode(self._codec, self.errors or "replace") + self._terminator_bytes
+            if self._pid != os.getpid():
+                self._after_fork()
+            batch = self._batch
+            if batch and len(batch) + len(data) > self.max_batch:
+                self._write_batch()
+            batch += data
+            if not self.flush_interval or len(batch) >= self.max_batch:
+                self._write_batch()
+            elif self._flusher is None:
+                self._start_flusher()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _after_fork(self) -> None:
+        # El lote heredado es del padre (lo volcará él) y el hilo no sobrevive al fork
+        self._pid = os.getpid()
+        self._batch.clear()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def _start_flusher(self) -> None:
+        # El hilo solo guarda una referencia débil: no mantiene vivo al handler
+        self._flusher = threading.Thread(
+            target=_flush_periodically, args=(weakref.ref(self), self._stop, self.flush_interval),
+            name=f"PintarFileHandler-{self.baseFilename}", daemon=True,
+        )
+        self._flusher.start()
+
+    def _write_batch(self) -> None:
+        """Escribe el lote con un solo os.write (el lock del handler ya está tomado)."""
+        batch = self._batch
+        if not batch:
+            return
+        view = memoryview(batch)
+        try:
+            # Un archivo regular acepta el lote entero; el bucle solo cubre disco lleno o señales
+            while view:
+                view = view[os.write(self._fd, view):]
+        finally:
+            view.release()
+            batch.clear()
+
+    def flush(self) -> None:
+        if not self.batched:
+            return super().flush()
+        with self.lock:
+            if self._fd is not None and self._pid == os.getpid():
+                self._write_batch()
+
+    def close(self) -> None:
+        if self.batched:
+            self._stop.set()
+            with self.lock:
+                if self._fd is not None:
+                    try:
+                        if self._pid == os.getpid():
+                            self._write_batch()
+                    finally:
+                        os.close(self._fd)
+                        self._fd = None
+        super().close()
+
+
+def _flush_periodically(ref: "weakref.ref[PintarFileHandler]", stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        handler = ref()
+        if handler is None:
+            return
+        try:
+            handler.flush()
+        except Exception:
+            handler.handleError(None)
+        del handler
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -520,21 +1113,101 @@ def add_file_handler(
     filename: str,
     level: int = logging.DEBUG,
     theme: "Theme | dict | None" = None,
+    batched: bool = False,
+    flush_interval: float = 0.2,
+    max_batch: int = 64 * 1024,
 ) -> logging.FileHandler:
     """
     Añade un handler de archivo (sin color) al logger existente.
 
+    Con batched=True varios procesos pueden compartir el archivo: ver
+    PintarFileHandler para flush_interval y max_batch.
+
     Ejemplo
     ───────
     >>> log = get_logger("bt")
     >>> add_file_handler(log, "backtest.log")
+    >>> add_file_handler(log, "workers.log", batched=True)   # desde cada proceso
     """
-    handler = PintarFileHandler(filename, theme=theme)
+    handler = PintarFileHandler(filename, theme=theme, batched=batched,
+                                flush_interval=flush_interval, max_batch=max_batch)
     handler.setLevel(level)
     logger.addHandler(handler)
     return handler
 
 
+class BoundLogger:
+    """
+    Logger con valores de contexto fijados: `bind(log, symbol="BTCUSDT")`.
+
+    No es un LoggerAdapter: no hay cadena de adaptadores ni `extra` que
+    fusionar. Cada llamada fija las ContextVar de sus valores (las de
+    `context_var`), llama al logger y las restaura; los FieldDef con
+    `context` las leen al formatear. `bind` sobre un BoundLogger devuelve
+    otro con los valores fusionados y el mismo logger debajo.
+
+    Como las ContextVar son por tarea y por hilo, el mismo BoundLogger puede
+    usarse desde varias tareas asyncio e hilos a la vez. Los handlers que
+    formatean en otro hilo (QueueHandler + QueueListener) no ven el contexto.
+    """
+    __slots__ = ("logger", "_values", "_pairs")
+
+    def __init__(self, logger: logging.Logger, values: dict) -> None:
+        self.logger = logger
+        self._values = values
+        self._pairs = tuple((context_var(name), value) for name, value in values.items())
+
+    def bind(self, **values) -> "BoundLogger":
+        return BoundLogger(self.logger, {**self._values, **values})
+
+    def _log(self, level: int, msg, args, exc_info=None, stacklevel: int = 1, **kwargs) -> None:
+        logger = self.logger
+        if not logger.isEnabledFor(level):
+            return
+        tokens = [(var, var.set(value)) for var, value in self._pairs]
+        try:
+            # +2: el registro apunta a quien llamó a info(), no a este módulo
+            logger._log(level, msg, args, exc_info=exc_info, stacklevel=stacklevel + 2, **kwargs)
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+    def debug(self, msg, *args, **kwargs) -> None:
+        self._log(logging.DEBUG, msg, args, **kwargs)
+
+    def info(self, msg, *args, **kwargs) -> None:
+        self._log(logging.INFO, msg, args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs) -> None:
+        self._log(logging.WARNING, msg, args, **kwargs)
+
+    def error(self, msg, *args, **kwargs) -> None:
+        self._log(logging.ERROR, msg, args, **kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs) -> None:
+        self._log(logging.ERROR, msg, args, exc_info=exc_info, **kwargs)
+
+    def critical(self, msg, *args, **kwargs) -> None:
+        self._log(logging.CRITICAL, msg, args, **kwargs)
+
+    def log(self, level: int, msg, *args, **kwargs) -> None:
+        self._log(level, msg, args, **kwargs)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def __repr__(self) -> str:
+        return f"<BoundLogger {self.logger.name} {self._values!r}>"
+
+
+def bind(logger: logging.Logger, **values) -> BoundLogger:
+    """
+    Logger con `values` fijados en sus campos de contexto:
+    `bind(log, symbol="BTCUSDT", strategy="grid")`. El logger no se modifica.
+    """
+    return BoundLogger(logger, values)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # SECCIÓN 7 — SNIPPET PARA STRATEGY
 # ──────────────────────────────────────────────────────────────────────────────
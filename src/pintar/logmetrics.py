@@ -0,0 +1,316 @@
+# modulo logmetrics.py
+"""
+Métricas del propio logging: cuántos registros, de qué nivel y de qué logger,
+cuánto tarda cada handler en formatear y en emitir, y cuántos bytes escribe.
+
+    from pintar.logmetrics import LogMetrics
+
+    metrics = LogMetrics()
+    metrics.instrument_logger(log)           # todos los handlers del logger
+    metrics.start(interval=10)               # línea de resumen cada 10 s (stderr)
+    ...
+    metrics.snapshot()                       # dict con contadores e histogramas
+    print(metrics.summary())
+
+Sirve para ver, en un backtest, si el logging se ha vuelto el cuello de botella
+sin conectar un profiler.
+
+`instrument(handler)` sustituye `format` y `emit` en la instancia del handler
+(no en la clase) por envoltorios que miden con perf_counter_ns; `uninstrument`
+los quita. La latencia de emit incluye la de format (emit formatea dentro),
+pero no la espera por el cerrojo del handler.
+
+Nada del camino caliente toma cerrojos: cada hilo escribe en su propio
+fragmento de contadores y `snapshot()` los suma. Un registro que pasa por
+varios handlers instrumentados se cuenta una vez (cada hilo recuerda el último
+registro contado). Las latencias van a histogramas logarítmicos con 4
+subdivisiones por potencia de 2: los percentiles son cotas superiores con un
+error de como mucho un 25%.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import weakref
+from time import perf_counter_ns
+
+from .logging import _colorize
+
+# Cubos del histograma: 0-7 ns exactos, luego 4 por potencia de 2. Un valor
+# de n bits (n > 3) cae en (n - 2) * 4 + sus dos bits siguientes al más alto.
+_BUCKETS = 256
+
+
+def _bucket_upper(index: int) -> int:
+    """Cota superior (exclusiva) en ns de los valores del cubo `index`."""
+    if index < 8:
+        return index + 1
+    size, sub = index // 4 + 2, index % 4
+    return (5 + sub) << (size - 3)
+
+
+class _Shard:
+    """Contadores de un hilo. Solo su hilo los modifica."""
+    __slots__ = ("levels", "loggers", "handlers", "last")
+
+    def __init__(self) -> None:
+        self.levels: dict = {}
+        self.loggers: dict = {}
+        # handler → [histograma format, histograma emit, bytes, ns format, ns emit, fragmento]
+        self.handlers: dict = {}
+        self.last = None
+
+
+class LogMetrics:
+    """
+    Contadores e histogramas de latencia del logging.
+
+    Parámetros
+    ──────────
+    stream : destino de la línea de resumen periódica (default sys.stderr).
+    dye    : colorear la línea de resumen.
+    """
+    def __init__(self, stream=None, dye: bool = True) -> None:
+        self.stream = stream
+        self.dye = dye
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[_Shard] = []
+        self._names: dict = {}
+        self._started = time.monotonic()
+        self._stop: threading.Event | None = None
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            # Los fragmentos de hilos terminados se conservan: sus registros cuentan
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    # ==============================
+    # Instrumentación
+    # ==============================
+
+    def instrument(self, handler: logging.Handler, name: str | None = None) -> logging.Handler:
+        """Mide `format` y `emit` de `handler` y cuenta los registros que emite."""
+        if "emit" in handler.__dict__:
+            return handler
+        key = id(handler)
+        self._names[key] = name or handler.get_name() or f"{type(handler).__name__}#{len(self._names)}"
+        format_, emit = handler.format, handler.emit
+        terminator = len(getattr(handler, "terminator", ""))
+        # Estadísticas de este handler en el hilo actual: un acceso de atributo
+        local = threading.local()
+        shard_of = self._shard
+
+        def stats_of():
+            shard = shard_of()
+            stats = local.stats = shard.handlers[key] = [[0] * _BUCKETS, [0] * _BUCKETS, 0, 0, 0, shard]
+            return stats
+
+        # El cubo se calcula en línea: una llamada de función más cuesta tanto como medir
+        def timed_format(record):
+            start = perf_counter_ns()
+            text = format_(record)
+            elapsed = perf_counter_ns() - start
+            try:
+                stats = local.stats
+            except AttributeError:
+                stats = stats_of()
+            size = elapsed.bit_length()
+            stats[0][(size - 2) * 4 + ((elapsed >> (size - 3)) & 3) if size > 3 else elapsed] += 1
+            stats[3] += elapsed
+            stats[2] += (len(text) if text.isascii() else len(text.encode("utf-8", "replace"))) + terminator
+            return text
+
+        def timed_emit(record):
+            start = perf_counter_ns()
+            emit(record)
+            elapsed = perf_counter_ns() - start
+            try:
+                stats = local.stats
+            except AttributeError:
+                stats = stats_of()
+            size = elapsed.bit_length()
+            stats[1][(size - 2) * 4 + ((elapsed >> (size - 3)) & 3) if size > 3 else elapsed] += 1
+            stats[4] += elapsed
+            shard = stats[5]
+            if shard.last is not record:
+                shard.last = record
+                levels, loggers = shard.levels, shard.loggers
+                levels[record.levelno] = levels.get(record.levelno, 0) + 1
+                loggers[record.name] = loggers.get(record.name, 0) + 1
+
+        handler.format = timed_format
+        handler.emit = timed_emit
+        return handler
+
+    def uninstrument(self, handler: logging.Handler) -> None:
+        """Devuelve a `handler` sus métodos originales (las métricas acumuladas se conservan)."""
+        handler.__dict__.pop("format", None)
+        handler.__dict__.pop("emit", None)
+
+    def instrument_logger(self, logger: logging.Logger) -> logging.Logger:
+        """Instrumenta todos los handlers que tiene ahora `logger`."""
+        for handler in logger.handlers:
+            self.instrument(handler)
+        return logger
+
+    # ==============================
+    # Lectura
+    # ==============================
+
+    def snapshot(self) -> dict:
+        """
+        Suma de todos los hilos:
+
+            {"elapsed": s, "records": n, "rate": n/s,
+             "levels": {"INFO": n, …}, "loggers": {"bot": n, …},
+             "handlers": {nombre: {"bytes": n,
+                                   "format": {"count", "mean_us", "p50_us", "p99_us", "max_us"},
+                                   "emit":   {…}}}}
+        """
+        with self._lock:
+            shards = list(self._shards)
+        levels: dict = {}
+        loggers: dict = {}
+        merged: dict = {}
+        for shard in shards:
+            # Copias: el hilo dueño puede estar añadiendo claves mientras tanto
+            for levelno, n in shard.levels.copy().items():
+                name = logging.getLevelName(levelno)
+                levels[name] = levels.get(name, 0) + n
+            for name, n in shard.loggers.copy().items():
+                loggers[name] = loggers.get(name, 0) + n
+            for key, (fmt_hist, emit_hist, size, fmt_ns, emit_ns, _) in shard.handlers.copy().items():
+                total = merged.get(key)
+                if total is None:
+                    total = merged[key] = [[0] * _BUCKETS, [0] * _BUCKETS, 0, 0, 0]
+                total[0] = [a + b for a, b in zip(total[0], fmt_hist)]
+                total[1] = [a + b for a, b in zip(total[1], emit_hist)]
+                total[2] += size
+                total[3] += fmt_ns
+                total[4] += emit_ns
+        elapsed = time.monotonic() - self._started
+        records = sum(levels.values())
+        return {
+            "elapsed": elapsed,
+            "records": records,
+            "rate": records / elapsed if elapsed > 0 else 0.0,
+            "levels": levels,
+            "loggers": loggers,
+            "handlers": {
+                self._names.get(key, str(key)): {
+                    "bytes": size,
+                    "format": _latency(fmt_hist, fmt_ns),
+                    "emit": _latency(emit_hist, emit_ns),
+                }
+                for key, (fmt_hist, emit_hist, size, fmt_ns, emit_ns) in merged.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Pone a cero contadores e histogramas (en su sitio: los hilos siguen escribiendo en ellos)."""
+        with self._lock:
+            for shard in self._shards:
+                shard.levels.clear()
+                shard.loggers.clear()
+                for stats in shard.handlers.values():
+                    stats[0][:] = stats[1][:] = [0] * _BUCKETS
+                    stats[2] = stats[3] = stats[4] = 0
+            self._started = time.monotonic()
+
+    def summary(self, snapshot: dict | None = None) -> str:
+        """Una línea: ritmo, registros por nivel, p50/p99 de emit y bytes por handler."""
+        snap = snapshot or self.snapshot()
+        paint = _colorize if self.dye else (lambda text, *spec: text)
+        parts = [paint(f"{snap['records']} rec", "#E2E8F0", None, "bold"),
+                 paint(f"{snap['rate']:.0f}/s", "#A0AEC0", None, None)]
+        levels = " ".join(paint(f"{name} {n}", _LEVEL_COLORS.get(name, "#A0AEC0"), None, None)
+                          for name, n in sorted(snap["levels"].items(),
+                                                key=lambda item: logging._nameToLevel.get(item[0], 0)))
+        if levels:
+            parts.append(levels)
+        for name, stats in snap["handlers"].items():
+            emit, fmt = stats["emit"], stats["format"]
+            slow = emit["p99_us"] >= 1000
+            parts.append(
+                paint(name, "#63B3ED", None, None) + " "
+                + paint(f"emit p50 {emit['p50_us']:.1f}µs p99 {emit['p99_us']:.1f}µs",
+                        "#F6465D" if slow else "#E2E8F0", None, "bold" if slow else None)
+                + paint(f" (format p50 {fmt['p50_us']:.1f}µs)", "#A0AEC0", None, None)
+                + " " + paint(_human_bytes(stats["bytes"]), "#A0AEC0", None, None)
+            )
+        bar = paint(" │ ", "#4A5568", None, None)
+        return paint("logging", "#4A5568", None, "bold") + bar + bar.join(parts)
+
+    # ==============================
+    # Resumen periódico
+    # ==============================
+
+    def start(self, interval: float = 10.0) -> None:
+        """Escribe `summary()` en `stream` cada `interval` segundos (hilo daemon)."""
+        self.stop()
+        self._stop = threading.Event()
+        threading.Thread(target=_report_periodically, args=(weakref.ref(self), self._stop, interval),
+                         name="pintar-logmetrics", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+_LEVEL_COLORS = {
+    "DEBUG": "#718096", "INFO": "#0ECB81", "WARNING": "#F59E0B", "ERROR": "#F6465D", "CRITICAL": "#FFFFFF",
+}
+
+
+def _latency(hist: list, total_ns: int) -> dict:
+    count = sum(hist)
+    if not count:
+        return {"count": 0, "mean_us": 0.0, "p50_us": 0.0, "p99_us": 0.0, "max_us": 0.0}
+    p50 = p99 = None
+    seen = 0
+    for index, n in enumerate(hist):
+        if not n:
+            continue
+        seen += n
+        if p50 is None and seen * 2 >= count:
+            p50 = index
+        if p99 is None and seen * 100 >= count * 99:
+            p99 = index
+        top = index
+    return {
+        "count": count,
+        "mean_us": total_ns / count / 1000,
+        "p50_us": _bucket_upper(p50) / 1000,
+        "p99_us": _bucket_upper(p99) / 1000,
+        "max_us": _bucket_upper(top) / 1000,
+    }
+
+
+def _human_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _report_periodically(ref: "weakref.ref[LogMetrics]", stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        metrics = ref()
+        if metrics is None:
+            return
+        stream = metrics.stream or sys.stderr
+        try:
+            stream.write(metrics.summary() + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            return
+        del metrics
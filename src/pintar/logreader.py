@@ -0,0 +1,383 @@
+# modulo logreader.py
+"""
+Lectura de logs planos escritos por PintarFileHandler: índice en disco,
+consultas por nivel y rango de tiempo, y salida con la paleta del Theme.
+
+    from pintar.logreader import LogReader
+
+    reader = LogReader("bot.log")                      # mismo Theme que al escribir
+    for entry in reader.query(levels=["ERROR"], start="14:00", end="14:05"):
+        print(reader.render(entry))
+
+    python -m pintar.logreader bot.log --level ERROR --since 14:00 --until 14:05
+
+El parser se deriva de `Theme.fmt` y `Theme.datefmt`: cada línea que encaja
+con el formato abre un registro; las que no (tracebacks, mensajes de varias
+líneas) pertenecen al registro anterior.
+
+El archivo se lee con mmap y el índice se guarda junto a él (`bot.log.pidx`):
+desplazamiento, timestamp y nivel de cada registro en columnas binarias. Si
+el log crece, solo se indexa lo nuevo y se añade un bloque al índice; si se
+rota o cambia el formato, se reconstruye. Las consultas por tiempo hacen
+búsqueda binaria sobre los timestamps (el log se asume en orden temporal) y
+el filtro de nivel recorre la columna de niveles en C, así que solo se leen
+del archivo los registros que se muestran.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import mmap
+import os
+import re
+import string
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime, time as dtime
+from typing import Iterable, Iterator, NamedTuple
+
+from .logging import PintarFormatter, Theme
+
+_MAGIC = b"PNTRIDX1"
+# magic, crc del formato, crc de los primeros bytes del log
+_HEADER = struct.Struct("<8sII")
+# fin del tramo indexado, registros del bloque
+_BLOCK = struct.Struct("<QI")
+_HEAD_BYTES = 4096
+
+# Directivas de strftime → regex de bytes
+_STRFTIME_RE = {
+    "Y": rb"\d{4}", "y": rb"\d\d", "m": rb"\d\d", "d": rb"[ \d]\d", "H": rb"\d\d", "I": rb"\d\d",
+    "M": rb"\d\d", "S": rb"\d\d", "f": rb"\d{1,6}", "j": rb"\d{3}", "p": rb"[AaPp][Mm]",
+    "b": rb"[A-Za-z]{3}", "a": rb"[A-Za-z]{3}", "B": rb"[A-Za-z]+", "A": rb"[A-Za-z]+",
+    "z": rb"[+-]\d{4}", "Z": rb"[A-Za-z_+\-]*", "%": rb"%",
+}
+
+
+class LogEntry(NamedTuple):
+    """Un registro del log: posición en el archivo, momento y nivel."""
+    index: int
+    offset: int
+    end: int
+    created: float
+    levelno: int
+
+
+def _datefmt_regex(datefmt: str | None) -> bytes:
+    if datefmt is None:
+        # Formato por defecto de logging: "2026-10-19 14:00:00,123"
+        return rb"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}"
+    out = []
+    parts = datefmt.split("%")
+    out.append(re.escape(parts[0].encode()))
+    for part in parts[1:]:
+        if not part:
+            continue
+        out.append(_STRFTIME_RE.get(part[0], rb".+?"))
+        out.append(re.escape(part[1:].encode()))
+    return b"".join(out)
+
+
+def line_regex(fmt: str, datefmt: str | None) -> "re.Pattern[bytes]":
+    """
+    Expresión regular (bytes, multilínea) que reconoce la primera línea de un
+    registro escrito con `fmt` sin color. Grupos con nombre por campo.
+    """
+    out = [b"^"]
+    seen = set()
+    fields = list(string.Formatter().parse(fmt))
+    for i, (literal, name, _, _) in enumerate(fields):
+        out.append(re.escape(literal.encode()))
+        if name is None:
+            continue
+        group = name.encode()
+        if name in seen:
+            out.append(b"(?P=%s)" % group)
+            continue
+        seen.add(name)
+        last = i == len(fields) - 1 and not any(f[0] for f in fields[i + 1:])
+        if name == "asctime":
+            out.append(b"(?P<asctime>%s)" % _datefmt_regex(datefmt))
+        elif name == "levelname":
+            # ljust al ancho del nivel más largo
+            out.append(rb"(?P<levelname>\S+) *")
+        elif name == "message" and last:
+            out.append(rb"(?P<message>.*)")
+        else:
+            out.append(b"(?P<%s>.*?)" % group if not last else b"(?P<%s>.*)" % group)
+    out.append(b"$")
+    return re.compile(b"".join(out), re.MULTILINE)
+
+
+class LogReader:
+    """
+    Lector indexado de un log de PintarFileHandler.
+
+    Parámetros
+    ──────────
+    path       : archivo de log.
+    theme      : Theme con el que se escribió (fmt y datefmt) y con cuya paleta
+                 se renderiza. Default Theme().
+    index_path : archivo del índice (default `path + ".pidx"`).
+    """
+    def __init__(self, path: str, theme: Theme | None = None, index_path: str | None = None) -> None:
+        self.path = path
+        self.theme = theme or Theme()
+        self.index_path = index_path or path + ".pidx"
+        self._regex = line_regex(self.theme.fmt, self.theme.datefmt)
+        self._fmt_crc = zlib.crc32(f"{self.theme.fmt}\0{self.theme.datefmt}".encode())
+        self._offsets = array("Q")
+        self._times = array("d")
+        self._levels = array("B")
+        self._indexed = 0
+        self._file = None
+        self._map = None
+        self._formatters: dict = {}
+        self._time_cache: dict = {}
+
+    # ==============================
+    # Índice
+    # ==============================
+
+    def refresh(self) -> int:
+        """Carga el índice, indexa lo que falte y devuelve el número de registros."""
+        size = os.path.getsize(self.path)
+        if self._indexed == 0 or size < self._indexed:
+            self._load(size)
+        if size > self._indexed:
+            self._extend(size)
+        return len(self._offsets)
+
+    def __len__(self) -> int:
+        return self.refresh()
+
+    def _head_crc(self, size: int) -> int:
+        """Huella de los primeros bytes del log (hasta `size`): cambia si se rota."""
+        with open(self.path, "rb") as f:
+            return zlib.crc32(f.read(min(size, _HEAD_BYTES)))
+
+    def _reset(self) -> None:
+        self._offsets = array("Q")
+        self._times = array("d")
+        self._levels = array("B")
+        self._indexed = 0
+
+    def _load(self, size: int) -> None:
+        self._reset()
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        valid = stored_head = False
+        if len(data) >= _HEADER.size:
+            magic, fmt_crc, stored_head = _HEADER.unpack_from(data)
+            valid = magic == _MAGIC and fmt_crc == self._fmt_crc
+        pos = _HEADER.size
+        while valid and pos + _BLOCK.size <= len(data):
+            end, count = _BLOCK.unpack_from(data, pos)
+            pos += _BLOCK.size
+            need = count * 17
+            if pos + need > len(data) or end > size:
+                break
+            self._offsets.frombytes(data[pos:pos + count * 8])
+            self._times.frombytes(data[pos + count * 8:pos + count * 16])
+            self._levels.frombytes(data[pos + count * 16:pos + need])
+            pos += need
+            self._indexed = end
+        if valid and self._indexed and stored_head != self._head_crc(self._indexed):
+            valid = False
+        if not valid or pos != len(data):
+            # Índice de otro formato, de otro archivo (log rotado) o truncado: se rehace
+            self._reset()
+            with open(self.index_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, self._fmt_crc, 0))
+
+    def _extend(self, size: int) -> None:
+        mm = self._mmap(size)
+        end = mm.rfind(b"\n", self._indexed, size) + 1
+        if end <= self._indexed:
+            return
+        offsets, times, levels = array("Q"), array("d"), array("B")
+        to_time = self._to_time if "asctime" in self._regex.groupindex else None
+        level_of = logging._nameToLevel.get if "levelname" in self._regex.groupindex else None
+        for m in self._regex.finditer(mm, self._indexed, end):
+            offsets.append(m.start())
+            times.append(to_time(m["asctime"]) if to_time else 0.0)
+            levels.append(min(level_of(m["levelname"].decode("ascii", "replace"), 0), 255) if level_of else 0)
+        previous, self._indexed = self._indexed, end
+        self._offsets.extend(offsets)
+        self._times.extend(times)
+        self._levels.extend(levels)
+        with open(self.index_path, "r+b") as f:
+            if previous < _HEAD_BYTES:
+                # La huella cubre los primeros bytes indexados: crece con ellos
+                f.write(_HEADER.pack(_MAGIC, self._fmt_crc, zlib.crc32(mm[:min(end, _HEAD_BYTES)])))
+            f.seek(0, os.SEEK_END)
+            f.write(_BLOCK.pack(end, len(offsets)))
+            f.write(offsets.tobytes())
+            f.write(times.tobytes())
+            f.write(levels.tobytes())
+
+    def _to_time(self, asctime: bytes) -> float:
+        cache = self._time_cache
+        value = cache.get(asctime)
+        if value is None:
+            if len(cache) > 4096:
+                cache.clear()
+            text = asctime.decode("ascii", "replace")
+            datefmt = self.theme.datefmt
+            if datefmt is None:
+                base, _, msecs = text.partition(",")
+                value = datetime.strptime(base, "%Y-%m-%d %H:%M:%S").timestamp() + int(msecs or 0) / 1000
+            else:
+                value = datetime.strptime(text, datefmt).timestamp()
+            cache[asctime] = value
+        return value
+
+    def _mmap(self, size: int) -> mmap.mmap:
+        if self._map is None or len(self._map) < size:
+            self.close()
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "LogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ==============================
+    # Consultas
+    # ==============================
+
+    def _timestamp(self, value) -> float:
+        """datetime, epoch, "2026-10-19 14:00" o "14:00" (día del primer registro)."""
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, datetime):
+            return value.timestamp()
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            day = datetime.fromtimestamp(self._times[0]).date() if self._times else datetime.now().date()
+            return datetime.combine(day, dtime.fromisoformat(value)).timestamp()
+
+    def query(self, levels: Iterable | None = None, min_level: "int | str | None" = None,
+              start=None, end=None) -> Iterator[LogEntry]:
+        """
+        Registros con nivel en `levels` (nombres o números) y/o >= `min_level`,
+        con timestamp en [start, end).
+        """
+        count = self.refresh()
+        lo, hi = 0, count
+        if start is not None or end is not None:
+            if "asctime" not in self._regex.groupindex:
+                raise ValueError("el fmt no tiene {asctime}: no se puede filtrar por tiempo")
+            if start is not None:
+                lo = bisect_left(self._times, self._timestamp(start))
+            if end is not None:
+                hi = bisect_left(self._times, self._timestamp(end), lo)
+        wanted = None
+        if levels is not None:
+            wanted = {_levelno(level) for level in levels}
+        if min_level is not None:
+            floor = _levelno(min_level)
+            wanted = {n for n in (wanted if wanted is not None else range(256)) if n >= floor}
+        offsets, times, levels_col = self._offsets, self._times, self._levels
+        if wanted is None:
+            positions = range(lo, hi)
+        else:
+            # Filtrar la columna de niveles con una clase de bytes: el recorrido es en C
+            if not wanted:
+                return
+            charset = re.compile(b"[" + b"".join(re.escape(bytes([n])) for n in sorted(wanted) if n < 256) + b"]")
+            column = levels_col[lo:hi].tobytes()
+            positions = (lo + m.start() for m in charset.finditer(column))
+        for i in positions:
+            stop = offsets[i + 1] if i + 1 < count else self._indexed
+            yield LogEntry(i, offsets[i], stop, times[i], levels_col[i])
+
+    def text(self, entry: LogEntry) -> str:
+        """Texto plano del registro (con sus líneas de continuación, sin el salto final)."""
+        mm = self._mmap(entry.end)
+        return mm[entry.offset:entry.end].decode("utf-8", "replace").rstrip("\n")
+
+    def render(self, entry: LogEntry, dye: bool = True) -> str:
+        """Registro formateado de nuevo con el Theme (con color si `dye`)."""
+        text = self.text(entry)
+        first, _, rest = text.partition("\n")
+        m = self._regex.match(first.encode())
+        if m is None:
+            return text
+        fields = {name: value.decode("utf-8", "replace") for name, value in m.groupdict().items()}
+        levelname = fields.pop("levelname", logging.getLevelName(entry.levelno))
+        record = logging.makeLogRecord({
+            "name": fields.pop("name", ""), "levelname": levelname, "levelno": entry.levelno,
+            "msg": fields.pop("message", ""), "args": None, "created": entry.created,
+            "msecs": (entry.created % 1) * 1000, "exc_text": rest or None,
+        })
+        fields.pop("asctime", None)
+        for name, value in fields.items():
+            fdef = self.theme.fields.get(name)
+            # Un FieldDef dinámico vuelve a leer su valor del atributo `source`
+            setattr(record, fdef.source if fdef is not None and fdef.source else name, value)
+        formatter = self._formatters.get(dye)
+        if formatter is None:
+            formatter = self._formatters[dye] = PintarFormatter(self.theme if dye else self.theme.undyed())
+        return formatter.format(record)
+
+
+def _levelno(level: "int | str") -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(level.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"nivel desconocido: {level!r}")
+    return value
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pintar.logreader", description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="log escrito por PintarFileHandler")
+    parser.add_argument("--level", action="append", help="nivel a mostrar (repetible)")
+    parser.add_argument("--min-level", help="nivel mínimo")
+    parser.add_argument("--since", help="desde (ISO, o HH:MM del día del log)")
+    parser.add_argument("--until", help="hasta, sin incluir")
+    parser.add_argument("--fmt", help="fmt del Theme con el que se escribió")
+    parser.add_argument("--datefmt", help="datefmt del Theme con el que se escribió")
+    parser.add_argument("--no-color", action="store_true", help="salida sin color")
+    args = parser.parse_args(argv)
+
+    theme = Theme()
+    if args.fmt:
+        theme.fmt = args.fmt
+    if args.datefmt:
+        theme.datefmt = args.datefmt
+    with LogReader(args.path, theme) as reader:
+        out = sys.stdout
+        try:
+            for entry in reader.query(args.level, args.min_level, args.since, args.until):
+                out.write(reader.render(entry, dye=not args.no_color) + "\n")
+            out.flush()
+        except BrokenPipeError:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, out.fileno())
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
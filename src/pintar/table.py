@@ -0,0 +1,181 @@
+# modulo table.py
+"""
+Tablas alineadas, con bordes y filas cebra, que miden el ancho visible de
+cada celda ignorando las secuencias ANSI.
+
+    from pintar import Table, dye
+
+    t = Table(["símbolo", "precio"], align=["<", ">"], zebra="#1A202C")
+    t.add_row("BTCUSDT", dye("45230.5", fore="#0ECB81"))
+    print(t)
+
+Para tablas enormes `Table.stream()` fija los anchos con las primeras N filas
+y emite el resto línea a línea sin retenerlas en memoria.
+"""
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+from .core import dye, pstr
+from ._util import visible_len, pad_visible, clip_visible
+
+# Caracteres de borde en orden:
+# esquina sup-izq, horizontal, cruce sup, esquina sup-der, vertical,
+# cruce izq, cruce central, cruce der, esquina inf-izq, cruce inf, esquina inf-der
+BORDERS = {
+    "light":  "┌─┬┐│├┼┤└┴┘",
+    "heavy":  "┏━┳┓┃┣╋┫┗┻┛",
+    "double": "╔═╦╗║╠╬╣╚╩╝",
+    "round":  "╭─┬╮│├┼┤╰┴╯",
+    "ascii":  "+-++|++++++",
+    "none":   "           ",
+}
+
+_RESET = "\033[0m"
+# Secuencias que anulan el fondo o la intensidad de una fila cebra o de la cabecera
+_ROW_BREAKERS = ("\033[0m", "\033[49m", "\033[22m")
+
+# Celda ya medida: (texto renderizado, ancho visible)
+_Cell = Tuple[str, int]
+
+
+def _color_sgr(color: Any, is_bg: bool = False) -> str:
+    """Secuencia ANSI TrueColor para un color en cualquier formato aceptado por dye."""
+    rgb = dye._process_color_parameter(color)
+    if rgb is None:
+        return ""
+    return f"\033[{48 if is_bg else 38};2;{dye._color_to_ansi_rgb_seccion(rgb)}m"
+
+
+def _measure(value: Any) -> _Cell:
+    """Convierte una celda a texto y calcula su ancho visible una sola vez."""
+    if isinstance(value, dye):
+        return value.string_format, len(value)
+    if isinstance(value, pstr):
+        text = value.string_format or ""
+        return text, visible_len(text)
+    text = value if isinstance(value, str) else str(value)
+    return text, visible_len(text)
+
+
+class Table:
+    """Tabla de texto que alinea celdas str, dye o pstr por su ancho visible."""
+
+    def __init__(
+        self,
+        headers: Sequence[Any] | None = None,
+        rows: Iterable[Sequence[Any]] | None = None,
+        align: str | Sequence[str] = "<",
+        border: str = "light",
+        border_color: Any = None,
+        zebra: Any = None,
+        header_style: str | None = "bold",
+        padding: int = 1,
+    ) -> None:
+        self.headers: List[_Cell] | None = [_measure(h) for h in headers] if headers is not None else None
+        self.rows: List[List[_Cell]] = []
+        self.align = align
+        self.border = BORDERS[border]
+        self.padding = padding
+
+        self._border_sgr = _color_sgr(border_color)
+        self._zebra_sgr = _color_sgr(zebra, is_bg=True)
+        style = dye._style_to_ansi_seccion(header_style)
+        self._header_sgr = f"\033[{style}m" if style else ""
+
+        for row in rows or ():
+            self.add_row(*row)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add_row(self, *cells: Any) -> None:
+        """Añade una fila; cada celda se mide en el momento y su ancho queda cacheado."""
+        self.rows.append([_measure(c) for c in cells])
+
+    def render(self) -> str:
+        """Devuelve la tabla completa como una sola cadena."""
+        widths = self._column_widths(self.rows)
+        return "\n".join(self._lines(self.rows, widths))
+
+    def stream(self, rows: Iterable[Sequence[Any]] | None = None, sample: int = 100) -> Iterator[str]:
+        """
+        Genera la tabla línea a línea.
+
+        Los anchos de columna se fijan con las filas ya añadidas más las primeras
+        `sample` filas de `rows`; las filas posteriores se recortan a esos anchos.
+        Solo se retienen en memoria las filas de la muestra.
+        """
+        it = iter(rows or ())
+        head = [[_measure(c) for c in row] for row in islice(it, sample)]
+        widths = self._column_widths(self.rows + head)
+
+        def measured() -> Iterator[List[_Cell]]:
+            yield from self.rows
+            yield from head
+            for row in it:
+                yield [_measure(c) for c in row]
+
+        return self._lines(measured(), widths)
+
+    # ==============================
+    # Construcción de líneas
+    # ==============================
+
+    def _column_widths(self, rows: Iterable[List[_Cell]]) -> List[int]:
+        widths: List[int] = [w for _, w in self.headers] if self.headers else []
+        for row in rows:
+            if len(row) > len(widths):
+                widths.extend([0] * (len(row) - len(widths)))
+            for i, (_, w) in enumerate(row):
+                if w > widths[i]:
+                    widths[i] = w
+        return widths
+
+    def _aligns(self, columns: int) -> List[str]:
+        if isinstance(self.align, str):
+            return [self.align] * columns
+        aligns = list(self.align)
+        return aligns + ["<"] * (columns - len(aligns))
+
+    def _rule(self, widths: List[int], left: str, cross: str, right: str) -> str:
+        horizontal = self.border[1]
+        line = left + cross.join(horizontal * (w + 2 * self.padding) for w in widths) + right
+        return self._paint_border(line)
+
+    def _paint_border(self, text: str) -> str:
+        return f"{self._border_sgr}{text}{_RESET}" if self._border_sgr else text
+
+    def _row_line(self, row: List[_Cell], widths: List[int], aligns: List[str], sgr: str = "") -> str:
+        pad = " " * self.padding
+        vertical = self._paint_border(self.border[4])
+        cells = []
+        for i, width in enumerate(widths):
+            text, w = row[i] if i < len(row) else ("", 0)
+            if w > width:
+                text, w = clip_visible(text, width), width
+            cell = pad + pad_visible(text, w, width, aligns[i]) + pad
+            if sgr:
+                # Reabrir el estilo de la fila tras cada reset interno de la celda
+                for code in _ROW_BREAKERS:
+                    if code in cell:
+                        cell = cell.replace(code, code + sgr)
+                cell = sgr + cell + _RESET
+            cells.append(cell)
+        return vertical + vertical.join(cells) + vertical
+
+    def _lines(self, rows: Iterable[List[_Cell]], widths: List[int]) -> Iterator[str]:
+        b = self.border
+        aligns = self._aligns(len(widths))
+        if not widths:
+            return
+
+        yield self._rule(widths, b[0], b[2], b[3])
+        if self.headers is not None:
+            yield self._row_line(self.headers, widths, aligns, self._header_sgr)
+            yield self._rule(widths, b[5], b[6], b[7])
+        for i, row in enumerate(rows):
+            yield self._row_line(row, widths, aligns, self._zebra_sgr if i % 2 else "")
+        yield self._rule(widths, b[8], b[9], b[10])
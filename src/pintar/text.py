@@ -0,0 +1,221 @@
+# modulo text.py
+"""
+Ajuste de texto con escapes ANSI: `wrap`, `truncate`, `pad`, `center` e
+`indent` miden el ancho visible (ver `display_width`) y conservan el estilo.
+
+    from pintar.text import wrap, truncate
+
+    for line in wrap(dye("texto largo…", fore="#0ECB81"), 40):
+        print(line)
+    truncate(mensaje, 60)          # "…" en el estilo del texto cortado
+
+Nada se despinta ni se vuelve a pintar: el texto se recorre una vez, secuencia
+a secuencia, llevando el estilo activo (el Style de `ansiparse`). Los trozos de
+texto entre secuencias se copian enteros; solo el trozo donde cae un corte se
+mide carácter a carácter.
+
+Cada línea que producen `wrap` e `indent` termina sin estilo abierto (se
+cierra con la transición SGR mínima a PLAIN) y la siguiente reabre el estilo
+que estaba activo, así que las líneas se pueden imprimir por separado,
+prefijar o alinear sin que un color se derrame. Las secuencias que no son SGR
+(títulos, hipervínculos OSC 8) se copian tal cual y no ocupan columnas.
+"""
+import re
+
+from .ansiparse import PLAIN, _SEQUENCE_RE, _apply_sgr_run, _transition
+from .width import display_width
+from ._util import _clip_columns, pad_visible
+
+# Trozo de texto sin escapes: salto de línea, espacios o palabra
+_TOKEN_RE = re.compile(r"(\n)|([ \t]+)|[^ \t\n]+")
+
+
+def visible_width(text: str) -> int:
+    """Columnas que ocupa `text` en la terminal, sin contar sus escapes ANSI."""
+    if "\x1b" not in text:
+        return display_width(text)
+    width = 0
+    pos = 0
+    for m in _SEQUENCE_RE.finditer(text):
+        if m.start() > pos:
+            width += display_width(text[pos:m.start()])
+        pos = m.end()
+    return width + display_width(text[pos:]) if pos < len(text) else width
+
+
+def truncate(text: str, width: int, ellipsis: str = "…") -> str:
+    """
+    Recorta `text` a `width` columnas visibles. Si no cabe, termina en
+    `ellipsis` (con el estilo que había en el corte) y cierra el estilo
+    abierto; si cabe, lo devuelve sin tocar.
+    """
+    ellipsis_width = display_width(ellipsis)
+    if ellipsis_width > width:
+        ellipsis, ellipsis_width = "", 0
+    budget = width - ellipsis_width
+    if "\x1b" not in text:
+        if text.isascii() and text.isprintable():
+            return text if len(text) <= width else text[:budget] + ellipsis
+        if display_width(text) <= width:
+            return text
+        return _clip_columns(text, budget)[0] + ellipsis
+
+    if text.isascii() and len(text) <= width:
+        return text
+    # El estilo solo hace falta si hay corte: se guardan las rachas SGR hasta él
+    runs = []
+    used = 0
+    cut = None
+    pos = 0
+    for m in _SEQUENCE_RE.finditer(text):
+        start = m.start()
+        if start > pos:
+            columns = display_width(text[pos:start])
+            if cut is None and used + columns > budget:
+                cut = pos + len(_clip_columns(text[pos:start], budget - used)[0])
+            used += columns
+            if used > width:
+                break
+        if cut is None and m["sgr"] is not None:
+            runs.append(m["sgr"])
+        pos = m.end()
+    else:
+        if pos < len(text):
+            columns = display_width(text[pos:])
+            if cut is None and used + columns > budget:
+                cut = pos + len(_clip_columns(text[pos:], budget - used)[0])
+            used += columns
+    if used <= width:
+        return text
+    style = PLAIN
+    for run in runs:
+        style = _apply_sgr_run(style, run)
+    return text[:cut] + ellipsis + _transition(style, PLAIN)
+
+
+def wrap(text: str, width: int) -> list[str]:
+    """
+    Parte `text` en líneas de como mucho `width` columnas visibles, por los
+    espacios; una palabra más ancha que `width` se corta. Los saltos de línea
+    de `text` se respetan (como `str.split("\\n")`: "" da [""]), los espacios
+    donde se parte una línea se descartan y los tabuladores cuentan una columna.
+    """
+    width = max(width, 1)
+    lines: list[str] = []
+    line: list[str] = []          # partes ya confirmadas de la línea actual
+    line_width = 0
+    opened = PLAIN                # estilo activo al empezar la línea
+    closed = PLAIN                # estilo activo tras la última parte confirmada
+    word: list = []               # palabra pendiente: (texto, racha SGR o None)
+    word_width = 0
+    space = ""                    # espacios pendientes entre la línea y la palabra
+    style = PLAIN                 # estilo activo tras la palabra pendiente
+
+    def end_line() -> None:
+        nonlocal line, line_width, opened
+        lines.append(_transition(PLAIN, opened) + "".join(line) + _transition(closed, PLAIN))
+        line, line_width, opened = [], 0, closed
+
+    def place_word() -> None:
+        # Confirma la palabra pendiente (y los espacios previos) en la línea
+        nonlocal line_width, closed, word, word_width, space
+        if not word_width or line_width + len(space) + word_width <= width:
+            if word_width:
+                line.append(space)
+                line_width += len(space)
+            line.extend(part for part, _ in word)
+            line_width += word_width
+            closed = style
+        else:
+            if line_width:
+                end_line()
+            if word_width <= width:
+                line.extend(part for part, _ in word)
+                line_width = word_width
+                closed = style
+            else:
+                split_word()
+        word, word_width, space = [], 0, ""
+
+    def split_word() -> None:
+        nonlocal line_width, closed
+        for part, sgr in word:
+            if sgr is not None:
+                line.append(part)
+                if sgr:
+                    closed = _apply_sgr_run(closed, sgr)
+                continue
+            while part:
+                piece, columns = _clip_columns(part, width - line_width)
+                if not piece and not line_width:
+                    # Un carácter más ancho que la línea entera va solo
+                    piece, columns = part[0], display_width(part[0])
+                if piece:
+                    line.append(piece)
+                    line_width += columns
+                    part = part[len(piece):]
+                if part:
+                    end_line()
+
+    def feed(chunk: str) -> None:
+        nonlocal word_width, space
+        for m in _TOKEN_RE.finditer(chunk):
+            if m.group(1):
+                place_word()
+                end_line()
+            elif m.group(2):
+                if word:
+                    place_word()
+                space += m.group(2)
+            else:
+                piece = m.group()
+                word.append((piece, None))
+                word_width += display_width(piece)
+
+    pos = 0
+    for m in _SEQUENCE_RE.finditer(text):
+        if m.start() > pos:
+            feed(text[pos:m.start()])
+        sgr = m["sgr"]
+        word.append((m.group(), sgr or ""))
+        if sgr is not None:
+            style = _apply_sgr_run(style, sgr)
+        pos = m.end()
+    if pos < len(text):
+        feed(text[pos:])
+    place_word()
+    end_line()
+    return lines
+
+
+def indent(text: str, prefix: str) -> str:
+    """
+    Añade `prefix` al principio de cada línea de `text`. El prefijo se
+    escribe sin estilo: el que estuviera abierto se cierra antes de cada
+    salto de línea y se reabre después del prefijo.
+    """
+    if "\n" not in text:
+        return prefix + text
+    if "\x1b" not in text:
+        return prefix + text.replace("\n", "\n" + prefix)
+    out = []
+    style = PLAIN
+    for line in text.split("\n"):
+        opened = style
+        if "\x1b" in line:
+            for m in _SEQUENCE_RE.finditer(line):
+                sgr = m["sgr"]
+                if sgr is not None:
+                    style = _apply_sgr_run(style, sgr)
+        out.append(prefix + _transition(PLAIN, opened) + line + _transition(style, PLAIN))
+    return "\n".join(out)
+
+
+def pad(text: str, width: int, align: str = "<", fill: str = " ") -> str:
+    """Rellena `text` con `fill` hasta `width` columnas visibles ('<', '>' o '^', como str.format)."""
+    return pad_visible(text, visible_width(text), width, align, fill)
+
+
+def center(text: str, width: int, fill: str = " ") -> str:
+    """Centra `text` en `width` columnas visibles."""
+    return pad_visible(text, visible_width(text), width, "^", fill)
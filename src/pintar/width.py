@@ -0,0 +1,106 @@
+# modulo width.py
+"""
+Ancho en columnas de terminal de un texto.
+
+`len()` cuenta code points, pero los caracteres CJK y muchos emoji ocupan dos
+columnas y las marcas combinantes, los joiners o los selectores de variación
+no ocupan ninguna. `display_width` mide lo que realmente se ve:
+
+    display_width("hola")          -> 4
+    display_width("日本")          -> 4
+    display_width("e\u0301")       -> 1   # 'e' + acento combinante
+
+La tabla de rangos vive precalculada en `_width_table.py` y se regenera con
+`python -m pintar.width` cuando cambia la versión de Unicode de Python.
+"""
+from bisect import bisect_right
+from functools import lru_cache
+
+from ._width_table import STARTS, WIDTHS
+from . import _instrument
+
+_ZWJ = "\u200d"
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Columnas que ocupa un único carácter (0, 1 o 2)."""
+    if char < "\x7f":
+        return 1 if char >= " " else 0
+    return WIDTHS[bisect_right(STARTS, ord(char)) - 1]
+
+
+@lru_cache(maxsize=8192)
+def _wide_text_width(text: str) -> int:
+    width = 0
+    joined = False
+    for char in text:
+        # Tras un ZWJ el carácter se une al grafema anterior (👨‍👩‍👧 ocupa dos columnas)
+        if joined:
+            joined = False
+            continue
+        if char == _ZWJ:
+            joined = True
+            continue
+        width += char_width(char)
+    return width
+
+
+def display_width(text: str) -> int:
+    """
+    Número de columnas que ocupa `text` en la terminal (sin escapes ANSI).
+    Los caracteres de control (tabulador incluido) cuentan 0, como en la tabla.
+    """
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return _wide_text_width(text)
+
+
+_instrument.register_cache("width.char", char_width)
+_instrument.register_cache("width.text", _wide_text_width)
+
+
+def _build_table() -> tuple[list[int], list[int]]:
+    """Recorre todo Unicode y devuelve los puntos donde cambia el ancho."""
+    import unicodedata
+
+    def width(cp: int) -> int:
+        char = chr(cp)
+        category = unicodedata.category(char)
+        if category in ("Mn", "Me", "Cf", "Cc") and cp != 0x00AD:
+            return 0
+        if 0x1160 <= cp <= 0x11FF:  # vocales y finales Hangul Jamo (se combinan)
+            return 0
+        if category != "Cs" and unicodedata.east_asian_width(char) in ("W", "F"):
+            return 2
+        return 1
+
+    starts: list[int] = []
+    widths: list[int] = []
+    for cp in range(0x110000):
+        w = width(cp)
+        if not widths or widths[-1] != w:
+            starts.append(cp)
+            widths.append(w)
+    return starts, widths
+
+
+def _write_table(path: str) -> None:
+    import unicodedata
+
+    starts, widths = _build_table()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# modulo _width_table.py\n")
+        f.write(f"# Generado por `python -m pintar.width` (Unicode {unicodedata.unidata_version}). No editar.\n\n")
+        f.write(f"UNICODE_VERSION = {unicodedata.unidata_version!r}\n\n")
+        for name, values in (("STARTS", starts), ("WIDTHS", widths)):
+            f.write(f"{name} = (\n")
+            for i in range(0, len(values), 12):
+                f.write("    " + ", ".join(str(v) for v in values[i:i + 12]) + ",\n")
+            f.write(")\n\n")
+
+
+if __name__ == "__main__":
+    import os
+
+    _write_table(os.path.join(os.path.dirname(os.path.abspath(__file__)), "_width_table.py"))
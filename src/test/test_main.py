@@ -2,4 +2,827 @@ from pintar import dye
 
 def test_dye():
     assert repr(dye("Hello World", fore="#FF0000"))[1:-1] == r"\x1b[0m\x1b[38;2;255;0;0m\x1b[49m\x1b[22mHello World\x1b[0m\x1b[39m\x1b[49m\x1b[22m"
-    
\ No newline at end of file
+    
+def test_dye_format_pads_visible_width():
+    d = dye("hi", fore="#FF0000")
+    assert len(d) == 2
+    padded = format(d, ">5")
+    assert padded.startswith("   \x1b[")
+    assert padded.endswith(d.string_format)
+
+def test_table_aligns_styled_cells():
+    from pintar import Table
+    from pintar._util import strip_ansi
+    t = Table(["a", "b"], align=["<", ">"])
+    t.add_row(dye("xyz", fore="#00FF00"), "1")
+    t.add_row("w", dye("22", fore="#FF0000"))
+    lines = [strip_ansi(line) for line in t.render().splitlines()]
+    assert len({len(line) for line in lines}) == 1
+    assert lines[3] == "│ xyz │  1 │"
+    assert lines[4] == "│ w   │ 22 │"
+
+def test_table_stream_fixes_widths_from_sample():
+    from pintar import Table
+    from pintar._util import strip_ansi
+    lines = list(Table(["n"]).stream((["x" * i] for i in range(1, 6)), sample=2))
+    assert strip_ansi(lines[-2]) == "│ xx │"
+
+def test_display_width_wide_and_combining():
+    from pintar import display_width
+    assert display_width("BTCUSDT") == 7
+    assert display_width("日本") == 4
+    assert display_width("é") == 1
+    assert display_width("\U0001F468‍\U0001F469") == 2
+    assert len(dye("日本", fore="#FF0000")) == 4
+    # Los controles cuentan igual por la vía ASCII y por la tabla
+    assert display_width("a\tb") == 2
+    assert display_width("a\tbé") == 3
+
+def test_width_table_matches_unicodedata():
+    import unicodedata
+    import pytest
+    from pintar import _width_table
+    from pintar.width import _build_table
+    if _width_table.UNICODE_VERSION != unicodedata.unidata_version:
+        pytest.skip("tabla generada con otra versión de Unicode")
+    starts, widths = _build_table()
+    assert tuple(starts) == _width_table.STARTS
+    assert tuple(widths) == _width_table.WIDTHS
+
+def test_bench_runs_every_case_and_flags_regressions():
+    from pintar import bench
+    results = bench.run(min_time=0.005, repeat=1)
+    assert set(results) == set(bench.BENCHMARKS)
+    assert all(r.ops_per_sec > 0 for r in results.values())
+    baseline = {"results": {name: {"ops_per_sec": r.ops_per_sec * 10} for name, r in results.items()}}
+    assert bench.compare(results, baseline, 0.2) == list(results)
+
+def test_stats_counts_only_while_enabled():
+    import pintar
+    original_init = dye.__init__
+    pintar.enable_stats()
+    try:
+        pintar.reset_stats()
+        str(dye("abc", fore="#FF0000"))
+        snapshot = pintar.stats()
+        assert snapshot["counters"]["dye.created"] == 1
+        assert snapshot["counters"]["escapes"] > 0
+        assert snapshot["timers"]["dye.get_string_format"]["calls"] == 1
+        pintar.reset_stats()
+        for _ in range(10):
+            dye("x", fore="#0ECB81", bg="rgb(1, 2, 3)")
+        assert pintar.stats()["counters"]["color.parse"] == 20
+    finally:
+        pintar.disable_stats()
+    assert dye.__init__ is original_init
+    pintar.reset_stats()
+    dye("abc")
+    assert pintar.stats()["counters"] == {}
+
+# Presupuesto de `import pintar` en microsegundos (medido con -X importtime)
+IMPORT_BUDGET_US = 25_000
+
+def _run_python(*args):
+    import os
+    import subprocess
+    import sys
+    import pintar
+    src = os.path.dirname(os.path.dirname(pintar.__file__))
+    env = dict(os.environ, PYTHONPATH=src)
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+def test_import_is_lazy():
+    out = _run_python("-c", "import sys, pintar; print(sorted(m for m in sys.modules if m.startswith('pintar')))")
+    assert out.stdout.strip() == "['pintar']"
+
+def test_import_time_budget():
+    out = _run_python("-X", "importtime", "-c", "import pintar")
+    cumulative = {}
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cum, name = line.split("|")
+            if cum.strip().isdigit():
+                cumulative[name.strip()] = int(cum)
+    assert cumulative["pintar"] < IMPORT_BUDGET_US
+
+def test_parse_color_accepts_every_format():
+    from pintar import parse_color, HEX, HSL, RGB
+    red = (255, 0, 0)
+    for value in ["#F00", "#ff0000", "rgb(255, 0, 0)", "hsl(0, 100%, 50%)", (255, 0, 0), 9, HEX("#F00"), HSL(0, 1, 0.5)]:
+        assert parse_color(value).rgb_tuple == red
+    assert parse_color("light_red").to_hex() == "#ff4d4d"
+    assert parse_color("#0ECB81") is not parse_color("#0ECB81")
+    assert parse_color(None) is None
+    shared = parse_color("#0ECB81")
+    shared.r = 0
+    assert parse_color("#0ECB81").r == 14
+
+def test_pstr_hex_and_css_tags():
+    from pintar import pstr
+    assert str(pstr("[#FF0000]a[/]")) == "\x1b[38;2;255;0;0ma\x1b[0m"
+    assert str(pstr("[on hsl(240, 100%, 50%)]b")) == "\x1b[48;2;0;0;255mb"
+
+def test_stencil_single_span_compat():
+    from pintar import Stencil
+    assert Stencil("hello world", 0, 5).spray(fore="#FF0000") == "\x1b[38;2;255;0;0mhello\x1b[0m world"
+    assert Stencil("hello", 2, 2).spray(fore="#FF0000") == "hello"
+
+def test_stencil_overlapping_spans_by_priority():
+    from pintar import Stencil
+    from pintar._util import strip_ansi
+    st = Stencil("abcdefgh").add(0, 6, fore="#FF0000").add(2, 4, fore="#0000FF", priority=1)
+    out = st.spray()
+    assert strip_ansi(out) == "abcdefgh"
+    assert out == "\x1b[38;2;255;0;0mab\x1b[0m\x1b[38;2;0;0;255mcd\x1b[0m\x1b[38;2;255;0;0mef\x1b[0mgh"
+
+def test_stencil_over_styled_text_uses_visible_indexes():
+    from pintar import Stencil
+    from pintar._util import strip_ansi
+    styled = "ab" + dye("cdef", fore="#0000FF").string_format + "gh"
+    out = Stencil(styled).add(3, 7, bg="#FF0000").spray()
+    assert strip_ansi(out) == "abcdefgh"
+    assert out.index("\x1b[48;2;255;0;0m") < out.index("d")
+    assert out.endswith("h")
+
+def test_highlighter_restores_message_color():
+    from pintar.logging import Highlighter
+    h = Highlighter({"side": (r"\bLONG\b", ("#00FF00", None, None)), "num": (r"\d+", ("#0000FF", None, None))})
+    base = "\x1b[38;2;1;1;1m"
+    assert h.highlight("go LONG 5", base) == (
+        "go \x1b[38;2;0;255;0mLONG\x1b[0m" + base + " \x1b[38;2;0;0;255m5\x1b[0m" + base
+    )
+    assert h.highlight("nothing here", base) == "nothing here"
+
+def test_formatter_highlight_only_when_dyed():
+    import io
+    import logging
+    from pintar.logging import PintarFormatter, Theme, Highlighter
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, "LONG %s", ("BTCUSDT",), None)
+    theme = Theme(fmt="{message}", highlighter=Highlighter())
+    assert "\x1b[1m\x1b[38;2;14;203;129mLONG" in PintarFormatter(theme).format(record)
+    assert PintarFormatter(theme.undyed()).format(record) == "LONG BTCUSDT"
+
+def test_brush_precompiled_bulk_and_pickle():
+    import pickle
+    from pintar import Brush
+    buy = Brush("#0ECB81", style="bold")
+    assert buy("BUY") == buy.prefix + "BUY" + buy.suffix
+    assert buy("BUY") is buy("BUY")
+    for i in range(1000):
+        buy(f"id-{i}")
+    assert "BUY" in buy._interned and "id-1" not in buy._interned
+    buy("SELL")
+    assert buy("SELL") is buy("SELL")
+    assert list(buy.apply_many(["a", "b"])) == [buy("a"), buy("b")]
+    assert buy.apply_many(["a", 1], join=" ") == buy("a") + " " + buy("1")
+    assert buy.apply_many([], join="\n") == ""
+    assert pickle.loads(pickle.dumps(buy))("x") == buy("x")
+    assert buy.prefix_bytes == buy.prefix.encode()
+
+def test_byte_writer_batches_into_one_write():
+    import io
+    import os
+    from pintar import ByteWriter, Brush
+    buy = Brush("#0ECB81")
+    assert buy.encode("BUY") == buy("BUY").encode()
+    assert buy.apply_many(["a", "b"], join=b"\n") == (buy("a") + "\n" + buy("b")).encode()
+    assert bytes(dye("x", fore="#FF0000")) == dye("x", fore="#FF0000").string_format.encode()
+
+    sink = io.BytesIO()
+    out = ByteWriter(sink, flush_at=0)
+    buy.write_to(out, "BUY")
+    out.write(b"x" * 20000)
+    assert sink.getvalue() == b""
+    out.flush()
+    assert sink.getvalue() == buy("BUY").encode() + b"x" * 20000
+
+    # Más que el buffer de una tubería: hay que leer mientras se escribe
+    import threading
+    r, w = os.pipe()
+    received = []
+    reader = threading.Thread(target=lambda: received.append(open(r, "rb").read()))
+    reader.start()
+    with open(w, "w", encoding="utf-8") as stream:
+        stream.write("texto ")
+        with ByteWriter(stream, flush_at=0) as out:
+            out.writelines(["ñ", b"-" * 70000])
+    reader.join(10)
+    assert received == ["texto ñ".encode() + b"-" * 70000]
+
+def test_stream_handler_binary_mode():
+    import io
+    import logging
+    from pintar.logging import PintarStreamHandler, Theme
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8")
+    handler = PintarStreamHandler(stream, theme=Theme(fmt="{message}", dye=False), binary=True, flush_at=1 << 20)
+    for i in range(3):
+        handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "línea %d", (i,), None))
+    assert raw.getvalue() == b""
+    handler.flush()
+    assert raw.getvalue() == "línea 0\nlínea 1\nlínea 2\n".encode()
+    handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "última", (), None))
+    handler.close()
+    assert raw.getvalue().endswith("última\n".encode())
+
+def test_highlighter_plan_is_shared_by_messages_of_the_same_shape():
+    from pintar.logging import Highlighter
+    h = Highlighter()
+    for price in ("45230.50", "45231.75", "10000.00"):
+        message = f"señal LONG precio={price} en BTCUSDT"
+        assert h.render(message, "B") == h.highlight(message, "B")
+    assert h._plans.cache_info().misses == 1
+    assert h.render("sin nada", "B") == "sin nada"
+
+def test_ansi_parser_handles_split_sequences():
+    from pintar import AnsiParser, Style, parse_ansi
+    text = ("a\x1b[1;38;2;14;203;129mB\x1b[0m c\x1b]0;título\x07d\x1b[2K"
+            "e\x1b[38;5;208;48:2::1:2:3mf\x1b[22;39mg\x1b[mñ")
+    expected = [
+        ("a", Style()), ("B", Style((14, 203, 129), None, 1)), (" c", Style()), ("d", Style()),
+        ("e", Style()), ("f", Style(208, (1, 2, 3), 0)), ("g", Style(None, (1, 2, 3), 0)), ("ñ", Style()),
+    ]
+    assert parse_ansi(text) == expected
+    data = text.encode()
+    for size in (1, 2, 3, 7):
+        parser = AnsiParser()
+        segments = []
+        for i in range(0, len(data), size):
+            segments.extend(parser.feed(data[i:i + size]))
+        segments.extend(parser.close())
+        merged = []
+        for chunk, style in segments:
+            if merged and merged[-1][1] == style:
+                merged[-1] = (merged[-1][0] + chunk, style)
+            else:
+                merged.append((chunk, style))
+        assert merged == [("a", Style()), ("B", Style((14, 203, 129), None, 1)), (" cde", Style())] + expected[5:]
+    assert Style((14, 203, 129), None, 1).sgr() == "\x1b[1;38;2;14;203;129m"
+    assert Style(1, None, 3).transition(Style(1, None, 2)) == "\x1b[22;2m"   # negrita+tenue → tenue
+
+def test_console_publishes_whole_lines_from_many_threads():
+    import io
+    import threading
+    from pintar.console import Console
+    stream = io.StringIO()
+    console = Console(stream)
+
+    def writer(n):
+        for i in range(200):
+            # Cada línea llega en varios trozos: solo debe salir completa
+            console.write(f"hilo{n:02d} ")
+            console.write(f"linea{i:03d} ")
+            console.write("fin\n")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 32 * 200
+    assert all(line.startswith("hilo") and line.endswith(" fin") and len(line) == 19 for line in lines)
+
+def test_console_isolates_styles_opened_by_other_threads():
+    import io
+    import threading
+    from pintar.console import Console
+    stream = io.StringIO()
+    console = Console(stream)
+    console.start_style("\x1b[31m")
+    other = threading.Thread(target=console.write, args=("otro\n",))
+    other.start()
+    other.join()
+    console.end_style()
+    assert stream.getvalue() == "\x1b[31m\x1b[0motro\n\x1b[0m\x1b[31m\x1b[0m"
+
+# Retraso máximo tolerado del event loop mientras se loguea a 50k líneas/s
+ASYNC_LAG_BUDGET_S = 0.1
+
+def test_async_handler_keeps_event_loop_responsive():
+    import asyncio
+    import logging
+    import os
+    import threading
+    import time
+    from pintar.aio import AsyncPintarHandler
+    from pintar.logging import Theme
+
+    r, w = os.pipe()
+    received = bytearray()
+    reader = threading.Thread(target=lambda: [received.extend(b) for b in iter(lambda: os.read(r, 1 << 16), b"")])
+    reader.start()
+
+    async def main():
+        handler = AsyncPintarHandler(w, theme=Theme(fmt="{levelname} {message}"))
+        log = logging.getLogger("pintar.test.async")
+        log.propagate = False
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        lags = []
+        done = False
+
+        async def ticker():
+            while not done:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - start - 0.001)
+
+        async def producer():
+            # 50 líneas por milisegundo ≈ 50k líneas/s durante 0.5 s
+            for tick in range(500):
+                for i in range(50):
+                    log.info("señal LONG precio=%.2f n=%d", 45230.5 + i, tick * 50 + i)
+                await handler.drain()
+                await asyncio.sleep(0.001)
+
+        tick_task = asyncio.create_task(ticker())
+        await producer()
+        done = True
+        await tick_task
+        await handler.aclose()
+        log.removeHandler(handler)
+        return lags
+
+    lags = asyncio.run(main())
+    os.close(w)
+    reader.join(10)
+    assert received.count(b"\n") == 500 * 50
+    assert max(lags) < ASYNC_LAG_BUDGET_S
+
+_APPEND_WRITER = """
+import logging, sys
+from pintar.logging import add_file_handler, Theme
+worker, path = int(sys.argv[1]), sys.argv[2]
+log = logging.getLogger("w")
+log.propagate = False
+log.setLevel(logging.INFO)
+add_file_handler(log, path, theme=Theme(fmt="{message}"), batched=True, flush_interval=0.005, max_batch=16384)
+for i in range(1500):
+    log.info("%d %d %s", worker, i, chr(97 + worker) * (40 + i * 7 % 3000))
+"""
+
+def test_batched_file_handler_keeps_lines_whole_across_processes():
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import pintar
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pintar.__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "shared.log")
+        procs = [subprocess.Popen([sys.executable, "-c", _APPEND_WRITER, str(w), path], env=env)
+                 for w in range(16)]
+        assert all(p.wait(60) == 0 for p in procs)
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    assert lines.pop() == ""
+    seen = set()
+    for line in lines:
+        worker, i, payload = line.split(" ")
+        worker, i = int(worker), int(i)
+        assert payload == chr(97 + worker) * (40 + i * 7 % 3000)
+        seen.add((worker, i))
+    assert len(lines) == len(seen) == 16 * 1500
+
+# Memoria por dye retenido, sin contar su texto (medida: ~88 bytes)
+DYE_MEMORY_BUDGET_B = 128
+
+def test_dye_memory_budget():
+    import gc
+    import tracemalloc
+    texts = [f"orden {i}" for i in range(1_000_000)]
+    # Sin ciclos que recoger: el GC solo recorrería una y otra vez el millón de objetos
+    gc.disable()
+    tracemalloc.start()
+    try:
+        held = [dye(text, fore="#0ECB81", style="bold") for text in texts]
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    assert used / len(held) < DYE_MEMORY_BUDGET_B
+    sample = held[123456]
+    assert sample.clean is sample.string
+    assert sample[6:].clean == "123456"
+
+def test_tracebacks_render_once_then_reference():
+    import logging
+    import sys
+    from pintar.logging import PintarFormatter, Theme, Tracebacks
+
+    def fail(n):
+        raise ConnectionError(f"broker caído {n}")
+
+    formatter = PintarFormatter(Theme(fmt="{message}", tracebacks=Tracebacks()))
+    plain = PintarFormatter(Theme(fmt="{message}", dye=False, tracebacks=Tracebacks()))
+    outputs = []
+    for n in range(3):
+        try:
+            fail(n)
+        except ConnectionError:
+            record = logging.LogRecord("t", logging.ERROR, __file__, 1, "caída", (), sys.exc_info())
+        outputs.append((formatter.format(record), plain.format(record)))
+        assert record.exc_text is None
+    first, first_plain = outputs[0]
+    assert "Traceback #1 (most recent call last):" in first_plain
+    assert "in fail" in first_plain and "\x1b" not in first_plain
+    assert "\x1b" in first and "broker caído 0" in first
+    assert outputs[2][1] == "caída\n↻ ConnectionError: broker caído 2  (traceback #1 ×3)"
+
+def test_record_pieces_are_shared_between_formatters():
+    import logging
+    from pintar.logging import PintarFormatter, Theme
+
+    class Message:
+        renders = 0
+
+        def __str__(self):
+            Message.renders += 1
+            return "precio=%s"
+
+    theme = Theme(fmt="{levelname} {message} %")
+    dyed, plain = PintarFormatter(theme), PintarFormatter(theme.undyed())
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, Message(), (45230,), None)
+    assert plain.format(record) == "INFO     precio=45230 %"
+    assert "precio=45230" in dyed.format(record)
+    assert Message.renders == 1
+    record.msg, record.args = "cambiado por un filtro", ()
+    assert plain.format(record) == "INFO     cambiado por un filtro %"
+
+def test_colorizer_cli_rules_and_minimal_sgr():
+    import json
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import pintar
+    from pintar.colorize import Colorizer, load_rules
+    rules = {
+        r"ERROR": {"fore_color": "#FF0000", "bg_color": None, "style": 1},
+        r"\d+": {"fore_color": "#FF0000", "bg_color": None, "style": "bold"},
+        r"x+": {"fore_color": None, "bg_color": None, "style": 4},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rules.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rules, f)
+        colorizer = Colorizer(load_rules(path))
+        # Trozo cortado a mitad de línea: la línea espera a su salto
+        assert colorizer.feed(b"ERROR42 xx 7\nERR") == b"\x1b[1;38;2;255;0;0mERROR42\x1b[0m \x1b[4mxx\x1b[0m \x1b[1;38;2;255;0;0m7\x1b[0m\n"
+        assert colorizer.feed(b"OR 1\n") == b"\x1b[1;38;2;255;0;0mERROR\x1b[0m \x1b[1;38;2;255;0;0m1\x1b[0m\n"
+        assert colorizer.close() == b""
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pintar.__file__)))
+        out = subprocess.run([sys.executable, "-m", "pintar", "-r", path], input=b"plano\nxx sin salto",
+                             env=env, capture_output=True, check=True).stdout
+    assert out == b"plano\n\x1b[4mxx\x1b[0m sin salto"
+
+def test_log_reader_indexes_and_queries_by_level_and_time():
+    import logging
+    import os
+    import tempfile
+    from datetime import datetime
+    from pintar.logging import PintarFileHandler
+    from pintar.logreader import LogReader
+
+    base = datetime(2026, 10, 19, 13, 58).timestamp()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bot.log")
+        handler = PintarFileHandler(path)
+
+        def emit(minute, level, msg, exc_text=None):
+            record = logging.LogRecord("bot", level, __file__, 1, msg, (), None)
+            record.created = base + minute * 60
+            record.exc_text = exc_text
+            handler.handle(record)
+            handler.flush()
+
+        emit(0, logging.INFO, "arranque")
+        emit(2, logging.ERROR, "caída", "Traceback (most recent call last):\n  boom")
+        emit(3, logging.WARNING, "lento")
+        emit(8, logging.ERROR, "tarde")
+        with LogReader(path) as reader:
+            assert len(reader) == 4
+            errors = list(reader.query(levels=["ERROR"], start="14:00", end="14:05"))
+            assert [reader.text(e).splitlines()[-1] for e in errors] == ["  boom"]
+            assert [e.index for e in reader.query(min_level="WARNING")] == [1, 2, 3]
+            plain = reader.render(errors[0], dye=False)
+            assert plain == reader.text(errors[0])
+            assert "\x1b" in reader.render(errors[0])
+        # El índice persiste y solo se amplía con lo nuevo
+        assert os.path.getsize(path + ".pidx") > 0
+        emit(9, logging.CRITICAL, "fin")
+        handler.close()
+        with LogReader(path) as reader:
+            assert [reader.text(e) for e in reader.query(min_level="ERROR", start="14:05")][-1].endswith("bot - fin")
+            assert len(reader) == 5
+
+def test_best_foreground_by_wcag_contrast():
+    from pintar.colors import RGB, best_foreground, best_foregrounds, contrast_ratio
+    from pintar.logging import Theme
+    assert round(contrast_ratio("#777777", "#FFFFFF"), 2) == 4.48
+    assert round(RGB(128, 128, 128).luminance, 4) == 0.2159
+    candidates = ("#E2E8F0", "#1A202C", "#F6465D")
+    backgrounds = ["#9B2335", "#F59E0B", (0, 0, 0), "#FFFFFF"]
+    picks = best_foregrounds(backgrounds, candidates)
+    assert picks == ["#E2E8F0", "#1A202C", "#E2E8F0", "#1A202C"]
+    for bg, pick in zip(backgrounds, picks):
+        assert pick == best_foreground(bg, candidates)
+        assert contrast_ratio(pick, bg) == max(contrast_ratio(c, bg) for c in candidates)
+    theme = Theme(overrides={"INFO": {"message": ("#FFFF00", "#FFFFFF", None), "name": (None, "#000000", None)}},
+                  auto_contrast=True)
+    palette = theme.palette_for("INFO")
+    assert palette["message"][0] == "#000000" and palette["name"][0] == "#FFFFFF"
+    # Un fore que ya es legible no se toca
+    assert theme.palette_for("CRITICAL") == Theme().palette_for("CRITICAL")
+
+def test_log_metrics_counts_once_per_record_across_threads():
+    import io
+    import logging
+    import threading
+    from pintar.logging import PintarStreamHandler, Theme
+    from pintar.logmetrics import LogMetrics
+
+    log = logging.getLogger("test.metrics")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(PintarStreamHandler(io.StringIO()))
+    log.addHandler(PintarStreamHandler(io.StringIO(), theme=Theme(dye=False)))
+    log.handlers[1].set_name("archivo")
+    metrics = LogMetrics(dye=False)
+    metrics.instrument_logger(log)
+
+    def work():
+        for i in range(500):
+            log.info("tick %s", i)
+        log.warning("lento")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    snap = metrics.snapshot()
+    assert snap["records"] == 2004
+    assert snap["levels"] == {"INFO": 2000, "WARNING": 4} and snap["loggers"] == {"test.metrics": 2004}
+    plain = snap["handlers"]["archivo"]
+    assert plain["emit"]["count"] == plain["format"]["count"] == 2004
+    assert plain["bytes"] == len(log.handlers[1].stream.getvalue().encode())
+    assert 0 < plain["format"]["p50_us"] <= plain["emit"]["p99_us"]
+    assert "INFO 2000" in metrics.summary() and "\x1b" not in metrics.summary()
+    metrics.uninstrument(log.handlers[0])
+    metrics.reset()
+    log.info("sin medir en el primero")
+    assert metrics.snapshot()["handlers"]["archivo"]["emit"]["count"] == 1
+
+_FLIGHT_CRASHER = """
+import logging, os, signal, sys
+from pintar.flight import FlightRecorderHandler
+log = logging.getLogger("bot")
+log.setLevel(logging.DEBUG)
+log.addHandler(FlightRecorderHandler(sys.argv[1], size=8192, dict_size=4096))
+for i in range(2000):
+    log.debug("tick %d precio %.1f %s", i, i / 2, "BTCUSDT")
+try:
+    {}["x"]
+except KeyError:
+    log.exception("sin datos de %s", "ETH")
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+def test_flight_recorder_survives_sigkill_and_keeps_the_newest():
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import pintar
+    from pintar.flight import FlightReader
+    from pintar.logging import Theme
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bot.flight")
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pintar.__file__)))
+        proc = subprocess.run([sys.executable, "-c", _FLIGHT_CRASHER, path], env=env)
+        assert proc.returncode == -9
+        records = list(FlightReader(path))
+        # El anillo de 8 KiB dio varias vueltas: quedan los más recientes, en orden
+        ticks = [r.args[0] for r in records[:-1]]
+        assert ticks == list(range(ticks[0], 2000)) and len(ticks) > 50
+        assert records[-2].getMessage() == "tick 1999 precio 999.5 BTCUSDT"
+        assert records[-1].levelname == "ERROR" and records[-1].exc_text == "KeyError: 'x'"
+        lines = list(FlightReader(path).render(Theme(dye=False), last=2))
+        assert lines[0].endswith("│ bot - tick 1999 precio 999.5 BTCUSDT")
+        assert lines[1].endswith("│ bot - sin datos de ETH\nKeyError: 'x'")
+
+def test_bound_logger_feeds_context_fields_per_task_and_thread():
+    import asyncio
+    import io
+    import threading
+    from pintar.logging import FieldDef, Theme, bind, get_logger
+    stream = io.StringIO()
+    theme = Theme(fmt="{symbol} {strategy} {message} {lineno}", dye=False,
+                  fields={"symbol": FieldDef(value="-", context="symbol"),
+                          "strategy": FieldDef(value="?", context="strategy")})
+    log = get_logger("test.bind", theme=theme, stream=stream)
+
+    async def trade(symbol):
+        bound = bind(log, symbol=symbol)
+        for i in range(2):
+            bound.info("tick %d", i)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(trade("ETH"), trade("SOL"))
+
+    asyncio.run(main())
+    worker = threading.Thread(target=lambda: bind(log, symbol="XRP").bind(strategy="grid").warning("hilo"))
+    worker.start()
+    worker.join()
+    log.info("sin contexto")
+    assert not hasattr(log, "bind")
+    lines = [line.rsplit(" ", 1)[0] for line in stream.getvalue().splitlines()]
+    assert lines == ["ETH ? tick 0", "SOL ? tick 0", "ETH ? tick 1", "SOL ? tick 1",
+                     "XRP grid hilo", "- ? sin contexto"]
+    # lineno es el de quien llama, no el de BoundLogger
+    assert stream.getvalue().splitlines()[0].endswith(f" {trade.__code__.co_firstlineno + 3}")
+
+def test_text_helpers_keep_styles_across_cuts_and_lines():
+    import io
+    from pintar.ansiparse import parse_ansi
+    from pintar.logging import Highlighter, Theme, get_logger
+    from pintar.text import center, indent, pad, truncate, visible_width, wrap
+    red, bold, reset = "\x1b[31m", "\x1b[1m", "\x1b[0m"
+    text = f"orden {red}LONG BTCUSDT a mercado{reset} ok"
+    lines = wrap(text, 10)
+    assert lines == [f"orden {red}LONG{reset}", f"{red}BTCUSDT a{reset}", f"{red}mercado{reset} ok"]
+    # Cada línea sola tiene los mismos segmentos que el original
+    assert [seg for line in lines for seg in parse_ansi(line) if seg[0].strip()] == \
+        [seg for seg in parse_ansi(" ".join(lines)) if seg[0].strip()]
+    assert wrap("日本語のテキスト", 5) == ["日本", "語の", "テキ", "スト"]
+    assert wrap(f"{bold}abcdefgh{reset}", 3) == [f"{bold}abc{reset}", f"{bold}def{reset}", f"{bold}gh{reset}"]
+    assert truncate(text, 14) == f"orden {red}LONG BT…{reset}"
+    assert truncate(text, 100) is text and truncate("日本語テキ", 5) == "日本…"
+    assert visible_width(truncate(text, 14)) == 14
+    assert pad(f"{red}ab{reset}", 4, ">") == f"  {red}ab{reset}" and center("ab", 6, "*") == "**ab**"
+    assert indent(f"{red}uno\ndos{reset}", "> ") == f"> {red}uno{reset}\n> {red}dos{reset}"
+
+    stream = io.StringIO()
+    theme = Theme(fmt="{message}|", highlighter=Highlighter({"num": (r"\d+", ("#63B3ED", None, None))}), message_width=12)
+    log = get_logger("test.text", theme=theme, stream=stream)
+    log.info("precio 45230 BTCUSDT")
+    line = stream.getvalue().rstrip("\n")
+    assert visible_width(line) == 13 and "\x1b[38;2;99;179;237m4523…\x1b[0m" in line
+
+def test_pstr_render_file_matches_pstr_in_chunks_and_processes():
+    import os
+    import tempfile
+    from pintar import pstr
+    text = "".join(f"[bold #0ECB81]fila {i}[/bold] \\[no es tag\\] [on red]ñ {i * 1.5}\n" if i % 3 else
+                   f"[/]abierto en una línea [italic]y cerrado en la siguiente\n" for i in range(300))
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "informe.txt"), os.path.join(tmp, "informe.ansi")
+        with open(src, "wb") as f:
+            f.write(text.encode() + b"[red]byte suelto \xff sin salto final")
+        expected = pstr(text).string_format.encode() + b"\x1b[31mbyte suelto \xff sin salto final"
+        for workers in (1, 2):
+            assert pstr.render_file(src, dst, workers=workers, chunk_size=500) == len(expected)
+            with open(dst, "rb") as f:
+                assert f.read() == expected
+        try:
+            pstr.render_file(src, src)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("render_file sobre su propia entrada")
+        with open(src, "rb") as f:
+            assert f.read().startswith(b"[/]abierto")
+
+def test_console_adopts_partial_lines_and_styles_of_finished_threads():
+    import gc
+    import io
+    import threading
+    from pintar.console import Console
+    stream = io.StringIO()
+    console = Console(stream)
+    worker = threading.Thread(target=lambda: (console.start_style("\x1b[31m"), console.write("a medias")))
+    worker.start()
+    worker.join()
+    gc.collect()
+    console.write("siguiente\n")
+    # Lo pendiente del hilo terminado sale antes y su estilo queda cerrado
+    assert stream.getvalue() == "\x1b[31ma medias\x1b[0msiguiente\n" and console._styles == {}
+    worker = threading.Thread(target=console.write, args=("sin salto",))
+    worker.start()
+    worker.join()
+    console.flush_all()
+    assert stream.getvalue().endswith("siguiente\nsin salto")
+
+def test_print_without_newline_is_published_at_once(capsys):
+    import pintar
+    from pintar.console import console
+    pintar.print("[bold]A[/]", end="")
+    console.stream.write("B\n")
+    assert capsys.readouterr().out == "\x1b[1mA\x1b[0mB\n"
+
+def test_formatted_records_stay_picklable():
+    import io
+    import logging
+    import pickle
+    from pintar.logging import FieldDef, Theme, get_logger
+    records = []
+
+    class Keep(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    theme = Theme(fmt="{symbol} {message}", dye=False, fields={"symbol": FieldDef(value="-", context="symbol")})
+    log = get_logger("test.pickle", theme=theme, stream=io.StringIO())
+    log.addHandler(Keep())
+    log.warning("precio %s", 45230)
+    restored = pickle.loads(pickle.dumps(records[0]))
+    assert restored.getMessage() == "precio 45230" and not any("pintar" in key for key in vars(restored))
+
+def test_stats_count_output_bytes_once_at_the_outermost_probe():
+    import logging
+    import pintar
+    from pintar.logging import PintarFormatter
+    formatter = PintarFormatter()
+    record = logging.LogRecord("t", logging.INFO, __file__, 1, dye("LONG", fore="#0ECB81"), (), None)
+    pintar.enable_stats()
+    try:
+        pintar.reset_stats()
+        output = formatter.format(record)
+        counters = pintar.stats()["counters"]
+    finally:
+        pintar.disable_stats()
+    # El dye del mensaje se renderiza dentro de format: sus bytes no se suman aparte
+    assert counters["bytes"] == len(output.encode()) and counters["escapes"] == output.count("\x1b")
+
+def test_async_writers_are_shared_per_fd_and_report_drops():
+    import asyncio
+    import logging
+    import os
+    from pintar import aio
+    from pintar.aio import AsyncPintarHandler
+    from pintar.logging import Theme
+    r, w = os.pipe()
+    errors = []
+
+    class Handler(AsyncPintarHandler):
+        def handleError(self, record):
+            errors.append(record.getMessage())
+
+    async def main():
+        first = Handler(w, theme=Theme(fmt="{message}", dye=False))
+        second = Handler(w, theme=Theme(fmt="{message}", dye=False))
+        assert first.writer is second.writer
+        first.writer.max_buffer = 64
+        for i in range(20):
+            first.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "línea %02d", (i,), None))
+        # El descriptor nunca pasa a no bloqueante
+        assert os.get_blocking(w) is True
+        await first.aclose()
+        assert w in aio._writers
+        second.close()
+        assert w not in aio._writers
+
+    asyncio.run(main())
+    os.close(w)
+    data = os.read(r, 1 << 16)
+    os.close(r)
+    # Lo descartado llega a handleError
+    assert errors and len(errors) + data.count(b"\n") == 20
+
+def test_dye_builds_its_format_once_and_rebuilds_after_changes():
+    import pintar
+    d = dye("abc", fore="#FF0000")
+    pintar.enable_stats()
+    try:
+        pintar.reset_stats()
+        first = str(d)
+        assert str(d) is first and f"{d}" is first and len(d) == 3
+        assert pintar.stats()["timers"]["dye.get_string_format"]["calls"] == 1
+    finally:
+        pintar.disable_stats()
+    d.string = "xy"
+    assert str(d) == first.replace("abc", "xy") and len(d) == 2 and d.clean == "xy"
+    d.style = "bold"
+    assert "\x1b[1m" in str(d) and d.fore.r == 255
+
+def test_clipping_counts_control_characters_as_zero_columns():
+    from pintar._util import _clip_columns, clip_visible, visible_len
+    from pintar.text import truncate
+    text = "ab\tcd\ref"
+    assert visible_len(text) == 6
+    assert _clip_columns(text, 3) == ("ab\tc", 3)
+    assert clip_visible(text, 4) == "ab\tcd\r"
+    assert truncate(text, 6) is text and truncate(text, 5) == "ab\tcd\r…"
+
+def test_css_color_channels_are_clamped():
+    from pintar import pstr
+    from pintar.colors import parse_color
+    red = parse_color("rgb(300, -5, 20)")
+    assert (red.r, red.g, red.b) == (255, 0, 20)
+    assert parse_color("rgba(10, 10, 10, 2)").a == 1.0
+    green = parse_color("hsl(480, 150%, 50%)")
+    assert (green.r, green.g, green.b) == (0, 255, 0)
+    assert str(pstr("[rgb(300,0,0)]x")) == "\x1b[38;2;255;0;0mx"